@@ -1,45 +1,282 @@
 """
 Action handlers for detected keywords
 """
-from typing import Dict, Optional, Callable
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Callable
+import asyncio
+import inspect
 import logging
 
+from pydantic import BaseModel, ValidationError
+
+from app.http_client import PooledHTTPClient
+from app.models import CallParams, LightsParams, MusicParams
+from app.resilience import Resilience
+
 logger = logging.getLogger(__name__)
 
+# Per-action-type execution timeouts in seconds
+DEFAULT_TIMEOUTS = {"call": 15.0, "music": 5.0, "lights": 5.0}
+
+# Priority classes; lower runs first and PRIORITY_EMERGENCY gets reserved capacity
+PRIORITY_EMERGENCY = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+DEFAULT_PRIORITIES = {"call": PRIORITY_EMERGENCY, "music": PRIORITY_LOW}
+
+# Params naming the device an action type controls; bursts per device are coalesced
+DEFAULT_COALESCE_TARGETS = {"lights": ("room",)}
+
+# Action types that only set their target's state, so repeating one is a no-op
+DEFAULT_IDEMPOTENT = {"lights"}
+
+
+# Idempotency key of the outbox entry being delivered, if any
+current_idempotency_key: ContextVar[Optional[str]] = ContextVar(
+    "current_idempotency_key", default=None
+)
+
+
+def is_async_action(action: Callable) -> bool:
+    """Whether calling the action returns a coroutine"""
+    return getattr(action, "is_async", False) or inspect.iscoroutinefunction(action)
+
+
+def resolve_result(value: Any, loop: Optional[asyncio.AbstractEventLoop] = None) -> Any:
+    """Finish an awaitable action result from synchronous code
+
+    Runs it on ``loop`` when given (and waits from this thread), otherwise
+    on a fresh event loop.
+    """
+    if not inspect.isawaitable(value):
+        return value
+
+    async def wait():
+        return await value
+
+    if loop is not None:
+        return asyncio.run_coroutine_threadsafe(wait(), loop).result()
+    return asyncio.run(wait())
+
+
+def _parameters(handler: Callable) -> Mapping[str, inspect.Parameter]:
+    """A handler's parameters by name, or none if its signature cannot be read"""
+    try:
+        return inspect.signature(handler).parameters
+    except (TypeError, ValueError):
+        return {}
+
+
+class ActionPlan(NamedTuple):
+    """A validated action, ready to run without further lookups"""
+
+    action_type: str
+    params: Mapping[str, Any]
+    handler: Callable
+
 
 class ActionRegistry:
     """Registry for managing actions"""
 
     def __init__(self):
         self.actions: Dict[str, Callable] = {}
+        self.timeouts: Dict[str, float] = {}
+        self.coalesce_targets: Dict[str, tuple] = {}
+        self.priorities: Dict[str, int] = {}
+        self.idempotent: set[str] = set()
+        self.schemas: Dict[str, type[BaseModel]] = {}
+        self.resilience = Resilience()
+        self.http_client: Optional[PooledHTTPClient] = None
+        # action type -> (handler, guarded handler); wrapping inspects the signature
+        self._guarded: Dict[str, tuple[Callable, Callable]] = {}
         self._register_default_actions()
 
     def _register_default_actions(self):
         """Register default actions"""
-        self.register("call", self.call_action)
-        self.register("music", self.play_music_action)
-        self.register("lights", self.lights_action)
+        self.register("call", self.call_action, params_schema=CallParams)
+        self.register("music", self.play_music_action, params_schema=MusicParams)
+        self.register("lights", self.lights_action, params_schema=LightsParams)
+
+    def register(
+        self,
+        action_type: str,
+        handler: Callable,
+        timeout: Optional[float] = None,
+        params_schema: Optional[type[BaseModel]] = None,
+        coalesce_by: Optional[tuple] = None,
+        priority: Optional[int] = None,
+        idempotent: Optional[bool] = None,
+    ):
+        """Register an action handler, optionally with its own execution timeout
+
+        Handlers may be plain functions or ``async def`` coroutines; the
+        executor awaits async handlers on the server's event loop and runs
+        plain ones on its worker threads. An ``async def`` handler that
+        takes an ``http`` keyword argument is called with the shared pooled
+        HTTP client. The client is async and bound to the server's loop, so
+        a plain handler taking ``http`` is rejected with ``ValueError``. Any
+        handler that takes ``idempotency_key`` is called with the key of the
+        outbox entry being delivered (None outside the outbox).
+
+        ``params_schema`` is a pydantic model that action params are
+        validated against when an action is created; without one, params
+        are accepted as given.
 
-    def register(self, action_type: str, handler: Callable):
-        """Register an action handler"""
+        ``coalesce_by`` names the params that identify the target device;
+        bursts of actions for the same target are then merged into one.
+
+        ``priority`` is the action type's class (``PRIORITY_EMERGENCY``,
+        ``PRIORITY_NORMAL`` or ``PRIORITY_LOW``); the executor runs lower
+        classes first.
+
+        An ``idempotent`` action type with ``coalesce_by`` targets only sets
+        its target's state; the executor skips it when the device is known
+        to already be in that state.
+        """
+        if "http" in _parameters(handler) and not inspect.iscoroutinefunction(handler):
+            raise ValueError(
+                f"Handler for '{action_type}' takes 'http' but is not async; "
+                "the shared HTTP client can only be awaited on the event loop"
+            )
         self.actions[action_type] = handler
+        if params_schema is not None:
+            self.schemas[action_type] = params_schema
+        else:
+            self.schemas.pop(action_type, None)
+        timeout = timeout if timeout is not None else DEFAULT_TIMEOUTS.get(action_type)
+        if timeout is not None:
+            self.timeouts[action_type] = timeout
+        coalesce_by = (
+            coalesce_by if coalesce_by is not None else DEFAULT_COALESCE_TARGETS.get(action_type)
+        )
+        if coalesce_by is not None:
+            self.coalesce_targets[action_type] = tuple(coalesce_by)
+        else:
+            self.coalesce_targets.pop(action_type, None)
+        self.priorities[action_type] = (
+            priority if priority is not None else DEFAULT_PRIORITIES.get(action_type, PRIORITY_NORMAL)
+        )
+        if idempotent if idempotent is not None else action_type in DEFAULT_IDEMPOTENT:
+            self.idempotent.add(action_type)
+        else:
+            self.idempotent.discard(action_type)
         logger.info(f"Registered action handler: {action_type}")
 
     def get_handler(self, action_type: str) -> Optional[Callable]:
         """Get action handler by type"""
         return self.actions.get(action_type)
 
-    def create_action(
-        self, action_type: str, action_params: Optional[dict] = None
-    ) -> Callable:
-        """Create an action callable with parameters"""
+    async def open_http_client(self, **options) -> PooledHTTPClient:
+        """Create the shared HTTP client; options go to ``PooledHTTPClient``"""
+        await self.close_http_client()
+        self.http_client = PooledHTTPClient(**options)
+        return self.http_client
+
+    async def close_http_client(self) -> None:
+        """Close the shared HTTP client and its pooled connections"""
+        client, self.http_client = self.http_client, None
+        if client is not None:
+            await client.aclose()
+
+    def _inject(self, handler: Callable) -> Callable:
+        """Bind the shared HTTP client and the idempotency key to handlers that ask for them
+
+        Only coroutine handlers get the HTTP client (see ``register``).
+        """
+        parameters = _parameters(handler)
+        wants_http = "http" in parameters and inspect.iscoroutinefunction(handler)
+        wants_key = "idempotency_key" in parameters
+        if not (wants_http or wants_key):
+            return handler
+
+        # Looked up at call time, so actions created before startup use the live client
+        def extras() -> dict:
+            kwargs = {}
+            if wants_http:
+                kwargs["http"] = self.http_client
+            if wants_key:
+                kwargs["idempotency_key"] = current_idempotency_key.get()
+            return kwargs
+
+        if inspect.iscoroutinefunction(handler):
+            async def injected(params: dict):
+                return await handler(params, **extras())
+        else:
+            def injected(params: dict):
+                return handler(params, **extras())
+        return injected
+
+    def get_guarded_handler(self, action_type: str) -> Optional[Callable]:
+        """Get a handler wrapped in its circuit breaker and the shared retry budget"""
         handler = self.get_handler(action_type)
         if not handler:
+            return None
+        cached = self._guarded.get(action_type)
+        if cached is not None and cached[0] is handler:
+            return cached[1]
+        guarded = self.resilience.guard(action_type, self._inject(handler))
+        self._guarded[action_type] = (handler, guarded)
+        return guarded
+
+    def validate_params(
+        self, action_type: str, action_params: Optional[dict] = None
+    ) -> Mapping[str, Any]:
+        """Validate params against the action type's schema and fill in defaults
+
+        Returns a read-only mapping; raises ValueError for an unknown action
+        type or invalid params.
+        """
+        if action_type not in self.actions:
             raise ValueError(f"Unknown action type: {action_type}")
+        schema = self.schemas.get(action_type)
+        if schema is None:
+            return MappingProxyType(dict(action_params or {}))
+        try:
+            model = schema.model_validate(action_params or {})
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'params'}: {err['msg']}"
+                for err in e.errors()
+            )
+            raise ValueError(f"Invalid params for '{action_type}': {problems}") from None
+        return MappingProxyType(model.model_dump())
+
+    def compile_plan(
+        self, action_type: str, action_params: Optional[dict] = None
+    ) -> ActionPlan:
+        """Validate params once and bind them to the guarded handler"""
+        params = self.validate_params(action_type, action_params)
+        return ActionPlan(action_type, params, self.get_guarded_handler(action_type))
+
+    def create_action(
+        self, action_type: str, action_params: Optional[dict] = None
+    ) -> Callable:
+        """Create an action callable from a precompiled plan
+
+        Params are validated here, so a bad mapping fails at registration
+        instead of when its keyword fires.
+        """
+        return self.build_action(self.compile_plan(action_type, action_params))
+
+    def build_action(self, plan: ActionPlan) -> Callable:
+        """Create a new action callable for an already compiled plan
+
+        Every call returns a distinct callable, so several keyword
+        registrations can share a plan and still be separate actions.
+        """
+        action_type, params, handler = plan
 
-        def action():
-            return handler(action_params or {})
+        if inspect.iscoroutinefunction(handler):
+            async def action():
+                return await handler(params)
+        else:
+            def action():
+                return handler(params)
 
+        action.plan = plan
+        action.action_type = action_type
+        action.action_params = params
         return action
 
     # Default action implementations
@@ -1,20 +1,63 @@
 """
 FastAPI Application
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
+import functools
+import json
 import logging
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
 
 from app.models import (
+    ActionStatusResponse,
+    CommandTemplateCreate,
+    CommandTemplateResponse,
+    ContinuousStatusResponse,
+    DeviceInvalidate,
+    DeviceStateResponse,
+    DeviceStateUpdate,
     KeywordActionCreate,
     KeywordActionResponse,
+    KeywordBulkCreate,
+    KeywordBulkDelete,
+    KeywordBulkResponse,
+    KeywordSearchResult,
+    ListenJobResponse,
     ListenRequest,
     ListenResponse,
+    MatchBatchRequest,
+    MatchBatchResponse,
+    RecognitionHypothesis,
     StatusResponse,
 )
-from app.voice_listener import VoiceListener
+from app.voice_listener import TriggerResult, VoiceListener
+from app.continuous import ContinuousListener
 from app.actions import action_registry
+from app.debounce import TriggerDebouncer
+from app.device_state import device_state_cache
+from app.events import EventBus
+from app.executor import action_executor
+from app.grammar import DEFAULT_COMMAND_TEMPLATES
+from app.jobs import JobQueueFullError, RecognitionJob, RecognitionJobs, TenantJobLimitError
+from app.keyword_db import KeywordDatabase, KeywordSync
+from app.keyword_store import normalize_keyword
+from app.offload import (
+    BlockingPool,
+    ConcurrencyLimit,
+    LoopLagMonitor,
+    OverloadedError,
+    PoolSaturatedError,
+)
+from app.outbox import ActionOutbox, OutboxDispatcher
+from app.shared_state import SharedRecords
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,15 +66,117 @@ logger = logging.getLogger(__name__)
 # Global voice listener instance
 voice_listener: VoiceListener = None
 
+# Global background listening pipeline, driven by /listen/start and /listen/stop
+continuous_listener: ContinuousListener = None
+
+# Global persistent keyword store; API keyword changes are written there first,
+# and changes made by other server processes are followed from it
+keyword_sync: KeywordSync = None
+
+# Global outbox dispatcher; actions are recorded here before they run
+action_outbox: OutboxDispatcher = None
+
+# Blocking work runs on these pools so the event loop keeps serving requests.
+# There is one microphone, so recognition runs one capture at a time.
+recognition_pool = BlockingPool("recognition", workers=1, max_queue=2)
+trigger_pool = BlockingPool("trigger", workers=4, max_queue=100)
+loop_monitor = LoopLagMonitor()
+
+# Per-endpoint admission control: a few requests wait for a slot, the rest get 503 at once
+listen_limit = ConcurrencyLimit("listen", limit=1, max_queue=4, max_wait=30.0, degrade_at=2)
+test_listen_limit = ConcurrencyLimit("listen_test", limit=16, max_queue=256, max_wait=5.0)
+match_limit = ConcurrencyLimit("match_batch", limit=2, max_queue=16, max_wait=10.0)
+
+# NDJSON transcripts are matched this many lines at a time
+MATCH_CHUNK_LINES = 10_000
+
+# One-shot /listen captures (requests and jobs) in progress; continuous listening
+# must not open the microphone while any is running
+active_captures = 0
+
+# Whisper model for /listen while requests are queued behind it
+DEGRADED_WHISPER_MODEL = "tiny"
+
+# (ETag, serialized body) of the last GET /keywords response
+_keywords_body: tuple[str, bytes] = ("", b"")
+
+# Listener state, recognized text, triggers and keyword changes for GET /events
+event_bus = EventBus()
+
+# Global background recognition jobs, driven by /listen/jobs
+listen_jobs: RecognitionJobs = None
+
+# Number of server worker processes (see app.server); with more than one, action
+# statuses are shared through shared_records and device states are not cached
+server_workers = 1
+shared_records: Optional[SharedRecords] = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    global voice_listener
+    global voice_listener, action_outbox, continuous_listener, keyword_sync, listen_jobs
+    global server_workers, shared_records
     voice_listener = VoiceListener()
+    voice_listener.executor = action_executor
+    voice_listener.debouncer = TriggerDebouncer()
+    action_executor.attach_loop(asyncio.get_running_loop())
+    # Devices may have changed while the server was down
+    device_state_cache.invalidate()
+    server_workers = int(os.environ.get("SOUNDTOACT_WORKERS", "1"))
+    if server_workers > 1:
+        shared_records = SharedRecords(os.environ.get("SOUNDTOACT_SHARED", "shared.db"))
+        action_executor.records = shared_records
+        # Other workers change devices too, so a per-worker cache could skip needed commands
+        action_executor.device_states = None
+    await action_registry.open_http_client()
+    action_outbox = OutboxDispatcher(
+        ActionOutbox(os.environ.get("SOUNDTOACT_OUTBOX", "outbox.db")),
+        action_executor,
+        action_registry,
+    )
+    action_outbox.start()
+    voice_listener.outbox = action_outbox
+    voice_listener.events = event_bus
+    keyword_sync = KeywordSync(
+        KeywordDatabase(os.environ.get("SOUNDTOACT_KEYWORDS", "keywords.db")),
+        action_registry,
+        voice_listener,
+    )
+    start = time.perf_counter()
+    restored = await asyncio.to_thread(keyword_sync.restore)
+    logger.info(
+        f"Restored {restored} keyword mapping(s) in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    keyword_sync.start()
+    if os.environ.get("SOUNDTOACT_DEFAULT_COMMANDS", "0") == "1":
+        for template, action_type in DEFAULT_COMMAND_TEMPLATES:
+            _register_command(template, action_type)
+    continuous_listener = ContinuousListener(voice_listener)
+    listen_jobs = RecognitionJobs(_run_listen_job, events=event_bus, records=shared_records)
+    listen_jobs.start()
+    loop_monitor.start()
     logger.info("VoiceListener initialized")
     yield
     logger.info("Shutting down VoiceListener")
+    if continuous_listener.running:
+        await asyncio.to_thread(continuous_listener.stop, 1.0)
+    await listen_jobs.stop()
+    await loop_monitor.stop()
+    recognition_pool.shutdown()
+    trigger_pool.shutdown()
+    action_outbox.stop()
+    action_outbox.outbox.close()
+    keyword_sync.stop()
+    keyword_sync.db.close()
+    action_executor.detach_loop()
+    action_executor.shutdown(wait=False)
+    if shared_records is not None:
+        action_executor.records = None
+        action_executor.device_states = device_state_cache
+        shared_records.close()
+        shared_records = None
+    await action_registry.close_http_client()
 
 
 app = FastAPI(
@@ -61,32 +206,199 @@ async def root():
     }
 
 
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+# Clients must revalidate, but a 304 is all they get back while nothing changed
+_REVALIDATE = {"Cache-Control": "no-cache"}
+
+
 @app.get("/status", response_model=StatusResponse)
-async def get_status():
-    """Get current listener status"""
+async def get_status(request: Request, response: Response, include_keywords: bool = False):
+    """Get current listener status
+
+    Carries the keyword set's version; the keywords themselves are only
+    included when asked for.
+    """
+    version = keyword_sync.applied
+    store = voice_listener.keyword_actions
+    listening = int(voice_listener.is_listening)
+    etag = f'{keyword_sync.etag[:-1]}-{listening}{"k" if include_keywords else ""}"'
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, **_REVALIDATE})
+    response.headers.update({"ETag": etag, **_REVALIDATE})
     return StatusResponse(
         is_listening=voice_listener.is_listening,
-        registered_keywords=voice_listener.get_registered_keywords(),
+        keywords_version=version,
+        keyword_count=len(store),
+        registered_keywords=list(store) if include_keywords else None,
         message="Voice listener status retrieved successfully",
     )
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Counters from the matching and action pipeline"""
+    return {
+        "executor": {
+            **action_executor.stats,
+            "pending": action_executor.pending,
+            "by_priority": action_executor.queue_stats(),
+        },
+        "coalesce": action_executor.coalescer.snapshot(),
+        "debounce": voice_listener.debouncer.stats() if voice_listener.debouncer else None,
+        "devices": device_state_cache.snapshot(),
+        "outbox": action_outbox.snapshot() if action_outbox else None,
+        "http": action_registry.http_client.snapshot() if action_registry.http_client else None,
+        "pools": {
+            "recognition": recognition_pool.snapshot(),
+            "trigger": trigger_pool.snapshot(),
+        },
+        "admission": {
+            "listen": listen_limit.snapshot(),
+            "listen_test": test_listen_limit.snapshot(),
+            "match_batch": match_limit.snapshot(),
+        },
+        "event_loop": loop_monitor.snapshot(),
+        "events": event_bus.snapshot(),
+        "jobs": listen_jobs.snapshot() if listen_jobs else None,
+        "keywords": keyword_sync.snapshot() if keyword_sync else None,
+        "process": {"pid": os.getpid(), "workers": server_workers},
+    }
+
+
+@app.get("/events")
+async def stream_events(
+    last_event_id: Optional[str] = Header(default=None),
+    since: Optional[int] = Query(default=None, description="Resume after this event ID"),
+):
+    """Stream listener state, recognized text, triggers and keyword changes
+
+    Server-sent events; browsers resume automatically with Last-Event-ID.
+    A ``reset`` event means events were missed and state should be refetched.
+    """
+    if last_event_id is not None:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            # Not one of ours; -1 is never in the history, so the client gets a reset
+            since = -1
+    return StreamingResponse(
+        event_bus.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/circuits")
+async def get_circuits():
+    """Circuit breaker state per action type and the global retry budget"""
+    return action_registry.resilience.snapshot()
+
+
+@app.post("/circuits/{action_type}/reset")
+async def reset_circuit(action_type: str):
+    """Manually close an action type's circuit"""
+    breaker = action_registry.resilience.breakers.get(action_type)
+    if breaker is None:
+        raise HTTPException(status_code=404, detail=f"No circuit for '{action_type}'")
+    breaker.reset()
+    return {"message": f"Circuit '{action_type}' reset", **breaker.snapshot()}
+
+
+def _device_key(action_type: str, target: dict) -> tuple:
+    fields = action_registry.coalesce_targets.get(action_type)
+    if fields is None:
+        raise HTTPException(
+            status_code=400, detail=f"Action type '{action_type}' has no device targets"
+        )
+    missing = [name for name in fields if name not in target]
+    if missing:
+        raise HTTPException(
+            status_code=400, detail=f"Missing target fields: {', '.join(missing)}"
+        )
+    return (action_type, *(target[name] for name in fields))
+
+
+def _require_device_cache() -> None:
+    if shared_records is not None:
+        raise HTTPException(
+            status_code=409,
+            detail="Device states are not cached when the server runs several workers",
+        )
+
+
+@app.get("/devices", response_model=list[DeviceStateResponse])
+async def list_devices():
+    """Cached last-known device states"""
+    _require_device_cache()
+    now = time.monotonic()
+    devices = []
+    for key, entry in device_state_cache.items():
+        fields = action_registry.coalesce_targets.get(key[0], ())
+        devices.append(
+            DeviceStateResponse(
+                action_type=key[0],
+                target=dict(zip(fields, key[1:])),
+                state=dict(entry.state),
+                source=entry.source,
+                age=round(now - entry.updated_at, 3),
+            )
+        )
+    return devices
+
+
+@app.put("/devices")
+async def update_device(update: DeviceStateUpdate):
+    """Record a device state reported by an external system"""
+    _require_device_cache()
+    key = _device_key(update.action_type, update.target)
+    device_state_cache.update(key, update.state, source="external")
+    return {"message": "Device state updated"}
+
+
+@app.post("/devices/invalidate")
+async def invalidate_devices(request: DeviceInvalidate):
+    """Forget cached device states after an external change"""
+    _require_device_cache()
+    if request.action_type is None:
+        count = device_state_cache.invalidate()
+    elif request.target is not None:
+        count = device_state_cache.invalidate(_device_key(request.action_type, request.target))
+    else:
+        count = 0
+        for key, _ in device_state_cache.items():
+            if key[0] == request.action_type:
+                count += device_state_cache.invalidate(key)
+    return {"message": f"Invalidated {count} device state(s)", "invalidated": count}
+
+
 @app.post("/keywords", response_model=KeywordActionResponse)
 async def create_keyword_action(keyword_action: KeywordActionCreate):
     """Register a new keyword-action mapping"""
     try:
-        # Create action from registry
+        _validate_keyword_entries(keyword_action)
+        # Validate params and precompile the action plan
         action = action_registry.create_action(
             keyword_action.action_type, keyword_action.action_params
         )
-
-        # Register with voice listener
-        voice_listener.register_action(keyword_action.keyword, action)
+        # Registering adds to any existing actions for the keyword
+        action_ids = await asyncio.to_thread(
+            keyword_sync.add, [(keyword_action.keyword, action, keyword_action.aliases)]
+        )
 
         return KeywordActionResponse(
             keyword=keyword_action.keyword,
             action_type=keyword_action.action_type,
-            action_params=keyword_action.action_params,
+            action_params=dict(action.action_params) or None,
+            aliases=keyword_action.aliases,
+            action_id=action_ids[0] if action_ids else None,
             is_active=True,
         )
     except ValueError as e:
@@ -96,52 +408,341 @@ async def create_keyword_action(keyword_action: KeywordActionCreate):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _validate_keyword_entries(mapping: KeywordActionCreate) -> None:
+    """Reject a mapping whose keyword or any alias is blank once normalized"""
+    if not all(map(normalize_keyword, [mapping.keyword, *mapping.aliases])):
+        raise ValueError("Keywords and aliases must not be blank")
+
+
+def _build_registrations(mappings: list[KeywordActionCreate]) -> list[tuple]:
+    """Validate every mapping and build its action before anything is applied
+
+    Raises a 400 listing the invalid mappings (up to 100) if any fail.
+    """
+    registrations, errors = [], []
+    for index, mapping in enumerate(mappings):
+        try:
+            _validate_keyword_entries(mapping)
+            action = action_registry.create_action(mapping.action_type, mapping.action_params)
+        except ValueError as e:
+            errors.append({"index": index, "keyword": mapping.keyword, "error": str(e)})
+            continue
+        registrations.append((mapping.keyword, action, mapping.aliases))
+    if errors:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": f"{len(errors)} invalid mapping(s); nothing was applied",
+                "errors": errors[:100],
+            },
+        )
+    return registrations
+
+
+def _bulk_register(mappings: list[KeywordActionCreate], replace: bool) -> KeywordBulkResponse:
+    registrations = _build_registrations(mappings)
+    before = set(voice_listener.keyword_actions)
+    keyword_sync.add(registrations, replace=replace)
+    after = voice_listener.keyword_actions
+    return KeywordBulkResponse(
+        added=sum(1 for keyword in after if keyword not in before),
+        removed=sum(1 for keyword in before if keyword not in after),
+        count=len(after),
+        version=keyword_sync.applied,
+    )
+
+
+@app.post("/keywords/bulk", response_model=KeywordBulkResponse)
+async def create_keyword_actions(request: KeywordBulkCreate):
+    """Register many keyword-action mappings; nothing is applied if any is invalid"""
+    # Validating and building 100k actions is CPU work; keep the loop serving requests
+    return await asyncio.to_thread(_bulk_register, request.keywords, False)
+
+
+@app.put("/keywords", response_model=KeywordBulkResponse)
+async def replace_keyword_actions(request: KeywordBulkCreate):
+    """Atomically replace every keyword-action mapping"""
+    return await asyncio.to_thread(_bulk_register, request.keywords, True)
+
+
+@app.delete("/keywords/bulk", response_model=KeywordBulkResponse)
+async def delete_keywords(request: KeywordBulkDelete):
+    """Delete many keywords at once; unknown keywords are reported, not an error"""
+    removed = await asyncio.to_thread(keyword_sync.remove, request.keywords)
+    found = set(removed)
+    return KeywordBulkResponse(
+        removed=len(removed),
+        missing=list(dict.fromkeys(k for k in request.keywords if normalize_keyword(k) not in found)),
+        count=len(voice_listener.keyword_actions),
+        version=keyword_sync.applied,
+    )
+
+
 @app.get("/keywords", response_model=list[str])
-async def list_keywords():
-    """List all registered keywords"""
-    return voice_listener.get_registered_keywords()
+async def list_keywords(request: Request):
+    """List all registered keywords
+
+    Supports If-None-Match; the body is serialized once per keyword set version.
+    """
+    global _keywords_body
+    etag = keyword_sync.etag
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, **_REVALIDATE})
+    cached_etag, body = _keywords_body
+    if cached_etag != etag:
+        body = json.dumps(voice_listener.get_registered_keywords(), ensure_ascii=False).encode()
+        _keywords_body = (etag, body)
+    return Response(
+        content=body, media_type="application/json", headers={"ETag": etag, **_REVALIDATE}
+    )
+
+
+@app.get("/keywords/search", response_model=list[KeywordSearchResult])
+async def search_keywords(
+    text: str,
+    k: int = Query(default=5, ge=1, le=100),
+    min_score: float = Query(default=0.8, ge=0.0, le=1.0),
+):
+    """Find the top-k registered keywords in a transcript, tolerating small errors"""
+    return [
+        KeywordSearchResult(keyword=keyword, score=score)
+        for keyword, score in voice_listener.search_keywords(text, k, min_score)
+    ]
 
 
 @app.delete("/keywords/{keyword}")
 async def delete_keyword(keyword: str):
     """Delete a keyword-action mapping"""
-    success = voice_listener.unregister_action(keyword)
-    if not success:
+    removed = await asyncio.to_thread(keyword_sync.remove, [keyword])
+    if not removed:
         raise HTTPException(status_code=404, detail=f"Keyword '{keyword}' not found")
     return {"message": f"Keyword '{keyword}' deleted successfully"}
 
 
+def _register_command(
+    template: str,
+    action_type: str,
+    slots: Optional[dict] = None,
+    action_params: Optional[dict] = None,
+):
+    """Register a command template whose matches run as validated action plans"""
+    return voice_listener.register_command(
+        template,
+        action_registry.get_guarded_handler(action_type),
+        action_type=action_type,
+        slots=slots,
+        action_params=action_params,
+        create_action=functools.partial(action_registry.create_action, action_type),
+    )
+
+
+def _command_response(command) -> CommandTemplateResponse:
+    return CommandTemplateResponse(
+        template_id=command.template_id,
+        template=command.template,
+        action_type=command.action_type,
+        slot_names=command.slot_names,
+        action_params=command.action_params or None,
+    )
+
+
+@app.post("/commands", response_model=CommandTemplateResponse)
+async def create_command(command: CommandTemplateCreate):
+    """Register a parameterized command template"""
+    handler = action_registry.get_guarded_handler(command.action_type)
+    if not handler:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown action type: {command.action_type}"
+        )
+    try:
+        entry = _register_command(
+            command.template, command.action_type, command.slots, command.action_params
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _command_response(entry)
+
+
+@app.get("/commands", response_model=list[CommandTemplateResponse])
+async def list_commands():
+    """List all registered command templates"""
+    return [_command_response(c) for c in voice_listener.grammar.templates.values()]
+
+
+@app.delete("/commands/{template_id}")
+async def delete_command(template_id: int):
+    """Delete a command template"""
+    if not voice_listener.unregister_command(template_id):
+        raise HTTPException(
+            status_code=404, detail=f"Command template {template_id} not found"
+        )
+    return {"message": f"Command template {template_id} deleted successfully"}
+
+
 @app.post("/listen", response_model=ListenResponse)
 async def listen(request: ListenRequest):
     """Listen for voice input once"""
+    busy = HTTPException(status_code=409, detail="Continuous listening is using the microphone")
+    if continuous_listener.running:
+        raise busy
+    try:
+        async with listen_limit.admit():
+            # Continuous listening may have started while this request was queued
+            if continuous_listener.running:
+                raise busy
+            degraded = listen_limit.under_pressure
+            if degraded:
+                listen_limit.stats["degraded"] += 1
+            return await _listen_once(request, degraded)
+    except HTTPException:
+        raise
+    except PoolSaturatedError as e:
+        raise _unavailable(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during listening: {e}")
+        raise HTTPException(status_code=500, detail="Error during voice recognition")
+
+
+def _unavailable(error: PoolSaturatedError) -> HTTPException:
+    return HTTPException(
+        status_code=503, detail=str(error), headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+async def _listen_once(request: ListenRequest, degraded: bool = False) -> ListenResponse:
+    """Capture one phrase, recognize it and fire its actions
+
+    ``degraded`` recognizes with the cheaper ``DEGRADED_WHISPER_MODEL``.
+    """
+    global active_captures
+    active_captures += 1
     try:
         # Initialize microphone if needed
         if not voice_listener.microphone:
-            voice_listener.initialize()
+            await recognition_pool.run(voice_listener.initialize)
 
         # Listen for input
-        text = voice_listener.listen_once(
-            timeout=request.timeout, phrase_time_limit=request.phrase_time_limit
+        options = {"whisper_model": DEGRADED_WHISPER_MODEL} if degraded else {}
+        hypotheses = await recognition_pool.run(
+            voice_listener.listen_nbest,
+            timeout=request.timeout,
+            phrase_time_limit=request.phrase_time_limit,
+            **options,
         )
+    finally:
+        active_captures -= 1
 
-        # Check for keyword triggers
-        triggered, messages = voice_listener.check_keywords(text) if text else ([], [])
+    # Check for keyword triggers across all hypotheses
+    result = await _trigger(hypotheses)
+    messages, pending = await _collect_actions(result, request.action_wait)
 
-        return ListenResponse(
-            recognized_text=text,
-            triggered_keywords=triggered,
-            action_messages=messages,
-            success=True
-        )
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error during listening: {e}")
-        raise HTTPException(status_code=500, detail="Error during voice recognition")
+    return ListenResponse(
+        recognized_text=hypotheses[0].text if hypotheses else "",
+        triggered_keywords=result.triggered,
+        action_messages=messages,
+        hypotheses=[
+            RecognitionHypothesis(text=h.text, score=h.score) for h in hypotheses
+        ],
+        pending_action_ids=pending,
+        degraded=degraded,
+        success=True
+    )
+
+
+async def _run_listen_job(job: RecognitionJob) -> ListenResponse:
+    """Run a queued /listen request, waiting its turn when /listen calls fill the pool"""
+    while True:
+        if continuous_listener.running:
+            raise RuntimeError("Continuous listening is using the microphone")
+        try:
+            return await _listen_once(job.request)
+        except PoolSaturatedError:
+            await asyncio.sleep(0.5)
+
+
+def _job_response(job: RecognitionJob) -> ListenJobResponse:
+    return ListenJobResponse(**job.to_dict())
+
+
+@app.post("/listen/jobs", response_model=ListenJobResponse, status_code=202)
+async def create_listen_job(
+    request: ListenRequest,
+    http_request: Request,
+    response: Response,
+    x_tenant_id: Optional[str] = Header(default=None),
+):
+    """Queue a recognition and return its job ID at once
+
+    Jobs are taken round-robin across tenants (``X-Tenant-ID``, by default
+    the client address). Follow progress with GET /listen/jobs/{job_id} or
+    the ``job`` events on /events.
+    """
+    tenant = x_tenant_id or (http_request.client.host if http_request.client else "default")
+    try:
+        job = listen_jobs.submit(tenant, request)
+    except TenantJobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    if job.recorded is not None:
+        # Let every worker find the job before its ID is handed out
+        await asyncio.wrap_future(job.recorded)
+    response.headers["Location"] = f"/listen/jobs/{job.job_id}"
+    return _job_response(job)
+
+
+@app.get("/listen/jobs/{job_id}", response_model=ListenJobResponse)
+async def get_listen_job(
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=30, description="Seconds to wait for the job to finish"),
+):
+    """Get a recognition job's status, and its result once finished"""
+    job = listen_jobs.get(job_id)
+    if job is None:
+        return await _shared_job_response(job_id, wait)
+    if wait and not job.done:
+        try:
+            await asyncio.wait_for(job.finished.wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+    return _job_response(job)
+
+
+async def _shared_job_response(job_id: str, wait: float) -> ListenJobResponse:
+    """A job held by another worker, read from the shared records"""
+    record = await listen_jobs.wait_shared(job_id, wait)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return ListenJobResponse(**record)
+
+
+@app.delete("/listen/jobs/{job_id}")
+async def cancel_listen_job(job_id: str, response: Response):
+    """Cancel a recognition job that has not started
+
+    A job queued on another worker is cancelled by that worker when it
+    reaches the job, so the request is only accepted (202) here.
+    """
+    job = listen_jobs.get(job_id)
+    if job is None:
+        record = await listen_jobs.shared(job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        if not await listen_jobs.request_cancel(job_id):
+            raise HTTPException(
+                status_code=409, detail=f"Job '{job_id}' is already {record['status']}"
+            )
+        response.status_code = 202
+        return {"message": f"Cancellation of job '{job_id}' requested"}
+    if not listen_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is already {job.status}")
+    return {"message": f"Job '{job_id}' cancelled"}
 
 
 @app.post("/listen/test")
-async def test_listen(text: str):
+async def test_listen(text: str, action_wait: float = Query(default=0.5, ge=0, le=30)):
     """
     Test endpoint - simulate voice recognition without actual microphone
     Usage: POST /listen/test?text=엄마
@@ -149,37 +750,236 @@ async def test_listen(text: str):
     logger.info(f"Test mode: simulating recognition of '{text}'")
 
     # Check for keyword triggers
-    triggered, messages = voice_listener.check_keywords(text.lower()) if text else ([], [])
+    try:
+        async with test_listen_limit.admit():
+            result = await _trigger(text.lower())
+    except PoolSaturatedError as e:
+        raise _unavailable(e)
+    messages, pending = await _collect_actions(result, action_wait)
 
     return ListenResponse(
         recognized_text=text.lower(),
-        triggered_keywords=triggered,
+        triggered_keywords=result.triggered,
         action_messages=messages,
+        pending_action_ids=pending,
         success=True
     )
 
 
+@app.post(
+    "/match/batch",
+    response_model=MatchBatchResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": MatchBatchRequest.model_json_schema()},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def match_batch(
+    request: Request,
+    dry_run: bool = Query(default=False, description="Only report matches; run no actions"),
+):
+    """Match many transcripts at once, e.g. to validate keywords against history
+
+    Send ``{"transcripts": [...]}`` as JSON for a response with one list of
+    matches per transcript, or ``application/x-ndjson`` (one JSON string, or
+    object with ``text`` and optional ``id``, per line) to stream back one
+    ``{"line", "keywords"}`` object per input line as it is matched.
+
+    Without ``dry_run``, every distinct action matched anywhere in the
+    batch runs once, after its chunk is matched.
+    """
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        try:
+            match_limit.check()
+        except OverloadedError as e:
+            raise _unavailable(e)
+        # Read up front: while streaming, the response may watch the connection for disconnects
+        lines = (await request.body()).split(b"\n")
+        return StreamingResponse(_match_ndjson(lines, dry_run), media_type="application/x-ndjson")
+
+    try:
+        body = MatchBatchRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+    fired: set = set()
+    try:
+        async with match_limit.admit():
+            matches = await asyncio.to_thread(
+                voice_listener.match_batch, body.transcripts, dry_run, fired
+            )
+    except PoolSaturatedError as e:
+        raise _unavailable(e)
+    # Serialized directly: validating a million small lists costs more than matching them
+    content = json.dumps(
+        {
+            "matches": matches,
+            "lines": len(matches),
+            "matched": sum(1 for found in matches if found),
+            "dry_run": dry_run,
+            "dispatched": len(fired),
+        },
+        ensure_ascii=False,
+    )
+    return Response(content=content, media_type="application/json")
+
+
+def _parse_ndjson(lines: list[bytes]) -> list:
+    """Parse NDJSON lines; a line that does not parse becomes its ValueError"""
+    try:
+        # One parse for the whole chunk. Lines could only be misaligned by
+        # nesting them inside a container, so an all-string result lines up.
+        items = json.loads(b"[" + b",".join(lines) + b"]")
+        if len(items) == len(lines) and all(type(item) is str for item in items):
+            return items
+    except ValueError:
+        pass
+    items = []
+    for raw in lines:
+        try:
+            items.append(json.loads(raw))
+        except ValueError as e:
+            items.append(e)
+    return items
+
+
+def _match_ndjson_lines(lines: list[bytes], first_line: int, dry_run: bool, fired: set) -> str:
+    """Parse and match one chunk of NDJSON lines, returning the output lines"""
+    numbered = [(number, raw) for number, raw in enumerate(lines, first_line) if raw.strip()]
+    items = _parse_ndjson([raw for _, raw in numbered])
+    out: list[Optional[str]] = []
+    texts, parsed = [], []
+    for (number, _), item in zip(numbered, items):
+        if type(item) is str:
+            texts.append(item)
+            parsed.append((len(out), number, None))
+            out.append(None)
+        elif isinstance(item, dict) and isinstance(item.get("text"), str):
+            texts.append(item["text"])
+            parsed.append((len(out), number, item.get("id")))
+            out.append(None)
+        else:
+            error = item if isinstance(item, ValueError) else "expected a string or an object with a text string"
+            out.append(json.dumps({"line": number, "error": f"Invalid line: {error}"}))
+    matches = voice_listener.match_batch(texts, dry_run, fired)
+    for (position, number, item_id), found in zip(parsed, matches):
+        if item_id is not None:
+            out[position] = json.dumps(
+                {"line": number, "keywords": found, "id": item_id}, ensure_ascii=False
+            )
+        elif found:
+            out[position] = f'{{"line": {number}, "keywords": {json.dumps(found, ensure_ascii=False)}}}'
+        else:
+            out[position] = f'{{"line": {number}, "keywords": []}}'
+    return "".join(f"{line}\n" for line in out)
+
+
+async def _match_ndjson(lines: list[bytes], dry_run: bool) -> AsyncIterator[str]:
+    """Match NDJSON lines a chunk at a time, yielding each chunk's output when ready"""
+    # Shared by the chunks, so an action matched in several chunks still runs once
+    fired: set = set()
+    for first in range(0, len(lines), MATCH_CHUNK_LINES):
+        batch = lines[first:first + MATCH_CHUNK_LINES]
+        first_line = first + 1
+        try:
+            async with match_limit.admit():
+                output = await asyncio.to_thread(
+                    _match_ndjson_lines, batch, first_line, dry_run, fired
+                )
+        except OverloadedError as e:
+            # Too late for a status code; say why the output stops here
+            yield json.dumps({"line": first_line, "error": str(e)}) + "\n"
+            return
+        yield output
+
+
+async def _trigger(text) -> TriggerResult:
+    """Match a transcript and fire its actions off the event loop
+
+    Firing waits for outbox commits, so it runs on the trigger pool.
+    """
+    if not text:
+        return TriggerResult([], [], [])
+    return await trigger_pool.run(voice_listener.trigger, text)
+
+
+async def _collect_actions(result: TriggerResult, wait: float) -> tuple[list[str], list[str]]:
+    """Wait up to ``wait`` seconds for submitted actions
+
+    Returns the messages of actions that finished in time and the IDs of
+    those still pending.
+    """
+    if result.handles and wait > 0:
+        await asyncio.wait(
+            [asyncio.wrap_future(h.future) for h in result.handles], timeout=wait
+        )
+    messages = list(result.messages)
+    pending = []
+    for handle in result.handles:
+        if not handle.done:
+            pending.append(handle.action_id)
+        elif handle.message:
+            messages.append(handle.message)
+    return messages, pending
+
+
+@app.get("/actions", response_model=list[ActionStatusResponse])
+async def list_actions(limit: int = Query(default=50, ge=1, le=1000)):
+    """List recently submitted actions, newest first"""
+    if shared_records is not None:
+        # Every worker's actions, not just this one's
+        records = await asyncio.to_thread(shared_records.recent, "action", limit)
+        return [ActionStatusResponse(**a) for a in records]
+    return [ActionStatusResponse(**h.to_dict()) for h in action_executor.recent(limit)]
+
+
+@app.get("/actions/{action_id}", response_model=ActionStatusResponse)
+async def get_action(action_id: str):
+    """Get the status and result of a submitted action"""
+    handle = action_executor.get(action_id)
+    if handle is not None:
+        return ActionStatusResponse(**handle.to_dict())
+    # Possibly started by another worker
+    shared = None
+    if shared_records is not None:
+        shared = await asyncio.to_thread(shared_records.get, "action", action_id)
+    if shared is None:
+        raise HTTPException(status_code=404, detail=f"Action '{action_id}' not found")
+    return ActionStatusResponse(**shared)
+
+
 @app.post("/listen/start")
 async def start_listening():
-    """Start continuous listening (background task)"""
-    if voice_listener.is_listening:
+    """Start continuous listening in the background"""
+    if continuous_listener.running:
         raise HTTPException(status_code=400, detail="Already listening")
+    if active_captures:
+        raise HTTPException(status_code=409, detail="A /listen capture is using the microphone")
 
-    # Note: In production, this should run in a background task
-    # For now, just return a message
-    return {
-        "message": "Continuous listening would start here. Use /listen endpoint for single recognition."
-    }
+    continuous_listener.start()
+    return {"message": "Started listening", **continuous_listener.status()}
 
 
 @app.post("/listen/stop")
 async def stop_listening():
     """Stop continuous listening"""
-    if not voice_listener.is_listening:
+    if not continuous_listener.running:
         raise HTTPException(status_code=400, detail="Not currently listening")
 
-    voice_listener.stop_listening()
-    return {"message": "Stopped listening"}
+    # Waits for a capture in progress to end, so keep it off the event loop
+    timeout = continuous_listener.timeout + continuous_listener.phrase_time_limit
+    await asyncio.to_thread(continuous_listener.stop, timeout)
+    return {"message": "Stopped listening", **continuous_listener.status()}
+
+
+@app.get("/listen/status", response_model=ContinuousStatusResponse)
+async def listening_status():
+    """Throughput, queue depth and health of continuous listening"""
+    return ContinuousStatusResponse(**continuous_listener.status())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""
+Coalescing of burst actions aimed at the same target
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Sequence
+
+
+class ActionCoalescer:
+    """Holds actions for a short window and flushes each target's burst at once
+
+    An action type is coalesced when it declares target fields, e.g.
+    ``{"lights": ("room",)}``: actions of that type with the same values for
+    those fields belong to one group. The first action of a group opens a
+    window of ``window`` seconds (or the type's entry in ``windows``); later
+    actions join it, and when the window closes ``on_flush`` receives the
+    whole group in arrival order. Since every action carries the complete
+    desired state, the last one is the merged final state.
+    """
+
+    def __init__(
+        self,
+        on_flush: Callable[[list], None],
+        targets: Optional[Dict[str, Sequence[str]]] = None,
+        window: float = 0.1,
+        windows: Optional[Dict[str, float]] = None,
+    ):
+        self.on_flush = on_flush
+        self.targets: Dict[str, Sequence[str]] = targets if targets is not None else {}
+        self.window = window
+        self.windows: Dict[str, float] = dict(windows or {})
+        self._groups: Dict[Hashable, list] = {}
+        self._deadlines: list[tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.stats = {"groups": 0, "actions": 0, "merged": 0}
+        self.merged_by_type: Dict[str, int] = {}
+
+    def target_key(self, action_type: str, params: Optional[Mapping[str, Any]]) -> Optional[tuple]:
+        """Group key for an action, or None when its type is not coalesced"""
+        fields = self.targets.get(action_type)
+        if fields is None or params is None:
+            return None
+        return (action_type, *(params.get(field) for field in fields))
+
+    def offer(self, key: tuple, item: Any) -> None:
+        """Add an action to its target's group, opening a window if needed"""
+        action_type = key[0]
+        with self._cond:
+            self._ensure_started()
+            group = self._groups.get(key)
+            if group is not None:
+                group.append(item)
+                return
+            self._groups[key] = [item]
+            deadline = time.monotonic() + self.windows.get(action_type, self.window)
+            heapq.heappush(self._deadlines, (deadline, next(self._seq), key))
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Flush every open group now"""
+        with self._cond:
+            groups = list(self._groups.items())
+            self._groups.clear()
+            self._deadlines.clear()
+        for key, group in groups:
+            self._emit(key, group)
+
+    def close(self) -> None:
+        """Flush open groups and stop the timer thread; it restarts on the next offer"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(group) for group in self._groups.values())
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                **self.stats,
+                "merged_by_type": dict(self.merged_by_type),
+                "open_groups": len(self._groups),
+            }
+
+    def _ensure_started(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch, name="action-coalescer", daemon=True)
+        self._thread.start()
+
+    def _emit(self, key: tuple, group: list) -> None:
+        with self._cond:
+            self.stats["groups"] += 1
+            self.stats["actions"] += len(group)
+            self.stats["merged"] += len(group) - 1
+            if len(group) > 1:
+                self.merged_by_type[key[0]] = self.merged_by_type.get(key[0], 0) + len(group) - 1
+        self.on_flush(group)
+
+    def _watch(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                due = []
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, _, key = heapq.heappop(self._deadlines)
+                    due.append((key, self._groups.pop(key)))
+                if not due:
+                    wait = self._deadlines[0][0] - now if self._deadlines else None
+                    self._cond.wait(wait)
+                    continue
+            for key, group in due:
+                self._emit(key, group)
@@ -0,0 +1,188 @@
+"""
+Background continuous listening pipeline
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from app.voice_listener import VoiceListener
+
+logger = logging.getLogger(__name__)
+
+
+class ContinuousListener:
+    """Runs capture → recognition → match → act in the background
+
+    A capture thread records phrases into a bounded queue and a recognition
+    thread turns them into hypotheses and fires their actions, so speech is
+    still captured while the previous phrase is being recognized. When the
+    queue is full the oldest phrase is dropped rather than falling behind.
+
+    If capturing fails (e.g. the microphone disappears) the microphone is
+    reinitialized after an exponentially growing delay, capped at
+    ``max_restart_delay``.
+    """
+
+    def __init__(
+        self,
+        listener: VoiceListener,
+        timeout: int = 5,
+        phrase_time_limit: int = 5,
+        max_queue: int = 4,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+    ):
+        self.listener = listener
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_queue = max_queue
+        self._audio: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque()
+        self.state = "stopped"
+        self.started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_text: Optional[str] = None
+        self.recognition_ms_total = 0.0
+        self.stats = {
+            "captured": 0,
+            "recognized": 0,
+            "triggered": 0,
+            "dropped": 0,
+            "errors": 0,
+            "restarts": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        if self.listener.events is not None:
+            self.listener.events.publish(
+                "listener", {"state": state, "is_listening": state != "stopped"}
+            )
+
+    def start(self) -> None:
+        """Start the pipeline threads"""
+        with self._lock:
+            if self._threads:
+                raise RuntimeError("Continuous listening is already running")
+            # Fresh per run, so threads of a previous run still finishing a capture stay out
+            self._stop = stop = threading.Event()
+            self._audio = audio = queue.Queue(maxsize=self.max_queue)
+            self.started_at = time.time()
+            self._set_state("starting")
+            self._threads = [
+                threading.Thread(
+                    target=self._capture_loop, args=(stop, audio), name="listen-capture", daemon=True
+                ),
+                threading.Thread(
+                    target=self._recognize_loop, args=(stop, audio), name="listen-recognize", daemon=True
+                ),
+            ]
+            for thread in self._threads:
+                thread.start()
+        self.listener.is_listening = True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the pipeline; waits for an in-progress capture to end"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stop.set()
+        for thread in threads:
+            thread.join(timeout)
+        self._set_state("stopped")
+        self.listener.is_listening = False
+
+    def _offer(self, audio_queue: queue.Queue, item) -> None:
+        """Queue an item, dropping the oldest waiting phrase when full"""
+        while True:
+            try:
+                audio_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    audio_queue.get_nowait()
+                    self.stats["dropped"] += 1
+                except queue.Empty:
+                    pass
+
+    def _capture_loop(self, stop: threading.Event, audio_queue: queue.Queue) -> None:
+        delay = self.restart_delay
+        while not stop.is_set():
+            try:
+                if not self.listener.microphone:
+                    self.listener.initialize()
+                if not stop.is_set():
+                    self._set_state("running")
+                audio = self.listener.capture(self.timeout, self.phrase_time_limit)
+                delay = self.restart_delay
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.stats["restarts"] += 1
+                self.last_error = str(e)
+                if not stop.is_set():
+                    self._set_state("restarting")
+                logger.error(f"Capture failed, restarting in {delay:.1f}s: {e}")
+                self.listener.microphone = None
+                if stop.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_restart_delay)
+                continue
+            if audio is None:
+                continue
+            self.stats["captured"] += 1
+            # Keep up with live speech rather than recognizing stale phrases
+            self._offer(audio_queue, audio)
+        self._offer(audio_queue, None)
+
+    def _recognize_loop(self, stop: threading.Event, audio_queue: queue.Queue) -> None:
+        while True:
+            audio = audio_queue.get()
+            if audio is None or stop.is_set():
+                return
+            try:
+                start = time.perf_counter()
+                hypotheses = self.listener.recognize_nbest(audio)
+                self.recognition_ms_total += (time.perf_counter() - start) * 1000
+                if not hypotheses:
+                    continue
+                self.stats["recognized"] += 1
+                self.last_text = hypotheses[0].text
+                self._recent.append(time.monotonic())
+                result = self.listener.trigger(hypotheses)
+                self.stats["triggered"] += len(result.triggered)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.last_error = str(e)
+                logger.error(f"Recognition failed: {e}")
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        recognized = self.stats["recognized"]
+        return {
+            "running": self.running,
+            "state": self.state,
+            "started_at": self.started_at,
+            "queue_depth": self._audio.qsize(),
+            "phrases_per_minute": len(self._recent),
+            "avg_recognition_ms": round(self.recognition_ms_total / recognized, 3)
+            if recognized
+            else None,
+            "last_text": self.last_text,
+            "last_error": self.last_error,
+            **self.stats,
+        }
@@ -0,0 +1,112 @@
+"""
+Trigger debouncing and duplicate suppression
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, Optional
+
+
+def params_key(action_type: str, params: Optional[dict]) -> tuple:
+    """Normalized, hashable identity of an action invocation"""
+    if not params:
+        return (action_type,)
+    return (action_type, repr(sorted(params.items())))
+
+
+class TriggerDebouncer:
+    """Suppresses repeated triggers inside configurable time windows
+
+    Two layers are checked: the same normalized keyword firing again within
+    ``keyword_window`` seconds (an echo or a repeated utterance), and the
+    same action type with the same params firing again within its action
+    window, even when reached through a different keyword or alias.
+
+    Last-fire times live in a dict for O(1) checks. Keys are also filed in
+    one-second buckets so expired entries are dropped a bucket at a time,
+    keeping memory bounded by the number of keys seen in the longest window.
+    """
+
+    def __init__(
+        self,
+        keyword_window: float = 2.0,
+        action_window: float = 5.0,
+        action_windows: Optional[Dict[str, float]] = None,
+        bucket_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.keyword_window = keyword_window
+        self.action_window = action_window
+        self.action_windows: Dict[str, float] = dict(action_windows or {})
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._last: Dict[Hashable, float] = {}
+        self._buckets: deque[tuple[int, list]] = deque()
+        self._lock = threading.Lock()
+        self.suppressed_keywords: Dict[str, int] = {}
+        self.suppressed_actions: Dict[str, int] = {}
+        self.allowed = 0
+
+    def _max_window(self) -> float:
+        return max([self.keyword_window, self.action_window, *self.action_windows.values()])
+
+    def _check(self, key: Hashable, window: float, now: float) -> bool:
+        last = self._last.get(key)
+        if last is not None and now - last < window:
+            return False
+        self._last[key] = now
+        bucket = int(now // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] != bucket:
+            self._buckets.append((bucket, []))
+        self._buckets[-1][1].append(key)
+        return True
+
+    def _expire(self, now: float) -> None:
+        oldest_live = int((now - self._max_window()) // self.bucket_seconds)
+        while self._buckets and self._buckets[0][0] < oldest_live:
+            _, keys = self._buckets.popleft()
+            for key in keys:
+                last = self._last.get(key)
+                if last is not None and int(last // self.bucket_seconds) < oldest_live:
+                    del self._last[key]
+
+    def allow_keyword(self, keyword: str) -> bool:
+        """Whether a keyword may fire now; records the firing if so"""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if self._check(("keyword", keyword), self.keyword_window, now):
+                return True
+            self.suppressed_keywords[keyword] = self.suppressed_keywords.get(keyword, 0) + 1
+            return False
+
+    def allow_action(self, action_type: str, params: Optional[dict] = None) -> bool:
+        """Whether an action with these params may run now; records it if so"""
+        window = self.action_windows.get(action_type, self.action_window)
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if self._check(("action", *params_key(action_type, params)), window, now):
+                self.allowed += 1
+                return True
+            self.suppressed_actions[action_type] = (
+                self.suppressed_actions.get(action_type, 0) + 1
+            )
+            return False
+
+    def reset(self) -> None:
+        """Forget all recorded triggers"""
+        with self._lock:
+            self._last.clear()
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "suppressed_keywords": dict(self.suppressed_keywords),
+                "suppressed_actions": dict(self.suppressed_actions),
+                "suppressed_total": sum(self.suppressed_keywords.values())
+                + sum(self.suppressed_actions.values()),
+                "tracked_keys": len(self._last),
+            }
@@ -0,0 +1,87 @@
+"""
+Last-known device state cache
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Mapping, NamedTuple, Optional
+
+
+class DeviceState(NamedTuple):
+    """Cached state of one device and where it came from"""
+
+    state: Mapping[str, Any]
+    updated_at: float
+    source: str
+
+
+class DeviceStateCache:
+    """Remembers the last-known state of each device for ``ttl`` seconds
+
+    Devices are keyed by their action type and target values, e.g.
+    ``("lights", "거실")``. Entries are written after a command succeeds or
+    when an external update is reported, and dropped when they expire or
+    when the device's state becomes uncertain (a command is in flight or
+    failed), so a stale entry never hides a needed command.
+    """
+
+    def __init__(self, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._states: Dict[Hashable, DeviceState] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "updates": 0, "invalidations": 0, "expired": 0}
+
+    def get(self, device: Hashable) -> Optional[DeviceState]:
+        """Cached state of a device, or None if unknown or expired"""
+        with self._lock:
+            return self._live(device)
+
+    def _live(self, device: Hashable) -> Optional[DeviceState]:
+        entry = self._states.get(device)
+        if entry is not None and self._clock() - entry.updated_at >= self.ttl:
+            del self._states[device]
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def satisfies(self, device: Hashable, desired: Mapping[str, Any]) -> bool:
+        """Whether the device is known to already be in the desired state"""
+        with self._lock:
+            entry = self._live(device)
+            hit = entry is not None and all(
+                entry.state.get(name) == value for name, value in desired.items()
+            )
+            self.stats["hits" if hit else "misses"] += 1
+            return hit
+
+    def update(self, device: Hashable, state: Mapping[str, Any], source: str = "action") -> None:
+        """Record a device's state, merged over what is already known"""
+        with self._lock:
+            entry = self._live(device)
+            merged = {**entry.state, **state} if entry is not None else dict(state)
+            self._states[device] = DeviceState(merged, self._clock(), source)
+            self.stats["updates"] += 1
+
+    def invalidate(self, device: Optional[Hashable] = None) -> int:
+        """Forget one device, or every device when none is given; returns how many"""
+        with self._lock:
+            if device is None:
+                count = len(self._states)
+                self._states.clear()
+            else:
+                count = 1 if self._states.pop(device, None) is not None else 0
+            self.stats["invalidations"] += count
+            return count
+
+    def items(self) -> list[tuple[Hashable, DeviceState]]:
+        """Live (device, state) pairs"""
+        with self._lock:
+            return [(d, e) for d in list(self._states) if (e := self._live(d)) is not None]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "devices": len(self._states)}
+
+
+# Global device state cache instance
+device_state_cache = DeviceStateCache()
@@ -0,0 +1,120 @@
+"""
+Server-sent event stream
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, NamedTuple, Optional
+
+
+class Event(NamedTuple):
+    """One published event; ``id`` increases by one per event"""
+
+    id: int
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        """Format as a server-sent event"""
+        data = json.dumps(self.data, ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+class EventBus:
+    """Fans events out to any number of streaming clients
+
+    ``publish`` may be called from any thread. Recent events are kept in a
+    bounded history so a reconnecting client can resume from the last ID it
+    saw. When that ID is no longer in the history (too old, or from before a
+    restart) the client gets a ``reset`` event and should refetch its state.
+
+    Idle subscribers sleep on an ``asyncio.Event`` and only wake for new
+    events or a keepalive comment, so open streams cost nothing between
+    events.
+    """
+
+    def __init__(self, history: int = 1000, keepalive: float = 15.0, retry_ms: int = 3000):
+        self.keepalive = keepalive
+        self.retry_ms = retry_ms
+        self._history: deque[Event] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        # Start from the clock so IDs from before a restart are never mistaken for new ones
+        self._last_id = int(time.time() * 1000)
+        self._subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.stats = {"published": 0, "resets": 0}
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        """Record an event and wake every subscriber"""
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data)
+            self._history.append(event)
+            self.stats["published"] += 1
+            subscribers = list(self._subscribers)
+        for loop, wake in subscribers:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # The subscriber's loop is closed; its stream is already gone
+                pass
+        return event
+
+    def since(self, last_id: int) -> Optional[list[Event]]:
+        """Events after ``last_id``, or None if some of them are no longer kept"""
+        with self._lock:
+            if last_id > self._last_id:
+                return None
+            if last_id == self._last_id:
+                return []
+            if not self._history or last_id < self._history[0].id - 1:
+                return None
+            start = last_id - self._history[0].id + 1
+            return list(itertools.islice(self._history, start, None))
+
+    async def stream(self, last_id: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield encoded events after ``last_id`` (or from now) until cancelled"""
+        wake = asyncio.Event()
+        subscriber = (asyncio.get_running_loop(), wake)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if last_id is None:
+                last_id = self._last_id
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                # Clear before reading so a publish in between still wakes us
+                wake.clear()
+                events = self.since(last_id)
+                if events is None:
+                    self.stats["resets"] += 1
+                    last_id = self._last_id
+                    yield Event(last_id, "reset", {"last_id": last_id}).encode()
+                    continue
+                for event in events:
+                    last_id = event.id
+                    yield event.encode()
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(wake.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "subscribers": len(self._subscribers),
+                "last_id": self._last_id,
+                "history": len(self._history),
+            }
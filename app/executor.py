@@ -0,0 +1,599 @@
+"""
+Asynchronous action executor
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from app.actions import (
+    PRIORITY_EMERGENCY,
+    PRIORITY_NORMAL,
+    action_registry,
+    current_idempotency_key,
+    is_async_action,
+    resolve_result,
+)
+from app.coalesce import ActionCoalescer
+from app.device_state import DeviceStateCache, device_state_cache
+from app.shared_state import SharedRecords
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the executor queue is full"""
+
+
+class ActionHandle:
+    """Handle for one submitted action
+
+    ``future`` resolves with the handle itself once the action succeeded,
+    failed or timed out, so callers can wait on it from threads or (through
+    ``asyncio.wrap_future``) from the event loop.
+    """
+
+    def __init__(
+        self,
+        action: Callable,
+        keyword: str,
+        action_type: str,
+        timeout: float,
+        priority: int = PRIORITY_NORMAL,
+        idempotency_key: Optional[str] = None,
+    ):
+        self.action_id = uuid.uuid4().hex[:12]
+        self.action = action
+        self.keyword = keyword
+        self.action_type = action_type
+        self.timeout = timeout
+        self.priority = priority
+        self.idempotency_key = idempotency_key
+        self.status = "pending"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.coalesced_into: Optional[str] = None
+        self.future: Future = Future()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def message(self) -> Optional[str]:
+        """The ``message`` field of a successful dict result"""
+        if isinstance(self.result, dict):
+            return self.result.get("message")
+        return None
+
+    def wait(self, timeout: Optional[float] = None) -> "ActionHandle":
+        """Block until the action finishes"""
+        return self.future.result(timeout)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        with self._lock:
+            if self.future.done():
+                return False
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+        self.future.set_result(self)
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "action_id": self.action_id,
+            "keyword": self.keyword,
+            "action_type": self.action_type,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "coalesced_into": self.coalesced_into,
+        }
+
+
+class PriorityActionQueue:
+    """Bounded priority queue of action handles with room kept for the top class
+
+    Handles come out lowest priority value first, FIFO within a class.
+    Lower classes are refused once ``maxsize - reserved_slots`` handles are
+    waiting, so the top class can still be queued when the rest is backed up.
+    """
+
+    def __init__(self, maxsize: int, reserved_slots: int = 0, top_priority: int = PRIORITY_EMERGENCY):
+        self.maxsize = maxsize
+        self.reserved_slots = min(reserved_slots, maxsize)
+        self.top_priority = top_priority
+        self._heap: list[tuple[int, int, ActionHandle]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.generation = 0
+
+    def put_nowait(self, handle: ActionHandle) -> None:
+        with self._cond:
+            limit = self.maxsize
+            if handle.priority > self.top_priority:
+                limit -= self.reserved_slots
+            if len(self._heap) >= limit:
+                raise queue.Full
+            heapq.heappush(self._heap, (handle.priority, next(self._seq), handle))
+            self._cond.notify_all()
+
+    def get(self, top_only: bool = False, generation: int = 0) -> Optional[ActionHandle]:
+        """Next handle (only top-class ones if ``top_only``)
+
+        Returns None once the queue is closed and drained, or reopened for a
+        newer ``generation`` of consumers.
+        """
+        with self._cond:
+            while True:
+                if generation != self.generation:
+                    return None
+                if self._heap and (not top_only or self._heap[0][0] <= self.top_priority):
+                    return heapq.heappop(self._heap)[2]
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Let consumers finish what is queued and then stop"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> int:
+        """Accept consumers again; returns their generation"""
+        with self._cond:
+            self._closed = False
+            self.generation += 1
+            self._cond.notify_all()
+            return self.generation
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def depth_by_priority(self) -> Dict[int, int]:
+        with self._cond:
+            depth: Dict[int, int] = {}
+            for priority, _, _ in self._heap:
+                depth[priority] = depth.get(priority, 0) + 1
+            return depth
+
+
+class ActionExecutor:
+    """Bounded worker pool that runs action callables off the caller's thread
+
+    Submitted actions wait in a bounded priority queue and run on
+    ``max_workers`` threads, highest class (lowest ``priorities`` value)
+    first. ``reserved_workers`` extra threads and ``reserved_pending`` queue
+    slots serve only ``PRIORITY_EMERGENCY`` actions, so an emergency call
+    starts promptly even when routine actions have every other worker
+    busy. Each action type has its own timeout; an action that overruns it
+    is reported as ``timeout`` and its late result is discarded (the worker
+    thread itself cannot be interrupted). Finished handles are kept in a
+    bounded history for lookup by action ID.
+
+    Once an event loop is attached, async actions skip the thread pool and
+    are awaited on that loop instead, up to ``max_async`` at a time, and a
+    timeout cancels them.
+
+    Action types listed in ``coalesce_targets`` are held for
+    ``coalesce_window`` seconds and bursts aimed at the same target run as
+    one action: the last one, carrying the final state. The other handles
+    finish with its outcome and point at it through ``coalesced_into``.
+
+    For ``idempotent`` action types with targets, ``device_states`` is
+    consulted first: an action asking for the state its device is already
+    known to be in finishes at once as skipped. The cache is only written
+    once every command in flight for a device has finished, by the last
+    one to finish, so overlapping commands cannot leave it stale.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_pending: int = 1000,
+        default_timeout: float = 10.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        history_size: int = 1000,
+        max_async: int = 500,
+        coalesce_targets: Optional[Dict[str, Sequence[str]]] = None,
+        coalesce_window: float = 0.1,
+        priorities: Optional[Dict[str, int]] = None,
+        reserved_workers: int = 1,
+        reserved_pending: Optional[int] = None,
+        latency_samples: int = 1000,
+        idempotent: Optional[set] = None,
+        device_states: Optional[DeviceStateCache] = None,
+    ):
+        self.max_workers = max_workers
+        self.reserved_workers = reserved_workers
+        self.priorities: Dict[str, int] = priorities if priorities is not None else {}
+        self.max_async = max_async
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self.default_timeout = default_timeout
+        self.timeouts: Dict[str, float] = timeouts if timeouts is not None else {}
+        self.history_size = history_size
+        if reserved_pending is None:
+            reserved_pending = max_pending // 10
+        self._queue = PriorityActionQueue(max_pending, reserved_pending)
+        self._queue_waits: Dict[int, deque] = {}
+        self._latency_samples = latency_samples
+        self._workers: list[threading.Thread] = []
+        self._handles: "OrderedDict[str, ActionHandle]" = OrderedDict()
+        self._handles_lock = threading.Lock()
+        self._deadlines: list[tuple[float, int, ActionHandle]] = []
+        self._deadline_seq = itertools.count()
+        self._watchdog_cond = threading.Condition()
+        self._watchdog: Optional[threading.Thread] = None
+        self._running = False
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.idempotent: set = idempotent if idempotent is not None else set()
+        self.device_states = device_states
+        # When set, every status change is mirrored there for other server workers
+        self.records: Optional[SharedRecords] = None
+        self._records_lock = threading.Lock()
+        self._inflight: Dict[tuple, int] = {}
+        self._settled: Dict[tuple, Optional[dict]] = {}
+        self._device_lock = threading.Lock()
+        self.coalescer = ActionCoalescer(self._flush_group, coalesce_targets, coalesce_window)
+        self.stats = {
+            "submitted": 0,
+            "success": 0,
+            "error": 0,
+            "timeout": 0,
+            "rejected": 0,
+            "coalesced": 0,
+            "skipped": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def timeout_for(self, action_type: str) -> float:
+        return self.timeouts.get(action_type, self.default_timeout)
+
+    def priority_for(self, action_type: str) -> int:
+        return self.priorities.get(action_type, PRIORITY_NORMAL)
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Await async actions on this event loop from now on"""
+        self.loop = loop
+        self._async_slots = None
+
+    def detach_loop(self) -> None:
+        """Stop using the attached event loop"""
+        self.loop = None
+        self._async_slots = None
+
+    def submit(
+        self,
+        action: Callable,
+        keyword: str = "",
+        action_type: str = "custom",
+        params: Optional[Mapping[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> ActionHandle:
+        """Queue an action and return its handle immediately
+
+        ``params`` (by default the action's ``action_params``) decide which
+        target a coalesced action type is aimed at. ``idempotency_key`` is
+        exposed to the action through ``current_idempotency_key``.
+        """
+        handle = ActionHandle(
+            action,
+            keyword,
+            action_type,
+            self.timeout_for(action_type),
+            self.priority_for(action_type),
+            idempotency_key,
+        )
+        if params is None:
+            params = getattr(action, "action_params", None)
+        key = self.coalescer.target_key(action_type, params)
+        if key is not None:
+            self._count("submitted")
+            self._remember(handle)
+            if self.device_states is not None and action_type in self.idempotent:
+                if self._skip_if_known(handle, key, params):
+                    return handle
+            self.coalescer.offer(key, handle)
+            return handle
+
+        self._dispatch(handle)
+        self._count("submitted")
+        self._remember(handle)
+        return handle
+
+    def _dispatch(self, handle: ActionHandle) -> None:
+        """Hand an action to the event loop or the worker queue"""
+        loop = self.loop
+        if loop is not None and is_async_action(handle.action):
+            asyncio.run_coroutine_threadsafe(self._run_async(handle), loop)
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(handle)
+        except queue.Full:
+            self._count("rejected")
+            raise ExecutorSaturatedError("Action queue is full")
+
+    def _skip_if_known(self, handle: ActionHandle, key: tuple, params: Mapping[str, Any]) -> bool:
+        """Finish an action whose device is already in the requested state
+
+        Otherwise start tracking it as in flight for its device.
+        """
+        fields = self.coalescer.targets[handle.action_type]
+        desired = {name: value for name, value in params.items() if name not in fields}
+        with self._device_lock:
+            if not self._inflight.get(key) and self.device_states.satisfies(key, desired):
+                handle._finish(
+                    "success",
+                    result={
+                        "status": "success",
+                        "skipped": True,
+                        "message": f"✅ 이미 요청한 상태입니다 ({' '.join(map(str, key))})",
+                    },
+                )
+                self._count("skipped")
+                return True
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+            self.device_states.invalidate(key)
+        handle.future.add_done_callback(lambda _: self._settle_device(handle, key, desired))
+        return False
+
+    def _settle_device(self, handle: ActionHandle, key: tuple, desired: dict) -> None:
+        with self._device_lock:
+            if handle.status != "success":
+                self._settled[key] = None
+            elif handle.coalesced_into is None:
+                self._settled[key] = desired
+            remaining = self._inflight[key] - 1
+            if remaining:
+                self._inflight[key] = remaining
+                return
+            del self._inflight[key]
+            state = self._settled.pop(key, None)
+            if state is not None:
+                self.device_states.update(key, state)
+            else:
+                self.device_states.invalidate(key)
+
+    def _flush_group(self, group: list[ActionHandle]) -> None:
+        """Run the final action of a coalesced burst on behalf of the whole group"""
+        final = group[-1]
+        for handle in group[:-1]:
+            handle.coalesced_into = final.action_id
+            final.future.add_done_callback(lambda _, h=handle: self._mirror(h, final))
+        try:
+            self._dispatch(final)
+        except ExecutorSaturatedError as e:
+            final._finish("error", error=str(e))
+
+    def _mirror(self, handle: ActionHandle, final: ActionHandle) -> None:
+        handle.started_at = final.started_at
+        if handle._finish(final.status, final.result, final.error):
+            self._count("coalesced")
+
+    def get(self, action_id: str) -> Optional[ActionHandle]:
+        """Look up a recent action by ID"""
+        with self._handles_lock:
+            return self._handles.get(action_id)
+
+    def recent(self, limit: int = 50) -> list[ActionHandle]:
+        """Most recent actions, newest first"""
+        with self._handles_lock:
+            handles = list(self._handles.values())
+        return handles[::-1][:limit]
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def queue_stats(self) -> Dict[int, dict]:
+        """Queue depth and recent queue-wait percentiles per priority class"""
+        depth = self._queue.depth_by_priority()
+        with self._stats_lock:
+            waits = {p: sorted(samples) for p, samples in self._queue_waits.items()}
+        report = {}
+        for priority in sorted(set(depth) | set(waits)):
+            samples = waits.get(priority, [])
+            report[priority] = {
+                "pending": depth.get(priority, 0),
+                "samples": len(samples),
+                "wait_p50_ms": _percentile_ms(samples, 0.5),
+                "wait_p99_ms": _percentile_ms(samples, 0.99),
+            }
+        return report
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; the executor restarts on the next submit"""
+        self.coalescer.close()
+        with self._start_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._queue.close()
+            with self._watchdog_cond:
+                self._watchdog_cond.notify()
+            if wait:
+                for worker in self._workers:
+                    worker.join()
+                self._watchdog.join()
+            self._workers = []
+            self._watchdog = None
+
+    def _ensure_started(self) -> None:
+        if self._running:
+            return
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+            generation = self._queue.reopen()
+            self._workers = [
+                threading.Thread(
+                    target=self._work, args=(generation,), name=f"action-worker-{i}", daemon=True
+                )
+                for i in range(self.max_workers)
+            ] + [
+                threading.Thread(
+                    target=self._work,
+                    args=(generation, True),
+                    name=f"action-reserved-{i}",
+                    daemon=True,
+                )
+                for i in range(self.reserved_workers)
+            ]
+            for worker in self._workers:
+                worker.start()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="action-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def _remember(self, handle: ActionHandle) -> None:
+        with self._handles_lock:
+            self._handles[handle.action_id] = handle
+            while len(self._handles) > self.history_size:
+                oldest = next(iter(self._handles.values()))
+                if not oldest.done:
+                    break
+                self._handles.popitem(last=False)
+        if self.records is not None:
+            # Submitters are never on the event loop, so waiting here costs the loop
+            # nothing and the returned ID can be looked up on any worker at once
+            written = self._share(handle)
+            if written is not None:
+                written.result()
+            handle.future.add_done_callback(lambda _: self._share(handle))
+
+    def _share(self, handle: ActionHandle) -> Optional[Future]:
+        """Queue the handle's status for the shared records, without waiting for the write"""
+        records = self.records
+        if records is None:
+            return None
+        # Snapshot and queue under the lock, so a stale status never overwrites a later one
+        with self._records_lock:
+            return records.put("action", handle.action_id, handle.to_dict())
+
+    def _work(self, generation: int, reserved: bool = False) -> None:
+        while True:
+            handle = self._queue.get(reserved, generation)
+            if handle is None:
+                return
+            self._run(handle)
+
+    def _run(self, handle: ActionHandle) -> None:
+        if handle.done:
+            return
+        handle.status = "running"
+        handle.started_at = time.time()
+        self._record_wait(handle)
+        self._share(handle)
+        with self._watchdog_cond:
+            heapq.heappush(
+                self._deadlines,
+                (time.monotonic() + handle.timeout, next(self._deadline_seq), handle),
+            )
+            self._watchdog_cond.notify()
+        token = current_idempotency_key.set(handle.idempotency_key)
+        try:
+            result = resolve_result(handle.action(), self.loop)
+        except Exception as e:
+            logger.error(f"Action {handle.action_id} ('{handle.keyword}') failed: {e}")
+            if handle._finish("error", error=str(e)):
+                self._count("error")
+            return
+        finally:
+            current_idempotency_key.reset(token)
+        if handle._finish("success", result=result):
+            self._count("success")
+        else:
+            logger.warning(
+                f"Action {handle.action_id} ('{handle.keyword}') finished after its timeout"
+            )
+
+    def _record_wait(self, handle: ActionHandle) -> None:
+        with self._stats_lock:
+            samples = self._queue_waits.get(handle.priority)
+            if samples is None:
+                samples = self._queue_waits[handle.priority] = deque(maxlen=self._latency_samples)
+            samples.append(handle.started_at - handle.submitted_at)
+
+    async def _run_async(self, handle: ActionHandle) -> None:
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_async)
+        async with self._async_slots:
+            handle.status = "running"
+            handle.started_at = time.time()
+            self._record_wait(handle)
+            self._share(handle)
+            current_idempotency_key.set(handle.idempotency_key)
+            try:
+                result = await asyncio.wait_for(handle.action(), handle.timeout)
+            except asyncio.TimeoutError:
+                if handle._finish("timeout", error=f"Timed out after {handle.timeout}s"):
+                    self._count("timeout")
+                    logger.warning(f"Action {handle.action_id} ('{handle.keyword}') timed out")
+                return
+            except Exception as e:
+                logger.error(f"Action {handle.action_id} ('{handle.keyword}') failed: {e}")
+                if handle._finish("error", error=str(e)):
+                    self._count("error")
+                return
+        if handle._finish("success", result=result):
+            self._count("success")
+
+    def _watch(self) -> None:
+        with self._watchdog_cond:
+            while self._running:
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, _, handle = heapq.heappop(self._deadlines)
+                    if handle._finish("timeout", error=f"Timed out after {handle.timeout}s"):
+                        self._count("timeout")
+                        logger.warning(
+                            f"Action {handle.action_id} ('{handle.keyword}') timed out"
+                        )
+                wait = self._deadlines[0][0] - now if self._deadlines else None
+                self._watchdog_cond.wait(wait)
+
+
+def _percentile_ms(sorted_values: list[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct))
+    return round(sorted_values[index] * 1000, 3)
+
+
+# Global action executor instance, using the registry's per-type settings
+action_executor = ActionExecutor(
+    timeouts=action_registry.timeouts,
+    coalesce_targets=action_registry.coalesce_targets,
+    priorities=action_registry.priorities,
+    idempotent=action_registry.idempotent,
+    device_states=device_state_cache,
+)
@@ -0,0 +1,218 @@
+"""
+Parameterized command grammar
+"""
+import re
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+from app.matcher import Hypothesis
+
+# Built-in slot vocabularies: spoken form -> action parameter value
+DEFAULT_SLOTS: Dict[str, Dict[str, str]] = {
+    "room": {
+        "거실": "거실",
+        "안방": "안방",
+        "작은방": "작은방",
+        "주방": "주방",
+        "부엌": "주방",
+        "욕실": "욕실",
+        "화장실": "욕실",
+        "현관": "현관",
+        "전체": "전체",
+    },
+    "state": {
+        "켜": "on",
+        "켜줘": "on",
+        "켜라": "on",
+        "꺼": "off",
+        "꺼줘": "off",
+        "꺼라": "off",
+    },
+    "contact": {
+        "엄마": "엄마",
+        "아빠": "아빠",
+        "할머니": "할머니",
+        "할아버지": "할아버지",
+    },
+}
+
+# Templates that replace per-room / per-contact keyword registrations. Every
+# slot has a vocabulary: a free slot such as "{song+} 틀어" also captures
+# whatever was said before it ("지금 아이유 노래 틀어"), so templates like that
+# are left to callers who know their vocabulary.
+DEFAULT_COMMAND_TEMPLATES = [
+    ("{room} 불 {state}", "lights"),
+    ("{contact}한테 전화", "call"),
+    ("{contact}에게 전화", "call"),
+]
+
+_SLOT_RE = re.compile(r"\{(\w+)(\+?)\}")
+
+
+class CommandTemplate:
+    """A keyword template with named slots, e.g. ``{room} 불 {state}``
+
+    Slots with a vocabulary match only their listed spoken forms and fill the
+    parameter with the mapped value. Slots without one match a single word,
+    or one or more words when written as ``{name+}``. A match starts and ends
+    at a word or utterance boundary, so "불 꺼" is not found in "불 꺼내" and a
+    free slot never starts mid-word.
+
+    ``create_action``, when set, builds the action for a match's params
+    (e.g. ``ActionRegistry.create_action`` bound to the action type), so
+    slot values are validated like any other action params.
+    """
+
+    def __init__(
+        self,
+        template_id: int,
+        template: str,
+        handler: Callable[[dict], object],
+        action_type: str = "custom",
+        slots: Optional[Dict[str, Dict[str, str]]] = None,
+        action_params: Optional[dict] = None,
+        create_action: Optional[Callable[[dict], Callable]] = None,
+    ):
+        self.template_id = template_id
+        self.template = template
+        self.handler = handler
+        self.action_type = action_type
+        self.action_params = dict(action_params or {})
+        self.create_action = create_action
+        self.slot_names = [name for name, _ in _SLOT_RE.findall(template)]
+        if not self.slot_names:
+            raise ValueError(f"Template has no slots: {template}")
+        if len(set(self.slot_names)) != len(self.slot_names):
+            raise ValueError(f"Template repeats a slot: {template}")
+        vocab = {**DEFAULT_SLOTS, **(slots or {})}
+        self.slots = {
+            name: {spoken.lower(): value for spoken, value in vocab[name].items()}
+            for name in self.slot_names
+            if name in vocab
+        }
+
+    def to_regex(self) -> str:
+        """Regex source for this template, with groups prefixed by the template ID"""
+        parts = []
+        pos = 0
+        for m in _SLOT_RE.finditer(self.template):
+            parts.append(_literal(self.template[pos:m.start()]))
+            name, multi = m.group(1), m.group(2)
+            group = f"t{self.template_id}_{name}"
+            if name in self.slots:
+                forms = sorted(self.slots[name], key=len, reverse=True)
+                body = "|".join(re.escape(f) for f in forms)
+            elif multi:
+                body = r"\S+?(?:\s+\S+?)*?"
+            else:
+                body = r"\S+?"
+            parts.append(f"(?P<{group}>{body})")
+            pos = m.end()
+        parts.append(_literal(self.template[pos:]))
+        return r"(?<!\S)" + "".join(parts) + r"(?!\S)"
+
+
+class CommandMatch(NamedTuple):
+    """A template match with its extracted parameters"""
+
+    template_id: int
+    action_type: str
+    params: dict
+    text: str
+    score: float = 1.0
+
+
+class CommandGrammar:
+    """All command templates compiled into one alternation regex
+
+    Templates are compiled lazily after changes, and one scan of a
+    transcript finds every template match and extracts its slots.
+    """
+
+    def __init__(self):
+        self.templates: Dict[int, CommandTemplate] = {}
+        self._next_id = 1
+        self._compiled: Optional[re.Pattern] = None
+
+    def add(
+        self,
+        template: str,
+        handler: Callable[[dict], object],
+        action_type: str = "custom",
+        slots: Optional[Dict[str, Dict[str, str]]] = None,
+        action_params: Optional[dict] = None,
+        create_action: Optional[Callable[[dict], Callable]] = None,
+    ) -> CommandTemplate:
+        """Add a template whose handler receives the extracted parameters"""
+        entry = CommandTemplate(
+            self._next_id,
+            template.strip().lower(),
+            handler,
+            action_type,
+            slots,
+            action_params,
+            create_action,
+        )
+        self._next_id += 1
+        self.templates[entry.template_id] = entry
+        self._compiled = None
+        return entry
+
+    def remove(self, template_id: int) -> bool:
+        """Remove a template by ID"""
+        if self.templates.pop(template_id, None) is None:
+            return False
+        self._compiled = None
+        return True
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def _compile(self) -> Optional[re.Pattern]:
+        if self._compiled is None and self.templates:
+            self._compiled = re.compile(
+                "|".join(
+                    f"(?P<t{t.template_id}>{t.to_regex()})" for t in self.templates.values()
+                )
+            )
+        return self._compiled
+
+    def parse(self, text: str, score: float = 1.0) -> list[CommandMatch]:
+        """Find every command in text in one scan"""
+        pattern = self._compile()
+        if pattern is None:
+            return []
+        matches = []
+        for m in pattern.finditer(text):
+            template = self.templates[int(m.lastgroup[1:])]
+            params = dict(template.action_params)
+            for name in template.slot_names:
+                spoken = m.group(f"t{template.template_id}_{name}")
+                vocab = template.slots.get(name)
+                params[name] = vocab.get(spoken, spoken) if vocab else spoken
+            matches.append(
+                CommandMatch(template.template_id, template.action_type, params, m.group(0), score)
+            )
+        return matches
+
+    def parse_hypotheses(
+        self, hypotheses: Sequence[Hypothesis], min_score: float = 0.0
+    ) -> list[CommandMatch]:
+        """Parse every hypothesis, keeping the best-scoring copy of each distinct command"""
+        best: Dict[tuple, CommandMatch] = {}
+        for hypothesis in hypotheses:
+            if hypothesis.score < min_score:
+                continue
+            for match in self.parse(hypothesis.text, hypothesis.score):
+                key = (match.template_id, repr(sorted(match.params.items())))
+                if key not in best or match.score > best[key].score:
+                    best[key] = match
+        return sorted(best.values(), key=lambda m: m.score, reverse=True)
+
+
+def _literal(text: str) -> str:
+    """Escape template text; any run of whitespace matches optional whitespace"""
+    return "".join(
+        r"\s*" if part.isspace() else re.escape(part)
+        for part in re.split(r"(\s+)", text)
+        if part
+    )
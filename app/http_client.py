@@ -0,0 +1,108 @@
+"""
+Shared pooled HTTP client for action integrations
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+import httpx
+
+
+class PooledHTTPClient:
+    """One keep-alive connection pool shared by every action handler
+
+    Wraps ``httpx.AsyncClient`` with a global connection limit plus a
+    per-host concurrency limit, and records how often requests reuse a
+    pooled connection and how long they wait for one.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        per_host_limit: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.per_host_limit = per_host_limit
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "errors": 0,
+            "pool_wait_total": 0.0,
+            "pool_wait_max": 0.0,
+        }
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    def _slots(self, url: httpx.URL) -> asyncio.Semaphore:
+        key = f"{url.scheme}://{url.host}:{url.port or ''}"
+        slots = self._host_slots.get(key)
+        if slots is None:
+            slots = self._host_slots[key] = asyncio.Semaphore(self.per_host_limit)
+        return slots
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool"""
+        started = time.perf_counter()
+        waited: Optional[float] = None
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal waited
+            if event_name.endswith("connect_tcp.started"):
+                self.stats["new_connections"] += 1
+            if waited is None and event_name.endswith(
+                ("connect_tcp.started", "send_request_headers.started")
+            ):
+                # Time spent before a connection was ready to use
+                waited = time.perf_counter() - started
+
+        extensions = {**kwargs.pop("extensions", {}), "trace": trace}
+        self.stats["requests"] += 1
+        async with self._slots(httpx.URL(url)):
+            try:
+                return await self._client.request(method, url, extensions=extensions, **kwargs)
+            except httpx.HTTPError:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                if waited is not None:
+                    self.stats["pool_wait_total"] += waited
+                    self.stats["pool_wait_max"] = max(self.stats["pool_wait_max"], waited)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def snapshot(self) -> dict:
+        requests = self.stats["requests"]
+        reused = max(0, requests - self.stats["new_connections"])
+        return {
+            "requests": requests,
+            "new_connections": self.stats["new_connections"],
+            "errors": self.stats["errors"],
+            "connection_reuse_rate": round(reused / requests, 4) if requests else None,
+            "pool_wait_avg_ms": round(self.stats["pool_wait_total"] / requests * 1000, 3)
+            if requests
+            else None,
+            "pool_wait_max_ms": round(self.stats["pool_wait_max"] * 1000, 3),
+            "per_host_limit": self.per_host_limit,
+        }
@@ -0,0 +1,322 @@
+"""
+Asynchronous recognition jobs
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+from app.events import EventBus
+from app.shared_state import SharedRecords
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue has no room for another job"""
+
+
+class TenantJobLimitError(JobQueueFullError):
+    """Raised when a tenant already has its maximum number of unfinished jobs"""
+
+
+class RecognitionJob:
+    """One queued recognition request and, once finished, its outcome"""
+
+    def __init__(self, tenant: str, request: Any):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.tenant = tenant
+        self.request = request
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.finished = asyncio.Event()
+        # Write of the latest status to the shared records, if they are kept
+        self.recorded: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "tenant": self.tenant,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class FairJobQueue:
+    """Bounded job queue served round-robin across tenants
+
+    Each tenant has its own FIFO and ``get_nowait`` takes one job from each tenant
+    in turn, so a tenant that queued many jobs only delays its own. Not
+    thread-safe; it belongs to one event loop.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._tenants: "OrderedDict[str, deque[RecognitionJob]]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put_nowait(self, job: RecognitionJob) -> None:
+        if self._size >= self.maxsize:
+            raise JobQueueFullError("Recognition job queue is full, try again later")
+        self._tenants.setdefault(job.tenant, deque()).append(job)
+        self._size += 1
+
+    def get_nowait(self) -> Optional[RecognitionJob]:
+        """The next tenant's oldest job, or None when empty"""
+        if not self._tenants:
+            return None
+        tenant, jobs = next(iter(self._tenants.items()))
+        job = jobs.popleft()
+        if jobs:
+            self._tenants.move_to_end(tenant)
+        else:
+            del self._tenants[tenant]
+        self._size -= 1
+        return job
+
+    def remove(self, job: RecognitionJob) -> bool:
+        jobs = self._tenants.get(job.tenant)
+        if not jobs or job not in jobs:
+            return False
+        jobs.remove(job)
+        if not jobs:
+            del self._tenants[job.tenant]
+        self._size -= 1
+        return True
+
+    def depth_by_tenant(self) -> dict[str, int]:
+        return {tenant: len(jobs) for tenant, jobs in self._tenants.items()}
+
+
+class RecognitionJobs:
+    """Runs recognition requests in the background and keeps their results
+
+    ``submit`` queues a job and returns at once; ``workers`` tasks on the
+    event loop take jobs fairly across tenants (see ``FairJobQueue``) and
+    await ``run(job)`` for each. A tenant may have at most
+    ``max_per_tenant`` unfinished jobs. Status changes are published to
+    ``events`` as ``job`` events, the final one carrying the result, and
+    finished jobs stay available for lookup until ``history_size`` newer
+    ones have finished.
+
+    With ``records`` (several server workers), every status change is also
+    written there, so ``shared`` can report a job another worker holds and
+    ``request_cancel`` can ask that worker to drop it before it starts.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[RecognitionJob], Awaitable[Any]],
+        workers: int = 1,
+        max_queued: int = 50,
+        max_per_tenant: int = 5,
+        history_size: int = 1000,
+        events: Optional[EventBus] = None,
+        records: Optional[SharedRecords] = None,
+    ):
+        self.run = run
+        self.workers = workers
+        self.max_per_tenant = max_per_tenant
+        self.history_size = history_size
+        self.events = events
+        self.records = records
+        self._queue = FairJobQueue(max_queued)
+        self._jobs: "OrderedDict[str, RecognitionJob]" = OrderedDict()
+        self._unfinished: dict[str, int] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+        self.running_jobs = 0
+        self.stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; queued and running jobs are cancelled"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while (job := self._queue.get_nowait()) is not None:
+            self._finish(job, "cancelled", error="Server shutting down")
+
+    def submit(self, tenant: str, request: Any) -> RecognitionJob:
+        """Queue a job; raises ``JobQueueFullError`` when there is no room"""
+        if self._unfinished.get(tenant, 0) >= self.max_per_tenant:
+            self.stats["rejected"] += 1
+            raise TenantJobLimitError(
+                f"Tenant '{tenant}' already has {self.max_per_tenant} unfinished jobs"
+            )
+        job = RecognitionJob(tenant, request)
+        try:
+            self._queue.put_nowait(job)
+        except JobQueueFullError:
+            self.stats["rejected"] += 1
+            raise
+        self._unfinished[tenant] = self._unfinished.get(tenant, 0) + 1
+        self._remember(job)
+        self.stats["submitted"] += 1
+        self._publish(job)
+        if self._wake is not None:
+            self._wake.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[RecognitionJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        job = self._jobs.get(job_id)
+        if job is None or not self._queue.remove(job):
+            return False
+        self._finish(job, "cancelled")
+        return True
+
+    async def shared(self, job_id: str) -> Optional[dict]:
+        """A job as last recorded by whichever worker holds it"""
+        if self.records is None:
+            return None
+        return await asyncio.to_thread(self.records.get, "job", job_id)
+
+    async def wait_shared(self, job_id: str, timeout: float) -> Optional[dict]:
+        """A shared job's record once it finishes, or as it is after ``timeout`` seconds
+
+        The record is re-read at growing intervals (up to a second), each
+        read on a thread.
+        """
+        record = await self.shared(job_id)
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while record is not None and record["status"] in ("queued", "running"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+            record = await self.shared(job_id)
+        return record
+
+    async def request_cancel(self, job_id: str) -> bool:
+        """Ask the worker holding a queued job to cancel it instead of starting it"""
+        record = await self.shared(job_id)
+        if record is None or record["status"] != "queued":
+            return False
+        await asyncio.wrap_future(
+            self.records.put("job_cancel", job_id, {"requested_at": time.time()})
+        )
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            job = self._queue.get_nowait()
+            if job is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            if await self._cancel_requested(job):
+                self._finish(job, "cancelled")
+                continue
+            job.status = "running"
+            job.started_at = time.time()
+            self.running_jobs += 1
+            self._publish(job)
+            result, error = None, None
+            try:
+                result = await self.run(job)
+                status = "done"
+            except asyncio.CancelledError:
+                self.running_jobs -= 1
+                self._finish(job, "cancelled", error="Server shutting down")
+                raise
+            except Exception as e:
+                logger.error(f"Recognition job {job.job_id} failed: {e}")
+                status, error = "failed", str(e) or type(e).__name__
+            self.running_jobs -= 1
+            self._finish(job, status, result, error)
+
+    async def _cancel_requested(self, job: RecognitionJob) -> bool:
+        """Whether another worker asked to cancel a job that was just dequeued"""
+        if self.records is None:
+            return False
+        try:
+            return await asyncio.to_thread(self.records.get, "job_cancel", job.job_id) is not None
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled", error="Server shutting down")
+            raise
+
+    def _finish(self, job: RecognitionJob, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.finished.set()
+        self.stats[status] += 1
+        remaining = self._unfinished.get(job.tenant, 0) - 1
+        if remaining > 0:
+            self._unfinished[job.tenant] = remaining
+        else:
+            self._unfinished.pop(job.tenant, None)
+        self._publish(job)
+        self._prune()
+
+    def _remember(self, job: RecognitionJob) -> None:
+        self._jobs[job.job_id] = job
+        self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond ``history_size``"""
+        finished = len(self._jobs) - (len(self._queue) + self.running_jobs)
+        for job_id in list(self._jobs):
+            if finished <= self.history_size:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+                finished -= 1
+
+    def _publish(self, job: RecognitionJob) -> None:
+        if self.records is not None:
+            # Written by the records' own thread; the loop does not wait for it
+            record = {**job.to_dict(), "result": _dump(job.result)}
+            job.recorded = self.records.put("job", job.job_id, record)
+        if self.events is None:
+            return
+        data = {"job_id": job.job_id, "tenant": job.tenant, "status": job.status}
+        if job.done:
+            data["result"] = _dump(job.result)
+            data["error"] = job.error
+        self.events.publish("job", data)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "queued": len(self._queue),
+            "running": self.running_jobs,
+            "queued_by_tenant": self._queue.depth_by_tenant(),
+        }
+
+
+def _dump(result: Any) -> Any:
+    return result.model_dump() if hasattr(result, "model_dump") else result
@@ -0,0 +1,404 @@
+"""
+Persistent keyword store
+"""
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence
+
+from app.actions import ActionRegistry
+from app.keyword_store import normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    id INTEGER PRIMARY KEY,
+    action_type TEXT NOT NULL,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword TEXT NOT NULL,
+    mapping_id INTEGER NOT NULL,
+    PRIMARY KEY (keyword, mapping_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS keywords_mapping ON keywords (mapping_id);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class StoredMapping(NamedTuple):
+    """One persisted action and the keywords (aliases) that trigger it"""
+
+    mapping_id: int
+    keywords: tuple[str, ...]
+    action_type: str
+    params: str
+
+
+class KeywordChange(NamedTuple):
+    """One logged write: ``add`` or ``replace`` of a mapping ID range, or ``remove`` of keywords"""
+
+    seq: int
+    op: str
+    payload: dict
+
+
+class KeywordDatabase:
+    """SQLite (WAL) store of keyword-action mappings
+
+    Mirrors the API-managed part of ``KeywordStore``: each mapping is an
+    action type with its resolved params, reachable from one or more
+    keywords. Every call is one transaction, so a bulk change is either
+    fully on disk or not at all. Params are kept as the JSON text they were
+    written with, which lets a loader validate identical params only once.
+
+    Each write also appends to a change log and returns its sequence number,
+    so other processes sharing the file can follow along (see
+    ``KeywordSync``). The last ``log_size`` changes are kept.
+    """
+
+    def __init__(self, path: str, log_size: int = 10_000):
+        self.path = path
+        self.log_size = log_size
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta VALUES ('instance', ?)", (uuid.uuid4().hex[:12],)
+        )
+        # Identifies this database file, so change numbers from a recreated file never match
+        (self.instance,) = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'instance'"
+        ).fetchone()
+        self._lock = threading.Lock()
+
+    def add(self, keywords: Sequence[str], action_type: str, params: Mapping[str, Any]) -> int:
+        """Persist one mapping and return the change's sequence number"""
+        return self.add_many([(keywords, action_type, params)])
+
+    def add_many(
+        self,
+        mappings: Iterable[tuple[Sequence[str], str, Mapping[str, Any]]],
+        replace: bool = False,
+    ) -> int:
+        """Persist many mappings in one transaction; ``replace`` drops all others first
+
+        Returns the change's sequence number.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if replace:
+                self._conn.execute("DELETE FROM keywords")
+                self._conn.execute("DELETE FROM mappings")
+            (start,) = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM mappings").fetchone()
+            rows, keyword_rows = [], []
+            for mapping_id, (keywords, action_type, params) in enumerate(mappings, start + 1):
+                rows.append((mapping_id, action_type, json.dumps(dict(params), ensure_ascii=False)))
+                keyword_rows.extend(
+                    (keyword, mapping_id) for keyword in dict.fromkeys(map(normalize_keyword, keywords))
+                )
+            self._conn.executemany("INSERT INTO mappings VALUES (?, ?, ?)", rows)
+            self._conn.executemany("INSERT INTO keywords VALUES (?, ?)", keyword_rows)
+            return self._log(
+                "replace" if replace else "add", {"ids": [start + 1, start + len(rows)]}
+            )
+
+    def remove_keywords(self, keywords: Iterable[str]) -> tuple[Optional[int], list[str]]:
+        """Delete keywords in one transaction; mappings left without keywords go too
+
+        Returns the change's sequence number (None if nothing was stored) and
+        the normalized keywords that existed.
+        """
+        keywords = list(dict.fromkeys(map(normalize_keyword, keywords)))
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS doomed (keyword TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM doomed")
+            self._conn.executemany("INSERT INTO doomed VALUES (?)", ((k,) for k in keywords))
+            found = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT keyword FROM keywords WHERE keyword IN (SELECT keyword FROM doomed)"
+                )
+            }
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS touched (mapping_id INTEGER PRIMARY KEY)"
+            )
+            self._conn.execute("DELETE FROM touched")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO touched SELECT mapping_id FROM keywords "
+                "WHERE keyword IN (SELECT keyword FROM doomed)"
+            )
+            self._conn.execute("DELETE FROM keywords WHERE keyword IN (SELECT keyword FROM doomed)")
+            self._conn.execute(
+                "DELETE FROM mappings WHERE id IN (SELECT mapping_id FROM touched) "
+                "AND id NOT IN (SELECT mapping_id FROM keywords)"
+            )
+            removed = [k for k in keywords if k in found]
+            if not removed:
+                return None, []
+            return self._log("remove", {"keywords": removed}), removed
+
+    def _log(self, op: str, payload: dict) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO changes (op, payload) VALUES (?, ?)",
+            (op, json.dumps(payload, ensure_ascii=False)),
+        )
+        seq = cursor.lastrowid
+        if seq % 100 == 0:
+            self._conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - self.log_size,))
+        return seq
+
+    def mappings(self, first_id: int = 0, last_id: Optional[int] = None) -> Iterator[StoredMapping]:
+        """Stored mappings in ID order (optionally an ID range), read in one pass"""
+        with self._lock:
+            rows = self._select_mappings(first_id, last_id)
+        for mapping_id, keywords, action_type, params in rows:
+            yield StoredMapping(mapping_id, tuple(keywords.split("\x1f")), action_type, params)
+
+    def _select_mappings(self, first_id: int, last_id: Optional[int]) -> list[tuple]:
+        return self._conn.execute(
+            "SELECT m.id, group_concat(k.keyword, char(31)), m.action_type, m.params "
+            "FROM mappings m JOIN keywords k ON k.mapping_id = m.id "
+            "WHERE m.id BETWEEN ? AND ? GROUP BY m.id ORDER BY m.id",
+            (first_id, last_id if last_id is not None else 2**63 - 1),
+        ).fetchall()
+
+    def snapshot(self) -> tuple[int, list[StoredMapping]]:
+        """Every mapping and the sequence number of the last change they include"""
+        with self._lock, self._conn:
+            # One read transaction, so no write lands between the two queries
+            self._conn.execute("BEGIN")
+            seq = self._last_seq()
+            rows = self._select_mappings(0, None)
+        return seq, [
+            StoredMapping(mapping_id, tuple(keywords.split("\x1f")), action_type, params)
+            for mapping_id, keywords, action_type, params in rows
+        ]
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._last_seq()
+
+    def _last_seq(self) -> int:
+        (seq,) = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()
+        return seq
+
+    def changes_since(self, seq: int, until: Optional[int] = None) -> Optional[list[KeywordChange]]:
+        """Logged changes after ``seq`` (up to ``until``), or None if some were pruned"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, op, payload FROM changes WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (seq, until if until is not None else 2**63 - 1),
+            ).fetchall()
+        # Sequence numbers have no gaps, so the ends show whether anything is missing
+        if rows and rows[0][0] != seq + 1:
+            return None
+        if until is not None and until > seq and (not rows or rows[-1][0] != until):
+            return None
+        return [KeywordChange(s, op, json.loads(payload)) for s, op, payload in rows]
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the file"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def counts(self) -> dict:
+        with self._lock:
+            (mappings,) = self._conn.execute("SELECT COUNT(*) FROM mappings").fetchone()
+            (keywords,) = self._conn.execute("SELECT COUNT(DISTINCT keyword) FROM keywords").fetchone()
+        return {"mappings": mappings, "keywords": keywords}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class KeywordSync:
+    """Keeps a listener's keywords in step with a ``KeywordDatabase``
+
+    Changes are written to the database first and then applied to the
+    listener under one lock, in change-log order. Several server processes
+    can share the file: each polls ``PRAGMA data_version``, which only moves
+    when another connection commits, and applies the changes it has not
+    seen yet. A process that fell further behind than the log reloads
+    everything. ``applied`` is the sequence number of the last change
+    applied, so processes with equal values hold identical keyword sets.
+    """
+
+    def __init__(
+        self,
+        db: KeywordDatabase,
+        registry: ActionRegistry,
+        listener,
+        poll_interval: float = 0.25,
+    ):
+        self.db = db
+        self.registry = registry
+        self.listener = listener
+        self.poll_interval = poll_interval
+        self.applied = 0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"written": 0, "followed": 0, "reloads": 0, "skipped": 0}
+
+    @property
+    def etag(self) -> str:
+        """Entity tag for the current keyword set, equal across processes"""
+        return f'"{self.db.instance}-{self.applied}"'
+
+    def restore(self) -> int:
+        """Replace the listener's keywords with the stored ones and compile its matcher
+
+        Mappings whose action type or params no longer validate are skipped
+        with a warning. Returns the number of mappings restored.
+        """
+        with self._lock:
+            seq, mappings = self.db.snapshot()
+            registrations = self._registrations(mappings)
+            self.listener.register_actions(registrations, replace=True, version=seq)
+            self.applied = seq
+            self.stats["reloads"] += 1
+        # Compile now so the first recognized phrase does not pay for it
+        self.listener.matcher
+        return len(registrations)
+
+    def add(
+        self, registrations: Sequence[tuple[str, Callable, Sequence[str]]], replace: bool = False
+    ) -> list[int]:
+        """Persist (keyword, action, aliases) registrations, then apply them
+
+        Actions must come from ``ActionRegistry.create_action``. Returns the
+        listener's action IDs (empty if the listener had to reload instead).
+        """
+        with self._lock:
+            seq = self.db.add_many(
+                (
+                    ([keyword, *aliases], action.action_type, action.action_params)
+                    for keyword, action, aliases in registrations
+                ),
+                replace=replace,
+            )
+            self.stats["written"] += 1
+            if not self._catch_up(seq - 1):
+                return []
+            action_ids = self._register(registrations, replace, seq)
+            self.applied = seq
+            return action_ids
+
+    def remove(self, keywords: Sequence[str]) -> list[str]:
+        """Delete keywords from the database, then from the listener
+
+        Returns the normalized keywords the listener had.
+        """
+        with self._lock:
+            seq, _ = self.db.remove_keywords(keywords)
+            if seq is None:
+                return self._unregister(keywords, self.applied)
+            self.stats["written"] += 1
+            if not self._catch_up(seq - 1):
+                return [normalize_keyword(k) for k in keywords]
+            removed = self._unregister(keywords, seq)
+            self.applied = seq
+            return removed
+
+    def catch_up(self) -> None:
+        """Apply changes other processes have committed"""
+        with self._lock:
+            self._catch_up(None)
+
+    def start(self) -> None:
+        """Follow other processes' changes in the background"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="keyword-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "applied": self.applied, "instance": self.db.instance}
+
+    def _catch_up(self, until: Optional[int]) -> bool:
+        """Apply logged changes after ``applied``; False if it reloaded instead"""
+        changes = self.db.changes_since(self.applied, until)
+        if changes is None:
+            logger.info("Keyword change log moved past this process; reloading")
+            self.restore()
+            return False
+        for change in changes:
+            if change.op == "remove":
+                self._unregister(change.payload["keywords"], change.seq)
+            else:
+                first_id, last_id = change.payload["ids"]
+                mappings = self.db.mappings(first_id, last_id)
+                self._register(self._registrations(mappings), change.op == "replace", change.seq)
+            self.applied = change.seq
+            self.stats["followed"] += 1
+        return True
+
+    def _register(self, registrations: Sequence[tuple], replace: bool, seq: int) -> list[int]:
+        """Apply registrations; keyword events report ``seq`` as the version"""
+        if len(registrations) == 1 and not replace:
+            # Skip copying the whole keyword set for a single mapping
+            keyword, action, aliases = registrations[0]
+            return [self.listener.register_action(keyword, action, aliases=aliases, version=seq)]
+        return self.listener.register_actions(registrations, replace=replace, version=seq)
+
+    def _unregister(self, keywords: Sequence[str], seq: int) -> list[str]:
+        if len(keywords) == 1:
+            if self.listener.unregister_action(keywords[0], version=seq):
+                return [normalize_keyword(keywords[0])]
+            return []
+        return self.listener.unregister_actions(keywords, version=seq)
+
+    def _registrations(self, mappings: Iterable[StoredMapping]) -> list[tuple]:
+        # Mappings with identical params share one validated plan, but each gets its
+        # own action: the store treats a repeated callable as an alias of one action
+        plans: dict[tuple[str, str], Any] = {}
+        registrations = []
+        for mapping in mappings:
+            key = (mapping.action_type, mapping.params)
+            try:
+                plan = plans.get(key)
+                if plan is None:
+                    plan = plans[key] = self.registry.compile_plan(
+                        mapping.action_type, json.loads(mapping.params)
+                    )
+            except ValueError as e:
+                self.stats["skipped"] += 1
+                logger.warning(f"Skipping stored mapping for {list(mapping.keywords)}: {e}")
+                continue
+            action = self.registry.build_action(plan)
+            registrations.append((mapping.keywords[0], action, mapping.keywords[1:]))
+        return registrations
+
+    def _poll(self) -> None:
+        data_version = None
+        while not self._stop.wait(self.poll_interval):
+            try:
+                version = self.db.data_version()
+                if version != data_version:
+                    data_version = version
+                    self.catch_up()
+            except Exception as e:
+                logger.error(f"Following keyword changes failed: {e}")
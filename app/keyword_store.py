@@ -0,0 +1,229 @@
+"""
+Keyword Store Module
+"""
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Normalize a keyword the same way recognized text is normalized"""
+    return keyword.strip().lower()
+
+
+class ActionEntry:
+    """A registered action and the pattern IDs (aliases) that trigger it"""
+
+    __slots__ = ("action_id", "action", "pattern_ids")
+
+    def __init__(self, action_id: int, action: Callable):
+        self.action_id = action_id
+        self.action = action
+        self.pattern_ids: set[int] = set()
+
+    def copy(self) -> "ActionEntry":
+        entry = ActionEntry(self.action_id, self.action)
+        entry.pattern_ids = set(self.pattern_ids)
+        return entry
+
+
+class KeywordStore(Mapping):
+    """Many-to-many store of keyword patterns and actions
+
+    Every distinct normalized keyword gets a dense pattern ID and every
+    registered action gets an action ID. An action can be reachable from
+    several keywords (aliases) and a keyword can trigger several actions;
+    the action callable itself is stored exactly once.
+
+    Matchers report pattern IDs, and ``actions_for`` resolves a pattern ID
+    to its actions with a single list index. ``version`` increases on every
+    mutation so compiled matchers know when to rebuild. As a Mapping the
+    store reads like the old ``Dict[str, Callable]`` keyed by normalized
+    keyword, except each value is a tuple.
+    """
+
+    def __init__(self):
+        self._pattern_ids: Dict[str, int] = {}
+        self._patterns: List[Optional[str]] = []
+        self._pattern_action_ids: List[List[int]] = []
+        self._pattern_actions: List[tuple[Callable, ...]] = []
+        self._free_pattern_ids: List[int] = []
+        self._entries: Dict[int, ActionEntry] = {}
+        self._next_action_id = 1
+        self.version = 0
+
+    # Mapping interface: normalized keyword -> tuple of actions
+    def __getitem__(self, keyword: str) -> tuple[Callable, ...]:
+        return self._pattern_actions[self._pattern_ids[keyword]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pattern_ids)
+
+    def __len__(self) -> int:
+        return len(self._pattern_ids)
+
+    def __contains__(self, keyword) -> bool:
+        return keyword in self._pattern_ids
+
+    def add(self, keywords: Union[str, Iterable[str]], action: Callable) -> int:
+        """Register an action under one or more keywords and return its action ID"""
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        keywords = [normalize_keyword(k) for k in keywords]
+        if not keywords or not all(keywords):
+            raise ValueError("At least one non-empty keyword is required")
+
+        # Re-registering the same callable for a keyword is a no-op
+        for keyword in keywords:
+            pattern_id = self._pattern_ids.get(keyword)
+            if pattern_id is None:
+                continue
+            for action_id in self._pattern_action_ids[pattern_id]:
+                entry = self._entries[action_id]
+                if entry.action is action:
+                    for alias in keywords:
+                        self.add_alias(action_id, alias)
+                    return action_id
+
+        action_id = self._next_action_id
+        self._next_action_id += 1
+        self._entries[action_id] = ActionEntry(action_id, action)
+        for keyword in keywords:
+            self.add_alias(action_id, keyword)
+        return action_id
+
+    def add_alias(self, action_id: int, keyword: str) -> None:
+        """Make an existing action reachable from another keyword"""
+        entry = self._entries.get(action_id)
+        if entry is None:
+            raise KeyError(f"Unknown action ID: {action_id}")
+        pattern_id = self._intern(normalize_keyword(keyword))
+        if pattern_id in entry.pattern_ids:
+            return
+        entry.pattern_ids.add(pattern_id)
+        self._pattern_action_ids[pattern_id].append(action_id)
+        self._refresh(pattern_id)
+        self.version += 1
+
+    def remove_keyword(self, keyword: str) -> bool:
+        """Remove a keyword; actions left without any alias are dropped"""
+        pattern_id = self._pattern_ids.get(normalize_keyword(keyword))
+        if pattern_id is None:
+            return False
+        for action_id in self._pattern_action_ids[pattern_id]:
+            entry = self._entries[action_id]
+            entry.pattern_ids.discard(pattern_id)
+            if not entry.pattern_ids:
+                del self._entries[action_id]
+        self._release(pattern_id)
+        self.version += 1
+        return True
+
+    def remove_action(self, action_id: int) -> bool:
+        """Remove an action from every keyword it is registered under"""
+        entry = self._entries.pop(action_id, None)
+        if entry is None:
+            return False
+        for pattern_id in entry.pattern_ids:
+            action_ids = self._pattern_action_ids[pattern_id]
+            action_ids.remove(action_id)
+            if action_ids:
+                self._refresh(pattern_id)
+            else:
+                self._release(pattern_id)
+        self.version += 1
+        return True
+
+    def add_many(self, registrations: Iterable[tuple[Iterable[str], Callable]]) -> list[int]:
+        """Register many (keywords, action) pairs as a single change
+
+        ``version`` increases once, so matchers rebuild once for the batch.
+        """
+        version = self.version
+        action_ids = [self.add(list(keywords), action) for keywords, action in registrations]
+        self.version = version + 1
+        return action_ids
+
+    def remove_many(self, keywords: Iterable[str]) -> list[str]:
+        """Remove many keywords as a single change; returns those that existed"""
+        version = self.version
+        removed = [normalize_keyword(k) for k in keywords if self.remove_keyword(k)]
+        self.version = version + 1 if removed else version
+        return removed
+
+    def copy(self) -> "KeywordStore":
+        """Independent copy sharing the action callables"""
+        other = KeywordStore.__new__(KeywordStore)
+        other._pattern_ids = dict(self._pattern_ids)
+        other._patterns = list(self._patterns)
+        other._pattern_action_ids = [list(ids) for ids in self._pattern_action_ids]
+        other._pattern_actions = list(self._pattern_actions)
+        other._free_pattern_ids = list(self._free_pattern_ids)
+        other._entries = {action_id: e.copy() for action_id, e in self._entries.items()}
+        other._next_action_id = self._next_action_id
+        other.version = self.version
+        return other
+
+    def clear(self) -> None:
+        """Remove every keyword and action"""
+        version = self.version
+        self.__init__()
+        self.version = version + 1
+
+    def pattern_id(self, keyword: str) -> Optional[int]:
+        """Get the pattern ID for a keyword, or None if it is not registered"""
+        return self._pattern_ids.get(normalize_keyword(keyword))
+
+    def keyword_for(self, pattern_id: int) -> str:
+        """Get the keyword for a pattern ID"""
+        return self._patterns[pattern_id]
+
+    def actions_for(self, pattern_id: int) -> tuple[Callable, ...]:
+        """Get the actions for a pattern ID in O(1)"""
+        return self._pattern_actions[pattern_id]
+
+    def action_ids_for(self, pattern_id: int) -> tuple[int, ...]:
+        """Get the action IDs for a pattern ID"""
+        return tuple(self._pattern_action_ids[pattern_id])
+
+    def aliases(self, action_id: int) -> list[str]:
+        """Get every keyword an action is registered under"""
+        entry = self._entries.get(action_id)
+        if entry is None:
+            return []
+        return sorted(self._patterns[p] for p in entry.pattern_ids)
+
+    def patterns(self) -> Iterator[tuple[int, str]]:
+        """Iterate over (pattern ID, keyword) pairs"""
+        return ((pattern_id, keyword) for keyword, pattern_id in self._pattern_ids.items())
+
+    @property
+    def action_count(self) -> int:
+        """Number of distinct registered actions"""
+        return len(self._entries)
+
+    def _intern(self, keyword: str) -> int:
+        pattern_id = self._pattern_ids.get(keyword)
+        if pattern_id is not None:
+            return pattern_id
+        if self._free_pattern_ids:
+            pattern_id = self._free_pattern_ids.pop()
+            self._patterns[pattern_id] = keyword
+        else:
+            pattern_id = len(self._patterns)
+            self._patterns.append(keyword)
+            self._pattern_action_ids.append([])
+            self._pattern_actions.append(())
+        self._pattern_ids[keyword] = pattern_id
+        return pattern_id
+
+    def _release(self, pattern_id: int) -> None:
+        del self._pattern_ids[self._patterns[pattern_id]]
+        self._patterns[pattern_id] = None
+        self._pattern_action_ids[pattern_id] = []
+        self._pattern_actions[pattern_id] = ()
+        self._free_pattern_ids.append(pattern_id)
+
+    def _refresh(self, pattern_id: int) -> None:
+        self._pattern_actions[pattern_id] = tuple(
+            self._entries[a].action for a in self._pattern_action_ids[pattern_id]
+        )
@@ -0,0 +1,215 @@
+"""
+Compiled keyword matcher
+"""
+import re
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+
+class Hypothesis(NamedTuple):
+    """One recognition hypothesis with its score (0.0 - 1.0)"""
+
+    text: str
+    score: float = 1.0
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over keyword patterns
+
+    Built once per keyword set from (pattern ID, keyword) pairs. Scanning a
+    text costs O(len(text) + matches) no matter how many keywords are
+    registered, so matching all N-best hypotheses stays linear in their
+    total length.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[int, str]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._depth: list[int] = [0]
+        self.pattern_count = 0
+        self.max_length = 0
+        for pattern_id, keyword in patterns:
+            self._insert(keyword, pattern_id)
+        self._link()
+        # Finds the next character that can start a keyword; never matches without keywords
+        starts = "".join(re.escape(ch) for ch in self._goto[0])
+        self._next_start = re.compile(f"[{starts}]" if starts else "(?!)").search
+
+    def _insert(self, keyword: str, pattern_id: int) -> None:
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._depth.append(self._depth[state] + 1)
+            state = nxt
+        self._out[state] += (pattern_id,)
+        self.pattern_count += 1
+        self.max_length = max(self.max_length, len(keyword))
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] += self._out[self._fail[nxt]]
+
+    def step(self, state: int, ch: str) -> int:
+        """Advance the automaton by one character"""
+        goto = self._goto
+        while state and ch not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(ch, 0)
+
+    def outputs(self, state: int) -> tuple[int, ...]:
+        """Pattern IDs that end at this state"""
+        return self._out[state]
+
+    def depth(self, state: int) -> int:
+        """Length of the keyword prefix this state represents"""
+        return self._depth[state]
+
+    def start(self, carry_chars: Optional[int] = None) -> "MatchState":
+        """Begin an incremental scan"""
+        return MatchState(self, carry_chars)
+
+    def find(self, text: str) -> list[int]:
+        """Return distinct pattern IDs found in text, in order of first occurrence"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: dict[int, None] = {}
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for pattern_id in out[state]:
+                    found.setdefault(pattern_id)
+        return list(found)
+
+    def find_many(self, texts: Iterable[str]) -> list[list[int]]:
+        """``find`` for each of many texts
+
+        Most of a transcript is text that cannot start a keyword, and the
+        automaton stays at its root there. A regex search skips over such
+        runs in C, so the Python loop only walks the stretches that might
+        match.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        next_start = self._next_start
+        results = []
+        for text in texts:
+            found: Optional[dict[int, None]] = None
+            end = len(text)
+            hit = next_start(text)
+            while hit:
+                i = hit.start()
+                state = 0
+                while i < end:
+                    ch = text[i]
+                    while state and ch not in goto[state]:
+                        state = fail[state]
+                    state = goto[state].get(ch, 0)
+                    i += 1
+                    if out[state]:
+                        if found is None:
+                            found = {}
+                        for pattern_id in out[state]:
+                            found.setdefault(pattern_id)
+                    if not state:
+                        # ``ch`` cannot start a keyword either, so resume the search after it
+                        break
+                hit = next_start(text, i) if i < end else None
+            results.append(list(found) if found else [])
+        return results
+
+    def match_hypotheses(
+        self, hypotheses: Sequence[Hypothesis], min_score: float = 0.0
+    ) -> list[tuple[int, float]]:
+        """Match every hypothesis and weight each pattern by its best hypothesis score
+
+        Returns (pattern ID, score) pairs with score >= min_score, best first.
+        """
+        scores: dict[int, float] = {}
+        for hypothesis in hypotheses:
+            for pattern_id in self.find(hypothesis.text):
+                if hypothesis.score > scores.get(pattern_id, -1.0):
+                    scores[pattern_id] = hypothesis.score
+        ranked = [(p, s) for p, s in scores.items() if s >= min_score]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+
+class MatchState:
+    """Resumable position of an incremental scan over a growing transcript
+
+    ``feed`` consumes only the new text and returns the keyword occurrences
+    it completed, so a transcript that grows by small deltas is scanned once
+    in total instead of once per delta.
+
+    At a phrase boundary the automaton state is carried over, so a keyword
+    split across two consecutive phrases still matches. The carry is bounded:
+    a partial keyword longer than ``carry_chars`` (by default the longest
+    keyword) is dropped, and only one boundary is bridged at a time.
+
+    The state keeps using the matcher it was started from; start a new
+    state to pick up keyword changes.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, carry_chars: Optional[int] = None):
+        self.matcher = matcher
+        self.carry_chars = matcher.max_length if carry_chars is None else carry_chars
+        self.state = 0
+        self.offset = 0
+        self._phrase_start = 0
+
+    def feed(self, delta: str) -> list[tuple[int, int]]:
+        """Consume a text delta and return newly completed (pattern ID, end offset) pairs"""
+        matcher = self.matcher
+        goto, fail, out = matcher._goto, matcher._fail, matcher._out
+        state = self.state
+        offset = self.offset
+        completed = []
+        for ch in delta:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            offset += 1
+            if out[state]:
+                for pattern_id in out[state]:
+                    completed.append((pattern_id, offset))
+        self.state = state
+        self.offset = offset
+        return completed
+
+    def end_phrase(self) -> None:
+        """Mark a phrase boundary, keeping at most ``carry_chars`` of a partial keyword"""
+        matcher = self.matcher
+        state = self.state
+        # A carried prefix may not reach back past the start of the previous phrase
+        limit = min(self.carry_chars, self.offset - self._phrase_start)
+        while state and matcher.depth(state) > limit:
+            state = matcher._fail[state]
+        self.state = state
+        self._phrase_start = self.offset
+
+    def reset(self) -> None:
+        """Forget any partial match"""
+        self.state = 0
+        self._phrase_start = self.offset
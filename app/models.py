@@ -1,8 +1,35 @@
 """
 Pydantic Models for API
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Literal, Optional
+
+
+class ActionParams(BaseModel):
+    """Base for typed, immutable action parameter schemas"""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+
+class CallParams(ActionParams):
+    """Parameters for the call action"""
+
+    contact: str = "엄마"
+    number: str = ""
+
+
+class MusicParams(ActionParams):
+    """Parameters for the music action"""
+
+    song: str = ""
+    playlist: str = ""
+
+
+class LightsParams(ActionParams):
+    """Parameters for the lights action"""
+
+    state: Literal["on", "off"] = "off"
+    room: str = "전체"
 
 
 class KeywordActionCreate(BaseModel):
@@ -15,6 +42,9 @@ class KeywordActionCreate(BaseModel):
     action_params: Optional[dict] = Field(
         default=None, description="Additional parameters for the action"
     )
+    aliases: list[str] = Field(
+        default_factory=list, description="Other keywords that trigger the same action"
+    )
 
 
 class KeywordActionResponse(BaseModel):
@@ -23,9 +53,87 @@ class KeywordActionResponse(BaseModel):
     keyword: str
     action_type: str
     action_params: Optional[dict] = None
+    aliases: list[str] = Field(default_factory=list)
+    action_id: Optional[int] = None
     is_active: bool = True
 
 
+class KeywordBulkCreate(BaseModel):
+    """Model for registering many keyword-action mappings in one request"""
+
+    keywords: list[KeywordActionCreate] = Field(..., max_length=100_000)
+
+
+class KeywordBulkDelete(BaseModel):
+    """Model for deleting many keywords in one request"""
+
+    keywords: list[str] = Field(..., max_length=100_000)
+
+
+class MatchBatchRequest(BaseModel):
+    """Model for matching many transcripts in one request"""
+
+    transcripts: list[str] = Field(..., max_length=1_000_000)
+
+
+class MatchBatchResponse(BaseModel):
+    """Model for the matches of a transcript batch"""
+
+    matches: list[list[str]] = Field(
+        ..., description="Per transcript, in order: matched keywords and commands"
+    )
+    lines: int
+    matched: int = Field(..., description="Transcripts with at least one match")
+    dry_run: bool
+    dispatched: int = Field(
+        0, description="Distinct actions and commands run, each once for the whole batch"
+    )
+
+
+class KeywordBulkResponse(BaseModel):
+    """Model for the result of a bulk keyword change"""
+
+    added: int = Field(0, description="Keywords that were not registered before")
+    removed: int = Field(0, description="Keywords removed")
+    missing: list[str] = Field(default_factory=list, description="Keywords that were not registered")
+    count: int = Field(..., description="Registered keywords after the change")
+    version: int = Field(..., description="Keyword set version after the change")
+
+
+class KeywordSearchResult(BaseModel):
+    """Model for a scored keyword search hit"""
+
+    keyword: str
+    score: float
+
+
+class CommandTemplateCreate(BaseModel):
+    """Model for creating a parameterized command template"""
+
+    template: str = Field(
+        ..., min_length=1, description="Template with slots, e.g. '{room} 불 {state}'"
+    )
+    action_type: str = Field(
+        ..., description="Type of action (call, music, lights, custom)"
+    )
+    slots: Optional[dict[str, dict[str, str]]] = Field(
+        default=None, description="Slot vocabularies: slot -> {spoken form: param value}"
+    )
+    action_params: Optional[dict] = Field(
+        default=None, description="Fixed parameters merged under the extracted slots"
+    )
+
+
+class CommandTemplateResponse(BaseModel):
+    """Model for command template response"""
+
+    template_id: int
+    template: str
+    action_type: str
+    slot_names: list[str]
+    action_params: Optional[dict] = None
+
+
 class ListenRequest(BaseModel):
     """Model for listen request"""
 
@@ -33,6 +141,19 @@ class ListenRequest(BaseModel):
     phrase_time_limit: int = Field(
         default=5, ge=1, le=30, description="Phrase time limit in seconds"
     )
+    action_wait: float = Field(
+        default=0.5,
+        ge=0,
+        le=30,
+        description="Seconds to wait for triggered actions before returning them as pending",
+    )
+
+
+class RecognitionHypothesis(BaseModel):
+    """Model for one N-best recognition hypothesis"""
+
+    text: str
+    score: float
 
 
 class ListenResponse(BaseModel):
@@ -42,11 +163,101 @@ class ListenResponse(BaseModel):
     triggered_keywords: list[str]
     success: bool
     action_messages: list[str] = Field(default_factory=list, description="Messages from triggered actions")
+    hypotheses: list[RecognitionHypothesis] = Field(
+        default_factory=list, description="N-best recognition hypotheses, best first"
+    )
+    pending_action_ids: list[str] = Field(
+        default_factory=list, description="Actions still running; poll /actions/{id}"
+    )
+    degraded: bool = Field(
+        default=False, description="Recognized with the cheaper model because the server was busy"
+    )
+
+
+class ActionStatusResponse(BaseModel):
+    """Model for the status of a submitted action"""
+
+    action_id: str
+    keyword: str
+    action_type: str
+    priority: Optional[int] = None
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    coalesced_into: Optional[str] = None
+
+
+class DeviceStateUpdate(BaseModel):
+    """Model for an externally reported device state"""
+
+    action_type: str = Field(..., description="Action type controlling the device, e.g. lights")
+    target: dict[str, Any] = Field(..., description="Target params, e.g. {'room': '거실'}")
+    state: dict[str, Any] = Field(..., description="Current state, e.g. {'state': 'on'}")
+
+
+class DeviceInvalidate(BaseModel):
+    """Model for forgetting cached device states"""
+
+    action_type: Optional[str] = Field(
+        default=None, description="Action type; omit to forget every device"
+    )
+    target: Optional[dict[str, Any]] = Field(
+        default=None, description="Target params; omit to forget every device of the type"
+    )
+
+
+class DeviceStateResponse(BaseModel):
+    """Model for a cached device state"""
+
+    action_type: str
+    target: dict[str, Any]
+    state: dict[str, Any]
+    source: str
+    age: float
+
+
+class ContinuousStatusResponse(BaseModel):
+    """Model for the background listening pipeline's status"""
+
+    running: bool
+    state: str = Field(..., description="stopped, starting, running or restarting")
+    started_at: Optional[float] = None
+    queue_depth: int = Field(..., description="Captured phrases waiting for recognition")
+    phrases_per_minute: int = Field(..., description="Phrases recognized in the last minute")
+    avg_recognition_ms: Optional[float] = None
+    last_text: Optional[str] = None
+    last_error: Optional[str] = None
+    captured: int
+    recognized: int
+    triggered: int
+    dropped: int
+    errors: int
+    restarts: int
+
+
+class ListenJobResponse(BaseModel):
+    """Model for a queued recognition job"""
+
+    job_id: str
+    tenant: str
+    status: str = Field(..., description="queued, running, done, failed or cancelled")
+    result: Optional[ListenResponse] = Field(default=None, description="Set once the job is done")
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 
 class StatusResponse(BaseModel):
     """Model for status response"""
 
     is_listening: bool
-    registered_keywords: list[str]
+    keywords_version: int = Field(0, description="Changes whenever the keyword set changes")
+    keyword_count: int = 0
+    registered_keywords: Optional[list[str]] = Field(
+        default=None, description="Only included with ?include_keywords=true"
+    )
     message: str
\ No newline at end of file
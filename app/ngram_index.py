@@ -0,0 +1,127 @@
+"""
+Character n-gram inverted index for large keyword vocabularies
+"""
+import math
+import sys
+from typing import Dict, Iterable, List
+
+# Slack for float rounding when a score sits exactly on ``min_score``
+_EPSILON = 1e-9
+
+
+def _grams(text: str, n: int) -> List[str]:
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def substring_distance(pattern: str, text: str) -> int:
+    """Smallest edit distance between pattern and any substring of text (Sellers)"""
+    if not pattern:
+        return 0
+    prev = list(range(len(pattern) + 1))
+    best = prev[-1]
+    for ch in text:
+        cur = [0]
+        for i, pch in enumerate(pattern, 1):
+            cur.append(min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (pch != ch)))
+        best = min(best, cur[-1])
+        prev = cur
+    return best
+
+
+class NgramIndex:
+    """Inverted index from character n-grams to keyword pattern IDs
+
+    A query collects the n-grams of the transcript, counts how many of each
+    keyword's grams it shares, and only verifies keywords whose count could
+    still reach ``min_score`` (the q-gram count filter). Verification is an
+    exact substring check, falling back to the best approximate substring
+    edit distance, so results are precise while most of the vocabulary is
+    never touched.
+    """
+
+    def __init__(self, n: int = 2, patterns: Iterable[tuple[int, str]] = ()):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        self.n = n
+        self._postings: Dict[str, List[int]] = {}
+        self._keywords: Dict[int, str] = {}
+        self._gram_counts: Dict[int, int] = {}
+        self._short: Dict[int, str] = {}
+        for pattern_id, keyword in patterns:
+            self.add(pattern_id, keyword)
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def add(self, pattern_id: int, keyword: str) -> None:
+        """Index a keyword under its pattern ID"""
+        self.remove(pattern_id)
+        self._keywords[pattern_id] = keyword
+        if len(keyword) < self.n:
+            self._short[pattern_id] = keyword
+            return
+        grams = set(_grams(keyword, self.n))
+        self._gram_counts[pattern_id] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(pattern_id)
+
+    def remove(self, pattern_id: int) -> bool:
+        """Remove a keyword from the index"""
+        keyword = self._keywords.pop(pattern_id, None)
+        if keyword is None:
+            return False
+        if self._short.pop(pattern_id, None) is None:
+            del self._gram_counts[pattern_id]
+            for gram in set(_grams(keyword, self.n)):
+                posting = self._postings[gram]
+                posting.remove(pattern_id)
+                if not posting:
+                    del self._postings[gram]
+        return True
+
+    def candidates(self, text: str, min_score: float = 1.0) -> List[int]:
+        """Pattern IDs that share enough n-grams with text to possibly score min_score"""
+        counts: Dict[int, int] = {}
+        postings = self._postings
+        for gram in set(_grams(text, self.n)):
+            for pattern_id in postings.get(gram, ()):
+                counts[pattern_id] = counts.get(pattern_id, 0) + 1
+
+        result = []
+        for pattern_id, shared in counts.items():
+            length = len(self._keywords[pattern_id])
+            max_edits = math.floor((1.0 - min_score) * length + _EPSILON)
+            needed = max(1, self._gram_counts[pattern_id] - self.n * max_edits)
+            if shared >= needed:
+                result.append(pattern_id)
+        result.extend(p for p, kw in self._short.items() if kw in text)
+        return result
+
+    def search(
+        self, text: str, k: int = 5, min_score: float = 1.0
+    ) -> List[tuple[int, float]]:
+        """Top-k (pattern ID, score) matches; score 1.0 means an exact substring"""
+        scored = []
+        for pattern_id in self.candidates(text, min_score):
+            keyword = self._keywords[pattern_id]
+            if keyword in text:
+                score = 1.0
+            elif min_score >= 1.0:
+                continue
+            else:
+                score = 1.0 - substring_distance(keyword, text) / len(keyword)
+            if score >= min_score - _EPSILON:
+                scored.append((pattern_id, score, len(keyword)))
+        # Prefer higher scores, then longer (more specific) keywords
+        scored.sort(key=lambda item: (item[1], item[2]), reverse=True)
+        return [(pattern_id, score) for pattern_id, score, _ in scored[:k]]
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index structures"""
+        total = sys.getsizeof(self._postings) + sys.getsizeof(self._keywords)
+        total += sys.getsizeof(self._gram_counts) + sys.getsizeof(self._short)
+        for gram, posting in self._postings.items():
+            total += sys.getsizeof(gram) + sys.getsizeof(posting)
+        for keyword in self._keywords.values():
+            total += sys.getsizeof(keyword)
+        return total
@@ -0,0 +1,262 @@
+"""
+Offloading blocking work from the event loop
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a blocking pool has no room for more work"""
+
+    retry_after = 1
+
+
+class OverloadedError(PoolSaturatedError):
+    """Raised when an endpoint's wait queue is full or the wait took too long"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BlockingPool:
+    """Bounded thread pool for blocking calls awaited from async handlers
+
+    At most ``workers`` calls run at once and ``max_queue`` more may wait;
+    beyond that ``run`` refuses work immediately with ``PoolSaturatedError``
+    instead of letting requests pile up behind a slow microphone or model.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue: int = 4):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self.max_wait_ms = 0.0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run ``fn`` on the pool and await its result"""
+        with self._lock:
+            if self.inflight >= self.workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise PoolSaturatedError(f"'{self.name}' is busy, try again later")
+            self.inflight += 1
+            self.stats["submitted"] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=self.name)
+            executor = self._executor
+        queued_at = time.perf_counter()
+
+        def call():
+            wait_ms = (time.perf_counter() - queued_at) * 1000
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            return fn(*args, **kwargs)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, call)
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        else:
+            self.stats["completed"] += 1
+            return result
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the threads; the pool restarts on the next call"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "inflight": self.inflight,
+                "capacity": self.workers + self.max_queue,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+
+def _percentile(samples, fraction: float) -> Optional[float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+class ConcurrencyLimit:
+    """Admission control for one endpoint
+
+    At most ``limit`` requests run at once and up to ``max_queue`` more wait
+    for a slot, first come first served, for at most ``max_wait`` seconds.
+    Anything beyond that fails fast with ``OverloadedError``, whose
+    ``retry_after`` estimates when a slot frees up from the recent average
+    time a request holds one. ``under_pressure`` turns true once
+    ``degrade_at`` requests are waiting, so callers can pick cheaper work.
+    Belongs to one event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int,
+        max_wait: float = 10.0,
+        degrade_at: Optional[int] = None,
+        samples: int = 1000,
+    ):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.degrade_at = degrade_at
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._waits: deque[float] = deque(maxlen=samples)
+        self._hold_s = 0.0
+        self.max_depth = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0, "degraded": 0}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def under_pressure(self) -> bool:
+        return self.degrade_at is not None and self.waiting >= self.degrade_at
+
+    def retry_after(self) -> int:
+        """Seconds until a request arriving now would likely get a slot"""
+        return max(1, math.ceil(self._hold_s * (self.waiting + 1) / self.limit))
+
+    def check(self) -> None:
+        """Raise ``OverloadedError`` now if a request could not even wait for a slot"""
+        if self.active >= self.limit and len(self._waiters) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise OverloadedError(f"'{self.name}' is overloaded, try again later", self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the body of the ``async with``"""
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            # Moving average of recent requests, for Retry-After
+            self._hold_s = held if not self._hold_s else 0.8 * self._hold_s + 0.2 * held
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.stats["admitted"] += 1
+            self._waits.append(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise OverloadedError(f"'{self.name}' is overloaded, try again later", self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        self.max_depth = max(self.max_depth, len(self._waiters))
+        queued_at = time.perf_counter()
+        try:
+            # The slot is handed over by _release, so ``active`` already counts us
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise OverloadedError(
+                f"'{self.name}' had no free slot within {self.max_wait:g}s", self.retry_after()
+            )
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.stats["admitted"] += 1
+        self._waits.append((time.perf_counter() - queued_at) * 1000)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "active": self.active,
+            "waiting": self.waiting,
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "max_depth": self.max_depth,
+            "wait_p50_ms": _percentile(self._waits, 0.5),
+            "wait_p99_ms": _percentile(self._waits, 0.99),
+            "avg_hold_ms": round(self._hold_s * 1000, 3),
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a short sleep
+
+    A responsive loop wakes within a fraction of a millisecond; lag near
+    the length of a blocking call means that call ran on the loop.
+    """
+
+    def __init__(self, interval: float = 0.1, samples: int = 600):
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=samples)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - start - self.interval) * 1000)
+            self._lags.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def snapshot(self) -> dict:
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0, "lag_p50_ms": None, "lag_p99_ms": None, "max_lag_ms": None}
+        return {
+            "samples": len(lags),
+            "lag_p50_ms": round(lags[len(lags) // 2], 3),
+            "lag_p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
@@ -0,0 +1,414 @@
+"""
+Durable action outbox
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Mapping, NamedTuple, Optional
+
+from app.actions import ActionRegistry
+from app.executor import ActionExecutor, ActionHandle, ExecutorSaturatedError
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    keyword TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_attempt_at);
+"""
+
+
+class OutboxEntry(NamedTuple):
+    """One action recorded in the outbox"""
+
+    idempotency_key: str
+    keyword: str
+    action_type: str
+    params: Mapping[str, Any]
+    created_at: float
+    attempts: int = 0
+
+
+class ActionOutbox:
+    """Append-only SQLite (WAL) log of triggered actions
+
+    ``enqueue`` hands an entry to a single writer thread, which inserts
+    everything that arrived while the previous commit was running in one
+    transaction (group commit) and then resolves each entry's future, so
+    callers wait for durability without paying one fsync per action.
+    Acknowledgements are batched the same way.
+
+    Entries are unique by idempotency key; enqueueing a key twice keeps the
+    first entry. A new entry becomes due for background delivery only after
+    ``retry_delay`` seconds, leaving the triggering caller time to deliver
+    it first. A failed delivery is retried with exponential backoff until
+    ``max_attempts`` is reached, after which the entry is marked ``failed``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 512,
+        max_attempts: int = 5,
+        retry_delay: float = 1.0,
+        retention: float = 86400.0,
+    ):
+        self.path = path
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._writes: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.stats = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "commits": 0,
+            "delivered": 0,
+            "failed": 0,
+            "retried": 0,
+        }
+
+    def enqueue(
+        self,
+        keyword: str,
+        action_type: str,
+        params: Mapping[str, Any],
+        idempotency_key: Optional[str] = None,
+    ) -> Future:
+        """Record an action; the future resolves to (entry, is_new) once committed"""
+        entry = OutboxEntry(
+            idempotency_key or uuid.uuid4().hex,
+            keyword,
+            action_type,
+            dict(params),
+            time.time(),
+        )
+        if self._closed:
+            raise RuntimeError("Outbox is closed")
+        future: Future = Future()
+        self._ensure_started()
+        self._writes.put(("insert", entry, future))
+        return future
+
+    def ack(
+        self, idempotency_key: str, success: bool, attempts: int, error: Optional[str] = None
+    ) -> Future:
+        """Record the outcome of a delivery attempt; the future resolves once committed
+
+        After ``close`` acks are dropped and the entry is delivered again on
+        the next start.
+        """
+        future: Future = Future()
+        if self._closed:
+            future.set_result(None)
+            return future
+        self._ensure_started()
+        self._writes.put(("ack", (idempotency_key, success, attempts, error), future))
+        return future
+
+    def due(
+        self, limit: int = 500, exclude: frozenset = frozenset(), all_pending: bool = False
+    ) -> list[OutboxEntry]:
+        """Pending entries whose next attempt is due (or all of them), oldest first"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT idempotency_key, keyword, action_type, params, created_at, attempts "
+                "FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY seq LIMIT ?",
+                (float("inf") if all_pending else time.time(), limit + len(exclude)),
+            ).fetchall()
+        entries = [
+            OutboxEntry(key, keyword, action_type, json.loads(params), created_at, attempts)
+            for key, keyword, action_type, params, created_at, attempts in rows
+            if key not in exclude
+        ]
+        return entries[:limit]
+
+    def counts(self) -> dict:
+        """Number of entries per status"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def prune(self) -> int:
+        """Delete delivered entries older than ``retention`` seconds"""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'delivered' AND finished_at < ?",
+                (time.time() - self.retention,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Commit everything queued so far and close the database"""
+        with self._start_lock:
+            self._closed = True
+            if self._writer is not None:
+                self._writes.put(None)
+                self._writer.join()
+                self._writer = None
+        with self._db_lock:
+            self._conn.close()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "by_status": self.counts()}
+
+    def _ensure_started(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="outbox-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            batch = [item]
+            # Everything that queued up behind the last commit goes into this one
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit(batch)
+                    return
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: list) -> None:
+        results = []
+        try:
+            with self._db_lock:
+                self._conn.execute("BEGIN")
+                for kind, payload, future in batch:
+                    if kind == "insert":
+                        results.append((future, payload, self._insert(payload)))
+                    else:
+                        self._apply_ack(*payload)
+                        results.append((future, None, None))
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.error(f"Outbox commit failed: {e}")
+            with self._db_lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+            for kind, _, future in batch:
+                if future is not None:
+                    future.set_exception(e)
+            return
+        self.stats["commits"] += 1
+        for future, entry, is_new in results:
+            if entry is None:
+                future.set_result(None)
+                continue
+            self.stats["enqueued" if is_new else "duplicates"] += 1
+            future.set_result((entry, is_new))
+
+    def _insert(self, entry: OutboxEntry) -> bool:
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO outbox "
+            "(idempotency_key, keyword, action_type, params, created_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                entry.idempotency_key,
+                entry.keyword,
+                entry.action_type,
+                json.dumps(entry.params, ensure_ascii=False),
+                entry.created_at,
+                entry.created_at + self.retry_delay,
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def _apply_ack(self, key: str, success: bool, attempts: int, error: Optional[str]) -> None:
+        now = time.time()
+        if success:
+            self.stats["delivered"] += 1
+            self._conn.execute(
+                "UPDATE outbox SET status = 'delivered', attempts = ?, finished_at = ?, error = NULL "
+                "WHERE idempotency_key = ?",
+                (attempts, now, key),
+            )
+        elif attempts >= self.max_attempts:
+            self.stats["failed"] += 1
+            self._conn.execute(
+                "UPDATE outbox SET status = 'failed', attempts = ?, finished_at = ?, error = ? "
+                "WHERE idempotency_key = ?",
+                (attempts, now, error, key),
+            )
+        else:
+            self.stats["retried"] += 1
+            self._conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, error = ? "
+                "WHERE idempotency_key = ?",
+                (attempts, now + self.retry_delay * 2 ** (attempts - 1), error, key),
+            )
+
+
+class OutboxDispatcher:
+    """Delivers outbox entries through the action executor and acknowledges them
+
+    ``submit`` records an action durably and dispatches it right away. A
+    background thread dispatches whatever is still pending: entries left
+    over from before a restart and failed deliveries due for a retry, which
+    are rebuilt from their stored params through the registry. An
+    entry stays pending until its acknowledgement is committed, so delivery
+    is at-least-once; handlers that take an ``idempotency_key`` argument get
+    the entry's key to deduplicate replays on the provider side.
+    """
+
+    def __init__(
+        self,
+        outbox: ActionOutbox,
+        executor: ActionExecutor,
+        registry: ActionRegistry,
+        poll_interval: float = 1.0,
+        prune_interval: float = 3600.0,
+    ):
+        self.outbox = outbox
+        self.executor = executor
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        self._inflight: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"dispatched": 0, "replayed": 0}
+
+    def submit(
+        self, keyword: str, action: Callable, idempotency_key: Optional[str] = None
+    ) -> Optional[ActionHandle]:
+        """Record a registry-built action, wait for the commit and dispatch it
+
+        ``action`` comes from ``ActionRegistry.create_action``; its plan is
+        recorded and the action itself runs, so its params are not validated
+        again. Returns None for a duplicate idempotency key. Raises
+        ``ExecutorSaturatedError`` when the executor is full; the entry is
+        then delivered later by the background thread.
+        """
+        plan = action.plan
+        entry, is_new = self.outbox.enqueue(
+            keyword, plan.action_type, plan.params, idempotency_key
+        ).result()
+        if not is_new:
+            return None
+        return self._dispatch(entry, action)
+
+    def start(self) -> None:
+        """Start background delivery, beginning with entries left from a previous run"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            inflight = len(self._inflight)
+        return {**self.stats, "inflight": inflight, **self.outbox.snapshot()}
+
+    def _dispatch(
+        self, entry: OutboxEntry, action: Optional[Callable] = None
+    ) -> Optional[ActionHandle]:
+        """Run an entry's action, rebuilding it from the stored params if not given"""
+        key = entry.idempotency_key
+        with self._lock:
+            if key in self._inflight:
+                return None
+            self._inflight.add(key)
+        if action is None:
+            try:
+                action = self.registry.create_action(entry.action_type, entry.params)
+            except ValueError as e:
+                # The action type or its params are no longer valid; retrying cannot help
+                logger.error(f"Outbox entry {key} cannot be delivered: {e}")
+                self._release(key, self.outbox.ack(key, False, self.outbox.max_attempts, str(e)))
+                return None
+        try:
+            handle = self.executor.submit(
+                action, entry.keyword, entry.action_type, action.action_params, idempotency_key=key
+            )
+        except ExecutorSaturatedError:
+            self._release(key)
+            raise
+        self.stats["dispatched"] += 1
+        handle.future.add_done_callback(lambda _: self._settle(entry, handle))
+        return handle
+
+    def _settle(self, entry: OutboxEntry, handle: ActionHandle) -> None:
+        ack = self.outbox.ack(
+            entry.idempotency_key, handle.status == "success", entry.attempts + 1, handle.error
+        )
+        self._release(entry.idempotency_key, ack)
+
+    def _release(self, key: str, ack: Optional[Future] = None) -> None:
+        """Stop tracking an entry as in flight once its ack is committed"""
+        def release(_=None):
+            with self._lock:
+                self._inflight.discard(key)
+
+        if ack is None:
+            release()
+        else:
+            ack.add_done_callback(release)
+
+    def _poll(self) -> None:
+        last_prune = time.monotonic()
+        # Nothing from a previous run is in flight, so everything pending is due now
+        replaying = True
+        while True:
+            with self._lock:
+                inflight = frozenset(self._inflight)
+            try:
+                for entry in self.outbox.due(exclude=inflight, all_pending=replaying):
+                    if self._dispatch(entry) is not None:
+                        self.stats["replayed"] += 1
+                if time.monotonic() - last_prune >= self.prune_interval:
+                    self.outbox.prune()
+                    last_prune = time.monotonic()
+                replaying = False
+            except ExecutorSaturatedError:
+                pass
+            except sqlite3.Error as e:
+                logger.error(f"Outbox poll failed: {e}")
+            if self._stop.wait(self.poll_interval):
+                return
@@ -0,0 +1,265 @@
+"""
+Circuit breakers and retry budgets for outbound action handlers
+"""
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a handler whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Per-integration circuit breaker
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go through now"""
+        with self._lock:
+            if self.state == "open":
+                if self._clock() - self.opened_at < self.reset_timeout:
+                    self.stats["rejected"] += 1
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    self.stats["rejected"] += 1
+                    return False
+                self._trial_in_flight = True
+            self.stats["calls"] += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.stats["successes"] += 1
+            self.failures = 0
+            self.state = "closed"
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.stats["failures"] += 1
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                    logger.warning(f"Circuit '{self.name}' opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def reset(self) -> None:
+        """Close the circuit manually"""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == "open":
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in": retry_in,
+                **self.stats,
+            }
+
+
+class RetryBudget:
+    """Global cap on retries across all integrations
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    with a floor of ``min_per_second`` tokens refilled each second, so retries
+    stay a bounded fraction of traffic even when every provider is failing.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+        self._updated = clock()
+        self.stats = {"requests": 0, "retries": 0, "exhausted": 0}
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Record a first attempt"""
+        with self._lock:
+            self._refill()
+            self.stats["requests"] += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for a retry; False when the budget is exhausted"""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                self.stats["exhausted"] += 1
+                return False
+            self._tokens -= 1.0
+            self.stats["retries"] += 1
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._refill()
+            return {"tokens": round(self._tokens, 3), **self.stats}
+
+
+class Resilience:
+    """Wraps action handlers with a circuit breaker each and a shared retry budget
+
+    A failed call is retried up to ``max_attempts`` times with full-jitter
+    exponential backoff, but only while the retry budget has tokens and the
+    circuit stays closed. When a circuit is open, calls raise
+    ``CircuitOpenError`` immediately instead of waiting on the provider.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        budget: Optional[RetryBudget] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.budget = budget or RetryBudget(clock=clock)
+        self._clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name, self.failure_threshold, self.reset_timeout, self._clock
+                )
+                self.breakers[name] = breaker
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _admit(self, breaker: CircuitBreaker) -> None:
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit '{breaker.name}' is open")
+        self.budget.deposit()
+
+    def _should_retry(self, breaker: CircuitBreaker, attempt: int) -> bool:
+        return (
+            attempt < self.max_attempts
+            and breaker.state == "closed"
+            and self.budget.withdraw()
+        )
+
+    def call(self, name: str, handler: Callable, params: dict):
+        """Call a sync handler under the breaker and retry budget"""
+        breaker = self.breaker(name)
+        self._admit(breaker)
+        attempt = 1
+        while True:
+            try:
+                result = handler(params)
+            except Exception as e:
+                breaker.record_failure()
+                if not self._should_retry(breaker, attempt):
+                    raise
+                logger.info(f"Retrying '{name}' after failure: {e}")
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    async def call_async(self, name: str, handler: Callable, params: dict):
+        """Await an async handler under the breaker and retry budget"""
+        breaker = self.breaker(name)
+        self._admit(breaker)
+        attempt = 1
+        while True:
+            try:
+                result = await handler(params)
+            except Exception as e:
+                breaker.record_failure()
+                if not self._should_retry(breaker, attempt):
+                    raise
+                logger.info(f"Retrying '{name}' after failure: {e}")
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    def guard(self, name: str, handler: Callable) -> Callable:
+        """Wrap a handler, keeping it sync or async like the original"""
+        if inspect.iscoroutinefunction(handler):
+            async def guarded(params: dict):
+                return await self.call_async(name, handler, params)
+        else:
+            def guarded(params: dict):
+                return self.call(name, handler, params)
+        return guarded
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            breakers = dict(self.breakers)
+        return {
+            "circuits": {name: b.snapshot() for name, b in breakers.items()},
+            "retry_budget": self.budget.snapshot(),
+        }
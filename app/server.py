@@ -0,0 +1,164 @@
+"""
+Pre-fork multi-worker server
+"""
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def worker_outbox_path(path: str, worker: int) -> str:
+    """Give each worker its own outbox file
+
+    A worker replays every pending entry of its outbox at startup, so sharing
+    one file would let a starting worker re-deliver actions another worker is
+    still running. A respawned worker reuses its predecessor's file and picks
+    up what it left behind.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+
+def preload_app(app_path: str = "app.api:app"):
+    """Import the app and load the recognition model before forking
+
+    Forked workers share the loaded pages copy-on-write instead of each
+    loading their own copy. Missing Whisper (or a failed download) only
+    costs the preload; workers fall back as ``recognize_nbest`` always has.
+    """
+    import importlib
+
+    from app.voice_listener import VoiceListener, load_whisper_model
+
+    module_name, _, name = app_path.partition(":")
+    module = importlib.import_module(module_name)
+    # The regular model, and the cheaper one used while the server is busy
+    models = [VoiceListener().whisper_model, getattr(module, "DEGRADED_WHISPER_MODEL", None)]
+    for model in dict.fromkeys(filter(None, models)):
+        start = time.perf_counter()
+        try:
+            load_whisper_model(model)
+            print(f"Loaded Whisper model '{model}' in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            print(f"⚠️  Whisper model '{model}' not preloaded: {e}")
+    return getattr(module, name)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Runs ``workers`` uvicorn processes on one listening socket
+
+    The parent binds the socket and preloads the app, then forks the
+    workers, which accept connections from the shared socket. A worker that
+    exits unexpectedly is replaced; SIGINT/SIGTERM are passed on to the
+    workers and the parent exits once they have all stopped.
+
+    Keyword mappings are shared through the keyword database (see
+    ``KeywordSync``); the microphone, continuous listening and the event
+    stream stay per worker.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 2,
+        app_path: str = "app.api:app",
+        respawn_delay: float = 1.0,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.app_path = app_path
+        self.respawn_delay = respawn_delay
+        self.children: dict[int, tuple[int, float]] = {}
+        self._stopping = False
+        self._socket: Optional[socket.socket] = None
+
+    def run(self) -> None:
+        self._socket = _bind(self.host, self.port)
+        app = preload_app(self.app_path)
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        for worker in range(self.workers):
+            self._spawn(worker, app)
+        try:
+            while self.children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                worker, started = self.children.pop(pid, (None, 0.0))
+                if worker is None or self._stopping:
+                    continue
+                logger.warning(f"Worker {worker} (pid {pid}) exited with status {status}; restarting")
+                # Avoid a tight loop when a worker dies right after starting
+                if time.monotonic() - started < self.respawn_delay:
+                    time.sleep(self.respawn_delay)
+                if not self._stopping:
+                    self._spawn(worker, app)
+        finally:
+            self._socket.close()
+
+    def _spawn(self, worker: int, app) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (worker, time.monotonic())
+            return
+        # Child: let uvicorn install its own signal handling
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            self._serve(worker, app)
+        except BaseException:
+            logger.exception(f"Worker {worker} failed")
+            code = 1
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+
+    def _serve(self, worker: int, app) -> None:
+        import uvicorn
+
+        os.environ["SOUNDTOACT_OUTBOX"] = worker_outbox_path(
+            os.environ.get("SOUNDTOACT_OUTBOX", "outbox.db"), worker
+        )
+        os.environ["SOUNDTOACT_WORKERS"] = str(self.workers)
+        server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+        server.run(sockets=[self._socket])
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 2) -> None:
+    """Run the API with several worker processes"""
+    if not hasattr(os, "fork"):
+        # No fork (Windows): uvicorn's spawn-based workers, without the shared preload
+        import uvicorn
+
+        os.environ["SOUNDTOACT_WORKERS"] = str(workers)
+
+        uvicorn.run("app.api:app", host=host, port=port, workers=workers)
+        return
+    PreforkServer(host, port, workers).run()
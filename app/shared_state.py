@@ -0,0 +1,158 @@
+"""
+Status records shared between server workers
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, record_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_recent ON records (kind, updated_at);
+"""
+
+
+class SharedRecords:
+    """SQLite (WAL) table of JSON records, keyed by kind and ID
+
+    Workers of a multi-worker server keep their actions and jobs in memory;
+    mirroring each status change here lets any worker answer a lookup for
+    one another worker started. ``put`` hands the record to a single writer
+    thread, which commits everything that queued up behind the previous
+    commit in one transaction, so no caller (the event loop included) waits
+    on SQLite. Records are written in the order they were put. Wait on the
+    returned future where a record must be visible to other workers before
+    going on, e.g. before an ID is handed to a client. Records older than
+    ``retention`` seconds are pruned as new ones are written.
+
+    ``get`` and ``recent`` query the database directly; call them from a
+    thread (``asyncio.to_thread``) when on the event loop.
+    """
+
+    def __init__(
+        self, path: str, retention: float = 3600.0, prune_every: int = 1000, max_batch: int = 512
+    ):
+        self.path = path
+        self.retention = retention
+        self.prune_every = prune_every
+        self.max_batch = max_batch
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._writes: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def put(self, kind: str, record_id: str, data: Mapping[str, Any]) -> Future:
+        """Insert or replace a record; the future resolves once it is committed
+
+        Values that are not JSON are stored as strings. After ``close``
+        records are dropped.
+        """
+        future: Future = Future()
+        if self._closed:
+            future.set_result(None)
+            return future
+        text = json.dumps(dict(data), ensure_ascii=False, default=str)
+        self._ensure_started()
+        self._writes.put((kind, record_id, text, time.time(), future))
+        return future
+
+    def get(self, kind: str, record_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM records WHERE kind = ? AND record_id = ?", (kind, record_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def recent(self, kind: str, limit: int = 50) -> list[dict]:
+        """Most recently updated records of a kind, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM records WHERE kind = ? ORDER BY updated_at DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self) -> None:
+        """Commit everything put so far and close the database"""
+        with self._start_lock:
+            self._closed = True
+            if self._writer is not None:
+                self._writes.put(None)
+                self._writer.join()
+                self._writer = None
+        with self._lock:
+            self._conn.close()
+
+    def _ensure_started(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="shared-records-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            batch = [item]
+            # Everything that queued up behind the last commit goes into this one
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit(batch)
+                    return
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: list) -> None:
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                    [item[:4] for item in batch],
+                )
+                self._conn.execute("COMMIT")
+                before = self._puts
+                self._puts += len(batch)
+                if self._puts // self.prune_every != before // self.prune_every:
+                    self._prune()
+        except sqlite3.Error as e:
+            logger.error(f"{len(batch)} shared record(s) not written: {e}")
+            with self._lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+        for item in batch:
+            item[4].set_result(None)
+
+    def _prune(self) -> None:
+        self._conn.execute(
+            "DELETE FROM records WHERE updated_at < ?", (time.time() - self.retention,)
+        )
@@ -2,7 +2,88 @@
 Voice Listener Module
 """
 import speech_recognition as sr
-from typing import Callable, Dict, Optional
+import functools
+import math
+import threading
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence, Union
+
+from app.actions import resolve_result
+from app.debounce import TriggerDebouncer
+from app.events import EventBus
+from app.executor import ActionExecutor, ActionHandle, ExecutorSaturatedError
+from app.grammar import CommandGrammar, CommandMatch, CommandTemplate
+from app.keyword_store import KeywordStore, normalize_keyword
+from app.matcher import Hypothesis, KeywordMatcher
+from app.ngram_index import NgramIndex
+from app.outbox import OutboxDispatcher
+
+
+class TriggerResult(NamedTuple):
+    """Keywords triggered by one transcript and what their actions produced"""
+
+    triggered: list[str]
+    messages: list[str]
+    handles: list[ActionHandle]
+
+
+_whisper_models: dict = {}
+_whisper_lock = threading.Lock()
+
+
+def load_whisper_model(name: str = "base"):
+    """Load a Whisper model once per process and reuse it
+
+    ``Recognizer.recognize_whisper`` loads the model from disk on every call.
+    Loading it here instead also lets a pre-fork server load it once in the
+    parent so every worker shares the same memory pages.
+    """
+    with _whisper_lock:
+        model = _whisper_models.get(name)
+        if model is None:
+            import whisper
+
+            model = _whisper_models[name] = whisper.load_model(name)
+        return model
+
+
+def _transcribe_whisper(model, audio: sr.AudioData, **options) -> dict:
+    """Run a loaded Whisper model on captured audio"""
+    import numpy as np
+
+    # Whisper expects 16 kHz mono float samples in [-1, 1]
+    raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    return model.transcribe(samples, fp16=model.device.type == "cuda", **options)
+
+
+def _whisper_score(result: dict) -> float:
+    """Turn Whisper's mean segment log-probability into a 0-1 score"""
+    segments = result.get("segments") or []
+    if not segments:
+        return 1.0
+    avg_logprob = sum(seg.get("avg_logprob", 0.0) for seg in segments) / len(segments)
+    return min(1.0, math.exp(avg_logprob))
+
+
+def _google_hypotheses(result, limit: int) -> list[Hypothesis]:
+    """Convert a Google ``show_all`` response into scored hypotheses
+
+    Google only reports a confidence for the top alternative, so the rest get
+    a score that decays with rank below it.
+    """
+    if not isinstance(result, dict):
+        return []
+    alternatives = [a for a in result.get("alternative", []) if a.get("transcript")]
+    if not alternatives:
+        return []
+    top_score = alternatives[0].get("confidence", 1.0)
+    return [
+        Hypothesis(
+            alt["transcript"].strip().lower(),
+            alt.get("confidence", top_score / (rank + 1)),
+        )
+        for rank, alt in enumerate(alternatives[:limit])
+    ]
 
 
 class VoiceListener:
@@ -11,8 +92,30 @@ class VoiceListener:
     def __init__(self):
         self.recognizer = sr.Recognizer()
         self.microphone: Optional[sr.Microphone] = None
-        self.keyword_actions: Dict[str, Callable] = {}
+        self.keyword_actions = KeywordStore()
+        self.grammar = CommandGrammar()
+        # When set, actions run on the executor instead of inline
+        self.executor: Optional[ActionExecutor] = None
+        # When set, registry-built actions are recorded durably before they run
+        self.outbox: Optional[OutboxDispatcher] = None
+        # When set, repeated triggers inside its windows are suppressed
+        self.debouncer: Optional[TriggerDebouncer] = None
+        # When set, recognized text, triggers and keyword changes are published to it
+        self.events: Optional[EventBus] = None
         self.is_listening = False
+        self.max_alternatives = 5
+        self.whisper_model = "base"
+        self.min_match_score = 0.1
+        # Set to e.g. 0.8 to also fire keywords that appear with small misrecognitions
+        self.fuzzy_min_score: Optional[float] = None
+        self.fuzzy_top_k = 5
+        # (store, version, compiled) each was built from; see _compiled
+        self._matcher: Optional[tuple[KeywordStore, int, KeywordMatcher]] = None
+        self._index: Optional[tuple[KeywordStore, int, NgramIndex]] = None
+        # Serializes keyword changes; bulk changes build a new store and swap it in
+        self._keywords_lock = threading.Lock()
+        # Keyword events list at most this many keywords; bigger changes ask clients to refetch
+        self.max_event_keywords = 1000
 
     def initialize(self):
         """Initialize microphone and calibrate for ambient noise"""
@@ -30,25 +133,150 @@ class VoiceListener:
         print("Calibration complete!")
         print(f"Energy threshold set to: {self.recognizer.energy_threshold}")
 
-    def register_action(self, keyword: str, action: Callable):
-        """Register an action to be triggered when a keyword is detected"""
-        self.keyword_actions[keyword.lower()] = action
+    def register_action(
+        self,
+        keyword: str,
+        action: Callable,
+        aliases: Iterable[str] = (),
+        version: Optional[int] = None,
+    ) -> int:
+        """Register an action to be triggered when a keyword (or an alias) is detected
+
+        Registering another action for an existing keyword adds to it instead of
+        replacing it. Returns the action ID. ``version``, here and in the
+        other keyword changes, is the keyword set version reported in the
+        ``keywords`` event (see ``_publish_keywords``).
+        """
+        with self._keywords_lock:
+            store = self.keyword_actions
+            added = [k for k in map(normalize_keyword, [keyword, *aliases]) if k not in store]
+            action_id = store.add([keyword, *aliases], action)
         print(f"Registered action for keyword: '{keyword}'")
+        if added:
+            self._publish_keywords(added=list(dict.fromkeys(added)), version=version)
+        return action_id
 
-    def unregister_action(self, keyword: str) -> bool:
-        """Unregister an action by keyword"""
-        keyword_lower = keyword.lower()
-        if keyword_lower in self.keyword_actions:
-            del self.keyword_actions[keyword_lower]
-            return True
-        return False
+    def unregister_action(self, keyword: str, version: Optional[int] = None) -> bool:
+        """Unregister every action for a keyword"""
+        with self._keywords_lock:
+            if not self.keyword_actions.remove_keyword(keyword):
+                return False
+        self._publish_keywords(removed=[normalize_keyword(keyword)], version=version)
+        return True
+
+    def register_actions(
+        self,
+        registrations: Iterable[tuple[str, Callable, Iterable[str]]],
+        replace: bool = False,
+        version: Optional[int] = None,
+    ) -> list[int]:
+        """Register many (keyword, action, aliases) at once
+
+        The changes are applied to a copy of the keyword store (or, with
+        ``replace``, a new one) that is swapped in when complete, so matching
+        never sees a half-applied batch and the matcher rebuilds once.
+        Returns the action IDs in order.
+        """
+        registrations = [(keyword, action, list(aliases)) for keyword, action, aliases in registrations]
+        with self._keywords_lock:
+            old = self.keyword_actions
+            store = KeywordStore() if replace else old.copy()
+            store.version = old.version
+            action_ids = store.add_many(
+                ([keyword, *aliases], action) for keyword, action, aliases in registrations
+            )
+            self.keyword_actions = store
+        print(f"Registered {len(registrations)} keyword action(s)")
+        if replace:
+            self._publish_keywords(
+                added=list(store), removed=[k for k in old if k not in store], version=version
+            )
+        else:
+            added = (
+                k
+                for keyword, _, aliases in registrations
+                for k in map(normalize_keyword, [keyword, *aliases])
+                if k not in old
+            )
+            self._publish_keywords(added=list(dict.fromkeys(added)), version=version)
+        return action_ids
+
+    def unregister_actions(
+        self, keywords: Iterable[str], version: Optional[int] = None
+    ) -> list[str]:
+        """Unregister many keywords at once; returns the normalized keywords that existed"""
+        with self._keywords_lock:
+            store = self.keyword_actions.copy()
+            removed = store.remove_many(keywords)
+            if removed:
+                self.keyword_actions = store
+        if removed:
+            self._publish_keywords(removed=removed, version=version)
+        return removed
+
+    def _publish_keywords(
+        self,
+        added: Sequence[str] = (),
+        removed: Sequence[str] = (),
+        version: Optional[int] = None,
+    ) -> None:
+        """Publish a ``keywords`` event for a change
+
+        ``version`` is the version callers see elsewhere for the resulting
+        keyword set (``KeywordSync`` passes its change sequence number, which
+        ``/status`` also reports); without one the store's own version is used.
+        """
+        if self.events is None:
+            return
+        store = self.keyword_actions
+        if version is None:
+            version = store.version
+        data = {"added": list(added), "removed": list(removed)}
+        if len(added) + len(removed) > self.max_event_keywords:
+            data = {"added": [], "removed": [], "refetch": True}
+        self.events.publish("keywords", {**data, "version": version, "count": len(store)})
+
+    def register_command(
+        self,
+        template: str,
+        handler: Callable[[dict], object],
+        action_type: str = "custom",
+        slots: Optional[dict] = None,
+        action_params: Optional[dict] = None,
+        create_action: Optional[Callable[[dict], Callable]] = None,
+    ) -> CommandTemplate:
+        """Register a command template such as "{room} 불 {state}"
+
+        Slot values found in the transcript are merged over ``action_params``
+        and passed to ``handler`` when the command fires. With
+        ``create_action`` (params -> action, raising ValueError for invalid
+        params) each match is built into a validated action instead, and
+        every slot vocabulary value is checked with it up front.
+        """
+        command = self.grammar.add(
+            template, handler, action_type, slots, action_params, create_action
+        )
+        if create_action is not None:
+            try:
+                for name, vocab in command.slots.items():
+                    for value in set(vocab.values()):
+                        create_action({**command.action_params, name: value})
+            except ValueError:
+                self.grammar.remove(command.template_id)
+                raise
+        print(f"Registered command template: '{command.template}'")
+        return command
+
+    def unregister_command(self, template_id: int) -> bool:
+        """Unregister a command template by ID"""
+        return self.grammar.remove(template_id)
 
     def get_registered_keywords(self) -> list[str]:
         """Get list of registered keywords"""
         return list(self.keyword_actions.keys())
 
-    def listen_once(self, timeout: int = 5, phrase_time_limit: int = 5) -> str:
-        """Listen for a single phrase and return the recognized text"""
+    def capture(self, timeout: int = 5, phrase_time_limit: int = 5) -> Optional[sr.AudioData]:
+        """Capture a single phrase from the microphone"""
         if not self.microphone:
             raise RuntimeError("Microphone not initialized. Call initialize() first.")
 
@@ -59,60 +287,348 @@ class VoiceListener:
                     source, timeout=timeout, phrase_time_limit=phrase_time_limit
                 )
                 print(f"✓ Audio captured, recognizing...")
+                return audio
             except Exception as e:
                 print(f"❌ Failed to capture audio: {e}")
-                return ""
+                return None
+
+    def recognize_nbest(
+        self, audio: sr.AudioData, whisper_model: Optional[str] = None
+    ) -> list[Hypothesis]:
+        """Recognize audio and return up to ``max_alternatives`` lowercase hypotheses, best first
 
+        ``whisper_model`` overrides ``self.whisper_model`` for this call.
+        """
         # Try Whisper first (more accurate)
         try:
             print("🔍 Using Whisper (OpenAI) for recognition...")
-            text = self.recognizer.recognize_whisper(audio, language="korean")
+            model = load_whisper_model(whisper_model or self.whisper_model)
+            result = _transcribe_whisper(model, audio, language="korean")
+            text = result["text"].strip()
             print(f"✅ Whisper recognized: '{text}'")
-            return text.lower()
+            return [Hypothesis(text.lower(), _whisper_score(result))] if text else []
         except Exception as whisper_error:
             print(f"⚠️  Whisper failed: {whisper_error}")
 
-            # Fallback to Google
-            try:
-                print("🔍 Falling back to Google Speech API...")
-                text = self.recognizer.recognize_google(audio, language="ko-KR")
-                print(f"✅ Google recognized: '{text}'")
-                return text.lower()
-            except sr.UnknownValueError:
-                print("⚠️  Could not understand audio - try speaking louder and clearer")
-                # Try without language specification as fallback
-                try:
-                    text = self.recognizer.recognize_google(audio)
-                    print(f"✅ Recognized (English): '{text}'")
-                    return text.lower()
-                except:
-                    return ""
-            except sr.RequestError as e:
-                print(f"❌ Error with speech recognition service: {e}")
-                return ""
-            except Exception as e:
-                print(f"❌ Unexpected error: {e}")
-                return ""
+        # Fallback to Google, which returns ranked alternatives
+        try:
+            print("🔍 Falling back to Google Speech API...")
+            result = self.recognizer.recognize_google(audio, language="ko-KR", show_all=True)
+            hypotheses = _google_hypotheses(result, self.max_alternatives)
+            if hypotheses:
+                print(f"✅ Google recognized: '{hypotheses[0].text}' (+{len(hypotheses) - 1} alternatives)")
+                return hypotheses
+
+            print("⚠️  Could not understand audio - try speaking louder and clearer")
+            # Try without language specification as fallback
+            result = self.recognizer.recognize_google(audio, show_all=True)
+            hypotheses = _google_hypotheses(result, self.max_alternatives)
+            if hypotheses:
+                print(f"✅ Recognized (English): '{hypotheses[0].text}'")
+            return hypotheses
+        except sr.RequestError as e:
+            print(f"❌ Error with speech recognition service: {e}")
+            return []
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return []
+
+    def listen_nbest(
+        self, timeout: int = 5, phrase_time_limit: int = 5, whisper_model: Optional[str] = None
+    ) -> list[Hypothesis]:
+        """Listen for a single phrase and return the N-best recognition hypotheses"""
+        audio = self.capture(timeout=timeout, phrase_time_limit=phrase_time_limit)
+        if audio is None:
+            return []
+        return self.recognize_nbest(audio, whisper_model)
+
+    def listen_once(self, timeout: int = 5, phrase_time_limit: int = 5) -> str:
+        """Listen for a single phrase and return the recognized text"""
+        hypotheses = self.listen_nbest(timeout=timeout, phrase_time_limit=phrase_time_limit)
+        return hypotheses[0].text if hypotheses else ""
+
+    def _compiled(self, cached: Optional[tuple], build: Callable) -> tuple:
+        """Reuse ``cached`` if it was built from the current store, else rebuild
+
+        The patterns are listed under the keyword lock, so neither an
+        in-place change nor a bulk swap can happen mid-snapshot, and the
+        result is tagged with the store and version it was actually built
+        from; a change that lands during the build only triggers another
+        rebuild on the next call.
+        """
+        store = self.keyword_actions
+        if cached is not None and cached[0] is store and cached[1] == store.version:
+            return cached
+        with self._keywords_lock:
+            store = self.keyword_actions
+            version = store.version
+            patterns = list(store.patterns())
+        return store, version, build(patterns)
 
-    def check_keywords(self, text: str) -> tuple[list[str], list[str]]:
+    def _snapshot(self) -> tuple[KeywordStore, KeywordMatcher]:
+        """The keyword store and the matcher compiled from it, read together
+
+        Pattern IDs reported by the matcher are only meaningful in the store
+        it was built from, so matching and firing use one snapshot throughout
+        instead of reading ``keyword_actions`` again while a swap may land.
+        """
+        self._matcher = cached = self._compiled(self._matcher, KeywordMatcher)
+        return cached[0], cached[2]
+
+    def _index_snapshot(self) -> tuple[KeywordStore, NgramIndex]:
+        """The keyword store and the n-gram index built from it, read together"""
+        self._index = cached = self._compiled(
+            self._index, lambda patterns: NgramIndex(patterns=patterns)
+        )
+        return cached[0], cached[2]
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """Compiled matcher for the current keyword set, rebuilt after changes"""
+        return self._snapshot()[1]
+
+    @property
+    def keyword_index(self) -> NgramIndex:
+        """N-gram index for the current keyword set, rebuilt after changes"""
+        return self._index_snapshot()[1]
+
+    def search_keywords(
+        self, text: str, k: int = 5, min_score: float = 0.8
+    ) -> list[tuple[str, float]]:
+        """Top-k registered keywords found in text, allowing small recognition errors"""
+        store, index = self._index_snapshot()
+        return [
+            (store.keyword_for(pattern_id), score)
+            for pattern_id, score in index.search(text.lower(), k, min_score)
+        ]
+
+    def match_keywords(
+        self,
+        hypotheses: Sequence[Hypothesis],
+        snapshot: Optional[tuple[KeywordStore, KeywordMatcher]] = None,
+    ) -> list[tuple[int, float]]:
+        """Match hypotheses against the keyword set, returning (pattern ID, score) best first
+
+        The pattern IDs belong to the store of ``snapshot`` (by default a
+        fresh ``_snapshot()``); pass the one used to resolve them.
+        """
+        store, matcher = snapshot or self._snapshot()
+        matches = matcher.match_hypotheses(hypotheses, self.min_match_score)
+        if self.fuzzy_min_score is None:
+            return matches
+
+        index_store, index = self._index_snapshot()
+        if index_store is not store:
+            # The keywords were swapped since the snapshot; the index's IDs do not apply
+            return matches
+        scores = dict(matches)
+        for hypothesis in hypotheses:
+            for pattern_id, similarity in index.search(
+                hypothesis.text, self.fuzzy_top_k, self.fuzzy_min_score
+            ):
+                score = hypothesis.score * similarity
+                if score >= self.min_match_score and score > scores.get(pattern_id, -1.0):
+                    scores[pattern_id] = score
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def match_batch(
+        self, texts: Sequence[str], dry_run: bool = False, fired: Optional[set] = None
+    ) -> list[list[str]]:
+        """Keywords and commands found in each of many transcripts
+
+        Keywords are matched exactly with the compiled matcher (fuzzy
+        matching is skipped to keep bulk replays fast). Unless ``dry_run``,
+        the batch is then dispatched as a whole: each distinct action, and
+        each distinct command with its params, runs once however many
+        transcripts matched it, and the debouncer is bypassed so the outcome
+        does not depend on timing. What was dispatched is added to
+        ``fired``; pass the same set for every chunk of a larger batch.
+        """
+        texts = [text.lower() for text in texts]
+        store, matcher = self._snapshot()
+        keyword_for = store.keyword_for
+        found_lists = matcher.find_many(texts)
+        results = [
+            [keyword_for(pattern_id) for pattern_id in found] if found else []
+            for found in found_lists
+        ]
+        commands: list[CommandMatch] = []
+        if self.grammar.templates:
+            for i, text in enumerate(texts):
+                parsed = self.grammar.parse(text)
+                if parsed:
+                    results[i] = results[i] + [command.text for command in parsed]
+                    commands.extend(parsed)
+        if not dry_run:
+            self._dispatch_batch(store, found_lists, commands, set() if fired is None else fired)
+        return results
+
+    def _dispatch_batch(
+        self,
+        store: KeywordStore,
+        found_lists: list[list[int]],
+        commands: list[CommandMatch],
+        fired: set,
+    ) -> None:
+        """Run every distinct action and command matched in a batch once"""
+        result = TriggerResult([], [], [])
+        for found in found_lists:
+            for pattern_id in found:
+                keyword = store.keyword_for(pattern_id)
+                actions = zip(store.action_ids_for(pattern_id), store.actions_for(pattern_id))
+                for action_id, action in actions:
+                    if action_id in fired:
+                        continue
+                    fired.add(action_id)
+                    action_type = getattr(action, "action_type", "custom")
+                    params = getattr(action, "action_params", None)
+                    self._run_action(action, keyword, action_type, result, params, debounce=False)
+        for command in commands:
+            key = (command.template_id, repr(sorted(command.params.items())))
+            if key in fired:
+                continue
+            fired.add(key)
+            built = self._command_action(command)
+            if built is not None:
+                action, params = built
+                self._run_action(
+                    action, command.text, command.action_type, result, params, debounce=False
+                )
+
+    def check_keywords(
+        self, text: Union[str, Sequence[Hypothesis]]
+    ) -> tuple[list[str], list[str]]:
         """Check if any registered keywords are in the text and trigger actions
 
+        ``text`` may be a single transcript or an N-best list of hypotheses;
+        all hypotheses are scanned in one pass and a keyword fires if its best
+        hypothesis scores at least ``min_match_score``. Command templates are
+        matched the same way and report the matched phrase as the keyword.
+
         Returns:
             Tuple of (triggered keywords, action messages)
         """
-        triggered = []
-        messages = []
-        for keyword, action in self.keyword_actions.items():
-            if keyword in text:
-                print(f"Keyword '{keyword}' detected! Triggering action...")
-                try:
-                    result = action()
-                    triggered.append(keyword)
-                    if result and isinstance(result, dict) and "message" in result:
-                        messages.append(result["message"])
-                except Exception as e:
-                    print(f"Error executing action for '{keyword}': {e}")
-        return triggered, messages
+        result = self.trigger(text)
+        return result.triggered, result.messages
+
+    def trigger(self, text: Union[str, Sequence[Hypothesis]]) -> TriggerResult:
+        """Like ``check_keywords``, but also returns executor handles
+
+        With an ``executor`` set, actions are submitted to it and this returns
+        as soon as they are queued; their messages arrive through the handles.
+        """
+        hypotheses = [Hypothesis(text)] if isinstance(text, str) else text
+        result = TriggerResult([], [], [])
+        snapshot = self._snapshot()
+        store = snapshot[0]
+        fired: set[int] = set()
+        for pattern_id, score in self.match_keywords(hypotheses, snapshot):
+            keyword = store.keyword_for(pattern_id)
+            print(f"Keyword '{keyword}' detected (score {score:.2f})! Triggering action...")
+            if self._fire(store, pattern_id, result, fired):
+                result.triggered.append(keyword)
+
+        for command in self.grammar.parse_hypotheses(hypotheses, self.min_match_score):
+            if self.debouncer and not self.debouncer.allow_keyword(command.text):
+                continue
+            print(f"Command '{command.text}' detected {command.params}! Triggering action...")
+            built = self._command_action(command)
+            if built is None:
+                continue
+            action, params = built
+            if self._run_action(action, command.text, command.action_type, result, params):
+                result.triggered.append(command.text)
+        if self.events is not None and hypotheses:
+            self.events.publish("recognized", {"text": hypotheses[0].text})
+            if result.triggered:
+                self.events.publish(
+                    "triggered", {"text": hypotheses[0].text, "keywords": result.triggered}
+                )
+        return result
+
+    def _command_action(self, command: CommandMatch) -> Optional[tuple[Callable, dict]]:
+        """The action for a matched command and its params, or None if they are invalid"""
+        template = self.grammar.templates[command.template_id]
+        if template.create_action is None:
+            return functools.partial(template.handler, command.params), command.params
+        try:
+            action = template.create_action(command.params)
+        except ValueError as e:
+            print(f"Command '{command.text}' not run: {e}")
+            return None
+        return action, action.action_params
+
+    def _fire(
+        self, store: KeywordStore, pattern_id: int, result: TriggerResult, fired: set[int]
+    ) -> bool:
+        """Run the actions of a matched pattern that have not run yet
+
+        ``store`` is the one the matcher reported ``pattern_id`` from.
+        ``fired`` holds the action IDs already run for the same transcript,
+        so an action reachable from several matched aliases runs once.
+        """
+        keyword = store.keyword_for(pattern_id)
+        actions = zip(store.action_ids_for(pattern_id), store.actions_for(pattern_id))
+        pending = [(action_id, action) for action_id, action in actions if action_id not in fired]
+        if not pending:
+            return False
+        if self.debouncer and not self.debouncer.allow_keyword(keyword):
+            print(f"Keyword '{keyword}' suppressed (fired recently)")
+            return False
+        ran = False
+        for action_id, action in pending:
+            fired.add(action_id)
+            action_type = getattr(action, "action_type", "custom")
+            params = getattr(action, "action_params", None)
+            ran = self._run_action(action, keyword, action_type, result, params) or ran
+        return ran
+
+    def _run_action(
+        self,
+        action: Callable,
+        keyword: str,
+        action_type: str,
+        result: TriggerResult,
+        params: Optional[dict] = None,
+        debounce: bool = True,
+    ) -> bool:
+        """Run one action inline, or submit it when an executor is set"""
+        if debounce and self.debouncer is not None:
+            # Actions without known params are only deduplicated against themselves
+            key_params = params if params is not None else {"action": id(action)}
+            if not self.debouncer.allow_action(action_type, key_params):
+                print(f"Action '{action_type}' for '{keyword}' suppressed (duplicate)")
+                return False
+        if self.outbox is not None and getattr(action, "plan", None) is not None:
+            try:
+                handle = self.outbox.submit(keyword, action)
+            except ExecutorSaturatedError:
+                print(f"Action for '{keyword}' recorded; it will run when the executor frees up")
+                return True
+            if handle is not None:
+                result.handles.append(handle)
+            return True
+        if self.executor is not None:
+            try:
+                result.handles.append(
+                    self.executor.submit(action, keyword, action_type, params)
+                )
+                return True
+            except ExecutorSaturatedError as e:
+                print(f"Error executing action for '{keyword}': {e}")
+                return False
+        try:
+            value = resolve_result(action())
+            if value and isinstance(value, dict) and "message" in value:
+                result.messages.append(value["message"])
+            return True
+        except Exception as e:
+            print(f"Error executing action for '{keyword}': {e}")
+            return False
+
+    def open_stream(self, carry_chars: Optional[int] = None) -> "KeywordStream":
+        """Start incremental keyword matching for a streaming transcript"""
+        return KeywordStream(self, carry_chars)
 
     def start_listening(self):
         """Start continuous listening loop"""
@@ -128,9 +644,9 @@ class VoiceListener:
         self.is_listening = True
         try:
             while self.is_listening:
-                text = self.listen_once()
-                if text:
-                    self.check_keywords(text)
+                hypotheses = self.listen_nbest()
+                if hypotheses:
+                    self.check_keywords(hypotheses)
                 time.sleep(0.5)
         except KeyboardInterrupt:
             print("\nStopping voice listener...")
@@ -139,4 +655,48 @@ class VoiceListener:
 
     def stop_listening(self):
         """Stop the listening loop"""
-        self.is_listening = False
\ No newline at end of file
+        self.is_listening = False
+
+
+class KeywordStream:
+    """Incremental keyword matching over a transcript that arrives in deltas
+
+    Each delta is scanned once and only keyword occurrences completed by it
+    trigger actions. Call ``end_phrase`` between recognized phrases; a keyword
+    split across the boundary still matches (see ``MatchState``). Keyword
+    changes are picked up on the next delta.
+    """
+
+    def __init__(self, listener: VoiceListener, carry_chars: Optional[int] = None):
+        self.listener = listener
+        self.carry_chars = carry_chars
+        self._matcher = listener._snapshot()[1]
+        self.state = self._matcher.start(carry_chars)
+
+    def feed(self, delta: str) -> tuple[list[str], list[str]]:
+        """Consume new text and trigger newly completed keywords
+
+        Returns:
+            Tuple of (triggered keywords, action messages)
+        """
+        listener = self.listener
+        store, matcher = listener._snapshot()
+        if matcher is not self._matcher:
+            # Keywords changed: continue on the new matcher, dropping any partial match
+            offset = self.state.offset
+            self.state = matcher.start(self.carry_chars)
+            self.state.offset = offset
+            self._matcher = matcher
+
+        result = TriggerResult([], [], [])
+        fired: set[int] = set()
+        for pattern_id, _ in self.state.feed(delta.lower()):
+            keyword = store.keyword_for(pattern_id)
+            print(f"Keyword '{keyword}' detected in stream! Triggering action...")
+            if listener._fire(store, pattern_id, result, fired):
+                result.triggered.append(keyword)
+        return result.triggered, result.messages
+
+    def end_phrase(self) -> None:
+        """Mark the end of a recognized phrase"""
+        self.state.end_phrase()
@@ -0,0 +1,3 @@
+"""
+SoundToAct benchmarks
+"""
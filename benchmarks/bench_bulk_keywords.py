@@ -0,0 +1,61 @@
+"""
+Benchmark: bulk keyword replacement (PUT /keywords) phase by phase
+
+Usage: python -m benchmarks.bench_bulk_keywords [--keywords 100000]
+"""
+import argparse
+import json
+import time
+
+from app.api import _build_registrations
+from app.models import KeywordBulkCreate
+from app.voice_listener import VoiceListener
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rooms = ["거실", "안방", "주방", "욕실", "현관"]
+    body = json.dumps(
+        {
+            "keywords": [
+                {
+                    "keyword": f"키워드{i}",
+                    "action_type": "lights",
+                    "action_params": {"room": rooms[i % len(rooms)], "state": "on"},
+                    "aliases": [f"별칭{i}"] if i % 10 == 0 else [],
+                }
+                for i in range(args.keywords)
+            ]
+        },
+        ensure_ascii=False,
+    )
+    listener = VoiceListener()
+    timings = []
+
+    start = time.perf_counter()
+    request = KeywordBulkCreate.model_validate_json(body)
+    timings.append(("parse request", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    registrations = _build_registrations(request.keywords)
+    timings.append(("validate + build actions", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    listener.register_actions(registrations, replace=True)
+    timings.append(("apply (one swap)", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    listener.trigger("키워드99 켜줘")
+    timings.append(("first match (rebuild)", time.perf_counter() - start))
+
+    print(f"{args.keywords} mappings, {len(body) / 1e6:.1f} MB request body")
+    for label, seconds in timings:
+        print(f"{label:<26} {seconds * 1000:8.0f} ms")
+    print(f"{'total':<26} {sum(s for _, s in timings) * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: restart-to-ready time with a persistent keyword store
+
+Usage: python -m benchmarks.bench_keyword_restart [--keywords 100000] [--distinct-params 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.actions import ActionRegistry
+from app.keyword_db import KeywordDatabase, KeywordSync
+from app.voice_listener import VoiceListener
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=100_000)
+    parser.add_argument(
+        "--distinct-params", type=int, default=50, help="How many different param sets the mappings use"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keywords.db")
+        db = KeywordDatabase(path)
+        start = time.perf_counter()
+        db.add_many(
+            (
+                [f"키워드{i}", *([f"별칭{i}"] if i % 10 == 0 else [])],
+                "lights",
+                {"room": f"방{i % args.distinct_params}", "state": "on"},
+            )
+            for i in range(args.keywords)
+        )
+        print(f"write {args.keywords} mappings      {(time.perf_counter() - start) * 1000:8.0f} ms  "
+              f"({os.path.getsize(path) / 1e6:.1f} MB)")
+        db.close()
+
+        # What the server does between process start and serving requests
+        start = time.perf_counter()
+        db = KeywordDatabase(path)
+        registry = ActionRegistry()
+        listener = VoiceListener()
+        restored = KeywordSync(db, registry, listener).restore()
+        ready = time.perf_counter() - start
+        listener.trigger("키워드99 켜줘")
+        print(f"restart to ready ({restored} mappings) {ready * 1000:8.0f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
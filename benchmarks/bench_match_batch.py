@@ -0,0 +1,86 @@
+"""
+Benchmark: batch transcript matching (POST /match/batch) lines per second
+
+Usage: python -m benchmarks.bench_match_batch [--lines 200000] [--keywords 10000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_ngram_index import make_contacts
+
+FILLER = [
+    "오늘 날씨 어때",
+    "지금 몇 시야",
+    "내일 아침 일곱 시에 깨워 줘",
+    "뉴스 틀어 줘",
+    "볼륨 좀 줄여 줘",
+    "거실 온도 알려 줘",
+    "고마워 잘 자",
+]
+
+
+def make_transcripts(contacts: list[str], count: int, rng: random.Random) -> list[str]:
+    """Mostly chatter, with a contact named in about one transcript in ten"""
+    transcripts = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            transcripts.append(f"{rng.choice(contacts)}한테 전화해 줘")
+        else:
+            transcripts.append(f"{rng.choice(FILLER)} 그리고 {rng.choice(FILLER)}")
+    return transcripts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--keywords", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    contacts = make_contacts(args.keywords, rng)
+    transcripts = make_transcripts(contacts, args.lines, rng)
+    print(f"{args.lines} transcripts, avg {sum(map(len, transcripts)) / len(transcripts):.1f} chars, "
+          f"{args.keywords} keywords")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SOUNDTOACT_KEYWORDS"] = os.path.join(tmp, "keywords.db")
+        os.environ["SOUNDTOACT_OUTBOX"] = os.path.join(tmp, "outbox.db")
+        from fastapi.testclient import TestClient
+
+        from app import api
+
+        with TestClient(api.app) as client:
+            client.put(
+                "/keywords",
+                json={"keywords": [{"keyword": c, "action_type": "call"} for c in contacts]},
+            ).raise_for_status()
+            listener = api.voice_listener
+            listener.matcher  # build outside the timings
+
+            start = time.perf_counter()
+            matches = listener.match_batch(transcripts, dry_run=True)
+            elapsed = time.perf_counter() - start
+            print(f"match_batch           {args.lines / elapsed:10.0f} lines/s  "
+                  f"({sum(1 for m in matches if m)} matched)")
+
+            body = json.dumps({"transcripts": transcripts}, ensure_ascii=False).encode()
+            start = time.perf_counter()
+            client.post("/match/batch", params={"dry_run": True}, content=body,
+                        headers={"content-type": "application/json"}).raise_for_status()
+            elapsed = time.perf_counter() - start
+            print(f"POST JSON             {args.lines / elapsed:10.0f} lines/s")
+
+            body = "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in transcripts).encode()
+            start = time.perf_counter()
+            client.post("/match/batch", params={"dry_run": True}, content=body,
+                        headers={"content-type": "application/x-ndjson"}).raise_for_status()
+            elapsed = time.perf_counter() - start
+            print(f"POST NDJSON           {args.lines / elapsed:10.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
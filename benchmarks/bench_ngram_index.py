@@ -0,0 +1,88 @@
+"""
+Benchmark: n-gram index candidate retrieval over a large contact vocabulary
+
+Usage: python -m benchmarks.bench_ngram_index [--contacts 50000] [--queries 500]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.ngram_index import NgramIndex, substring_distance
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+SYLLABLES = "민서준지현우예도하윤수영진성은혜경철호상훈태연희주원석"
+
+
+def make_contacts(count: int, rng: random.Random) -> list[str]:
+    names = set()
+    while len(names) < count:
+        length = rng.choice((2, 3, 3, 4))
+        names.add(rng.choice(SURNAMES) + "".join(rng.choice(SYLLABLES) for _ in range(length - 1)))
+    return sorted(names)
+
+
+def make_queries(contacts: list[str], count: int, rng: random.Random) -> list[str]:
+    queries = []
+    for _ in range(count):
+        name = list(rng.choice(contacts))
+        if rng.random() < 0.3:  # simulate a one-syllable misrecognition
+            name[rng.randrange(len(name))] = rng.choice(SYLLABLES)
+        queries.append("".join(name) + "한테 전화해 줘")
+    return queries
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def timed(fn, queries: list[str]) -> list[float]:
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label: str, times: list[float]) -> None:
+    print(
+        f"{label:<28} p50={statistics.median(times):8.3f} ms  "
+        f"p99={percentile(times, 0.99):8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--min-score", type=float, default=0.6)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    contacts = make_contacts(args.contacts, rng)
+    queries = make_queries(contacts, args.queries, rng)
+
+    start = time.perf_counter()
+    index = NgramIndex(patterns=enumerate(contacts))
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"contacts={len(contacts)} queries={len(queries)} min_score={args.min_score}")
+    print(f"index build: {build_ms:.1f} ms, memory: {index.memory_bytes() / 1024 / 1024:.1f} MiB")
+
+    candidate_counts = [len(index.candidates(q, args.min_score)) for q in queries]
+    print(f"mean candidates verified per query: {statistics.mean(candidate_counts):.1f}")
+
+    report("index exact", timed(lambda q: index.search(q, 5, 1.0), queries))
+    report("index fuzzy", timed(lambda q: index.search(q, 5, args.min_score), queries))
+    report("brute-force substring", timed(lambda q: [c for c in contacts if c in q], queries))
+
+    sample = queries[: max(1, len(queries) // 50)]
+    report(
+        f"brute-force fuzzy (n={len(sample)})",
+        timed(lambda q: [c for c in contacts if substring_distance(c, q) <= 1], sample),
+    )
+
+
+if __name__ == "__main__":
+    main()
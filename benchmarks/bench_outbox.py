@@ -0,0 +1,97 @@
+"""
+Benchmark: durable outbox enqueue throughput and end-to-end delivery
+
+Usage: python -m benchmarks.bench_outbox [--entries 20000] [--producers 8]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from app.actions import ActionRegistry
+from app.executor import ActionExecutor
+from app.outbox import ActionOutbox, OutboxDispatcher
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def produce(count: int, producers: int, submit) -> tuple[float, list[float]]:
+    """Call submit() count times from several threads; returns (seconds, latencies in ms)"""
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker(n: int):
+        local = []
+        for i in range(n):
+            start = time.perf_counter()
+            submit(i)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(count // producers,)) for _ in range(producers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(label: str, seconds: float, latencies: list[float]) -> None:
+    print(
+        f"{label:<24} {len(latencies) / seconds:9.0f} /s  "
+        f"p50={statistics.median(latencies):7.3f} ms  p99={percentile(latencies, 0.99):7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--producers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = ActionOutbox(os.path.join(tmp, "enqueue.db"))
+        seconds, latencies = produce(
+            args.entries,
+            args.producers,
+            lambda i: outbox.enqueue("불", "lights", {"room": "거실", "i": i}).result(),
+        )
+        report("enqueue (durable)", seconds, latencies)
+        print(f"{'':<24} {outbox.stats['commits']} commits, "
+              f"{outbox.stats['enqueued'] / outbox.stats['commits']:.1f} entries per commit")
+        outbox.close()
+
+        registry = ActionRegistry()
+        registry.register("noop", lambda params: None)
+        executor = ActionExecutor(max_workers=8, max_pending=args.entries)
+        outbox = ActionOutbox(os.path.join(tmp, "deliver.db"))
+        dispatcher = OutboxDispatcher(outbox, executor, registry)
+        handles = []
+        seconds, latencies = produce(
+            args.entries,
+            args.producers,
+            lambda i: handles.append(
+                dispatcher.submit("noop", registry.create_action("noop", {"i": i}))
+            ),
+        )
+        report("enqueue + dispatch", seconds, latencies)
+        start = time.perf_counter()
+        for handle in handles:
+            handle.wait()
+        while outbox.counts().get("pending"):
+            time.sleep(0.01)
+        print(f"{'':<24} all delivered and acknowledged "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms after the last enqueue")
+        executor.shutdown()
+        outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: request throughput and keyword propagation across server workers
+
+Usage: python -m benchmarks.bench_workers [--workers 1 2 4] [--requests 2000] [--keywords 10000]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(client: httpx.Client, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            client.get("/status")
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def run(workers: int, requests: int, keywords: int, concurrency: int) -> None:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "SOUNDTOACT_KEYWORDS": os.path.join(tmp, "keywords.db"),
+            "SOUNDTOACT_OUTBOX": os.path.join(tmp, "outbox.db"),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "main.py", "server", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            with httpx.Client(base_url=base, timeout=30) as client:
+                wait_ready(client)
+                client.put(
+                    "/keywords",
+                    json={
+                        "keywords": [
+                            {"keyword": f"키워드{i}", "action_type": "lights",
+                             "action_params": {"state": "on"}}
+                            for i in range(keywords)
+                        ]
+                    },
+                ).raise_for_status()
+
+            def hit(i: int) -> None:
+                with httpx.Client(base_url=base, timeout=30) as c:
+                    for j in range(i, requests, concurrency):
+                        c.post("/listen/test", params={"text": f"아무 말이나 {j}", "action_wait": 0})
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                list(pool.map(hit, range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+            # Time until fresh connections (spread over the workers) all see a new keyword
+            with httpx.Client(base_url=base, timeout=30) as client:
+                instance, seq = client.get("/keywords").headers["etag"].strip('"').split("-")
+                expected = f'"{instance}-{int(seq) + 1}"'
+                start = time.perf_counter()
+                client.post(
+                    "/keywords", json={"keyword": "새키워드", "action_type": "call", "params": {}}
+                ).raise_for_status()
+            seen = 0
+            while seen < 20:
+                checked = time.perf_counter()
+                with httpx.Client(base_url=base) as fresh:
+                    if fresh.get("/keywords").headers["etag"] != expected:
+                        seen = 0
+                        continue
+                if not seen:
+                    propagated = checked - start
+                seen += 1
+            print(f"workers={workers}  {requests / elapsed:8.0f} req/s  "
+                  f"keyword visible on all workers in {propagated * 1000:6.0f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--keywords", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPU(s)")
+    for workers in args.workers:
+        run(workers, args.requests, args.keywords, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ const API_BASE_URL = 'http://localhost:8000'
 function App() {
   const [keywords, setKeywords] = useState([])
   const [status, setStatus] = useState({ is_listening: false, registered_keywords: [] })
+  const [lastHeard, setLastHeard] = useState(null)
   const [loading, setLoading] = useState(false)
 
   // Fetch keywords and status
@@ -32,14 +33,47 @@ function App() {
     }
   }
 
+  // Fetch once, then apply changes pushed by the server.
+  // EventSource reconnects by itself and resumes with Last-Event-ID.
   useEffect(() => {
-    fetchKeywords()
-    fetchStatus()
-    // Refresh every 5 seconds
-    const interval = setInterval(() => {
+    const events = new EventSource(`${API_BASE_URL}/events`)
+    let loaded = false
+    const refetch = () => {
+      fetchKeywords()
       fetchStatus()
-    }, 5000)
-    return () => clearInterval(interval)
+    }
+
+    events.onopen = () => {
+      if (!loaded) {
+        loaded = true
+        refetch()
+      }
+    }
+    // Events were missed (e.g. the server restarted): start over from a fresh snapshot
+    events.addEventListener('reset', refetch)
+    events.addEventListener('listener', (e) => {
+      const { is_listening } = JSON.parse(e.data)
+      setStatus((prev) => ({ ...prev, is_listening }))
+    })
+    events.addEventListener('keywords', (e) => {
+      const { added, removed, refetch: tooMany } = JSON.parse(e.data)
+      // Bulk changes only announce themselves; fetch the new list instead
+      if (tooMany) {
+        fetchKeywords()
+        return
+      }
+      setKeywords((prev) => [
+        ...prev.filter((k) => !removed.includes(k)),
+        ...added.filter((k) => !prev.includes(k)),
+      ])
+    })
+    events.addEventListener('recognized', (e) => {
+      setLastHeard({ text: JSON.parse(e.data).text, keywords: [] })
+    })
+    events.addEventListener('triggered', (e) => {
+      setLastHeard(JSON.parse(e.data))
+    })
+    return () => events.close()
   }, [])
 
   const handleListen = async () => {
@@ -71,9 +105,9 @@ function App() {
           action_params: actionParams
         })
       })
-      if (response.ok) {
-        await fetchKeywords()
-        await fetchStatus()
+      // The keyword list updates from the 'keywords' event
+      if (!response.ok) {
+        console.error('Failed to add keyword:', await response.text())
       }
     } catch (error) {
       console.error('Failed to add keyword:', error)
@@ -85,9 +119,8 @@ function App() {
       const response = await fetch(`${API_BASE_URL}/keywords/${keyword}`, {
         method: 'DELETE'
       })
-      if (response.ok) {
-        await fetchKeywords()
-        await fetchStatus()
+      if (!response.ok) {
+        console.error('Failed to delete keyword:', await response.text())
       }
     } catch (error) {
       console.error('Failed to delete keyword:', error)
@@ -102,7 +135,7 @@ function App() {
       </header>
 
       <div className="container">
-        <StatusBar status={status} />
+        <StatusBar status={status} keywordCount={keywords.length} lastHeard={lastHeard} />
 
         <div className="main-content">
           <VoiceRecorder
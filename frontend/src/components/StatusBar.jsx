@@ -1,6 +1,6 @@
 import './StatusBar.css'
 
-function StatusBar({ status }) {
+function StatusBar({ status, keywordCount, lastHeard }) {
   return (
     <div className="status-bar">
       <div className="status-item">
@@ -11,8 +11,17 @@ function StatusBar({ status }) {
       </div>
       <div className="status-item">
         <span className="status-label">등록된 키워드:</span>
-        <span className="status-value">{status.registered_keywords?.length || 0}개</span>
+        <span className="status-value">{keywordCount}개</span>
       </div>
+      {lastHeard && (
+        <div className="status-item">
+          <span className="status-label">최근 인식:</span>
+          <span className="status-value">
+            "{lastHeard.text}"
+            {lastHeard.keywords.length > 0 && ` → ${lastHeard.keywords.join(', ')}`}
+          </span>
+        </div>
+      )}
     </div>
   )
 }
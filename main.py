@@ -13,11 +13,13 @@ def run_cli():
     """Run CLI mode with voice listener"""
     from app.voice_listener import VoiceListener
     from app.actions import action_registry
+    from app.debounce import TriggerDebouncer
 
     print("Starting SoundToAct in CLI mode...")
 
     # Create and initialize listener
     listener = VoiceListener()
+    listener.debouncer = TriggerDebouncer()
     listener.initialize()
 
     # Register default actions
@@ -33,13 +35,22 @@ def run_cli():
     listener.start_listening()
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
+def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False, workers: int = 1):
     """Run FastAPI server"""
     import uvicorn
 
     print(f"Starting SoundToAct API server on {host}:{port}...")
     print(f"API docs will be available at http://{host}:{port}/docs")
 
+    if workers > 1:
+        if reload:
+            raise ValueError("--reload cannot be combined with --workers")
+        from app.server import serve
+
+        print(f"Running {workers} worker processes")
+        serve(host=host, port=port, workers=workers)
+        return
+
     uvicorn.run("app.api:app", host=host, port=port, reload=reload)
 
 
@@ -54,6 +65,7 @@ Examples:
   python main.py server                 # Run API server
   python main.py server --port 3000     # Run API server on port 3000
   python main.py server --reload        # Run with auto-reload (dev mode)
+  python main.py server --workers 4     # Run API server with 4 worker processes
         """,
     )
 
@@ -78,6 +90,12 @@ Examples:
         action="store_true",
         help="Enable auto-reload (development mode)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of server worker processes (default: 1)",
+    )
 
     args = parser.parse_args()
 
@@ -85,7 +103,7 @@ Examples:
         if args.mode == "cli":
             run_cli()
         elif args.mode == "server":
-            run_server(host=args.host, port=args.port, reload=args.reload)
+            run_server(host=args.host, port=args.port, reload=args.reload, workers=args.workers)
     except KeyboardInterrupt:
         print("\n\nShutting down SoundToAct...")
         sys.exit(0)
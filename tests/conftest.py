@@ -7,6 +7,30 @@ from app.api import app
 from app.voice_listener import VoiceListener
 
 
+@pytest.fixture(autouse=True)
+def outbox_path(tmp_path, monkeypatch):
+    """Keep the API's action outbox in a per-test temporary database"""
+    path = tmp_path / "outbox.db"
+    monkeypatch.setenv("SOUNDTOACT_OUTBOX", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def keyword_db_path(tmp_path, monkeypatch):
+    """Keep the API's persistent keyword store in a per-test temporary database"""
+    path = tmp_path / "keywords.db"
+    monkeypatch.setenv("SOUNDTOACT_KEYWORDS", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def shared_records_path(tmp_path, monkeypatch):
+    """Keep the status records shared by server workers in a per-test temporary database"""
+    path = tmp_path / "shared.db"
+    monkeypatch.setenv("SOUNDTOACT_SHARED", str(path))
+    return path
+
+
 @pytest.fixture
 def client():
     """FastAPI test client"""
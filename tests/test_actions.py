@@ -97,4 +97,79 @@ def test_action_with_default_params():
 
     result = registry.lights_action({})
     assert result["state"] == "off"
-    assert result["room"] == "all"
\ No newline at end of file
+    assert result["room"] == "all"
+
+
+def test_register_async_handler():
+    """Test async handlers are accepted and produce async actions"""
+    from app.actions import is_async_action, resolve_result
+
+    registry = ActionRegistry()
+
+    async def async_action(params):
+        return {"status": "success", "message": params["text"]}
+
+    registry.register("async", async_action, timeout=2.0)
+    assert registry.timeouts["async"] == 2.0
+
+    action = registry.create_action("async", {"text": "비동기"})
+    assert is_async_action(action)
+    assert action.action_type == "async"
+    assert resolve_result(action())["message"] == "비동기"
+
+
+def test_resolve_result_passthrough():
+    """Test plain results are returned unchanged"""
+    from app.actions import resolve_result
+
+    assert resolve_result({"status": "success"}) == {"status": "success"}
+
+
+def test_create_action_validates_params():
+    """Test params are validated against the action type's schema"""
+    registry = ActionRegistry()
+    with pytest.raises(ValueError, match="Invalid params for 'lights'"):
+        registry.create_action("lights", {"state": "dim"})
+    with pytest.raises(ValueError, match="contcat"):
+        registry.create_action("call", {"contcat": "엄마"})
+
+
+def test_create_action_precompiles_plan():
+    """Test the plan carries resolved defaults in a read-only mapping"""
+    registry = ActionRegistry()
+    action = registry.create_action("lights", {"state": "on"})
+
+    assert action.plan.action_type == "lights"
+    assert dict(action.action_params) == {"state": "on", "room": "전체"}
+    with pytest.raises(TypeError):
+        action.action_params["state"] = "off"
+    assert action()["room"] == "전체"
+
+
+def test_create_action_without_schema_accepts_any_params():
+    """Test action types without a schema take params as given"""
+    registry = ActionRegistry()
+    registry.register("echo", lambda params: dict(params))
+    assert registry.create_action("echo", {"anything": 1})() == {"anything": 1}
+
+
+def test_coalesce_targets():
+    """Test lights are coalesced per room by default and others opt in"""
+    registry = ActionRegistry()
+    assert registry.coalesce_targets == {"lights": ("room",)}
+
+    registry.register("blinds", lambda params: params, coalesce_by=("window",))
+    assert registry.coalesce_targets["blinds"] == ("window",)
+
+
+def test_priorities():
+    """Test action types get priority classes, calls being the emergency class"""
+    from app.actions import PRIORITY_EMERGENCY, PRIORITY_LOW, PRIORITY_NORMAL
+
+    registry = ActionRegistry()
+    assert registry.priorities["call"] == PRIORITY_EMERGENCY
+    assert registry.priorities["lights"] == PRIORITY_NORMAL
+    assert registry.priorities["music"] == PRIORITY_LOW
+
+    registry.register("alarm", lambda params: params, priority=PRIORITY_EMERGENCY)
+    assert registry.priorities["alarm"] == PRIORITY_EMERGENCY
@@ -1,6 +1,7 @@
 """
 Tests for FastAPI endpoints
 """
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from app.api import app
@@ -54,6 +55,66 @@ def test_create_keyword_action_invalid_type(client):
     assert response.status_code == 400
 
 
+def test_create_keyword_action_invalid_params(client):
+    """Test invalid action params are rejected at registration"""
+    payload = {"keyword": "불", "action_type": "lights", "action_params": {"state": "dim"}}
+    response = client.post("/keywords", json=payload)
+    assert response.status_code == 400
+    assert "state" in response.json()["detail"]
+    assert "불" not in client.get("/keywords").json()
+
+
+def test_create_keyword_action_returns_resolved_params(client):
+    """Test the response echoes params with defaults filled in"""
+    payload = {"keyword": "불켜", "action_type": "lights", "action_params": {"state": "on"}}
+    response = client.post("/keywords", json=payload)
+    assert response.json()["action_params"] == {"state": "on", "room": "전체"}
+
+
+def test_status_reports_keyword_version(client):
+    """Test /status carries the keyword version and lists keywords only on request"""
+    data = client.get("/status").json()
+    assert data["registered_keywords"] is None
+    version = data["keywords_version"]
+
+    client.post("/keywords", json={"keyword": "버전", "action_type": "call"})
+    data = client.get("/status", params={"include_keywords": True}).json()
+    assert data["keywords_version"] > version
+    assert "버전" in data["registered_keywords"]
+    assert data["keyword_count"] == len(data["registered_keywords"])
+
+
+def test_keywords_conditional_get(client):
+    """Test /keywords answers 304 until the keyword set changes"""
+    response = client.get("/keywords")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get("/keywords", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.post("/keywords", json={"keyword": "새키워드", "action_type": "call"})
+    response = client.get("/keywords", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "새키워드" in response.json()
+    assert response.headers["etag"] != etag
+
+
+def test_status_conditional_get(client):
+    """Test /status answers 304 while neither keywords nor listening change"""
+    etag = client.get("/status").headers["etag"]
+    assert client.get("/status", headers={"If-None-Match": f'W/{etag}, "x"'}).status_code == 304
+    # Asking for the keyword list is a different representation
+    assert client.get(
+        "/status", params={"include_keywords": True}, headers={"If-None-Match": etag}
+    ).status_code == 200
+
+    client.delete("/keywords/엄마")
+    client.post("/keywords", json={"keyword": "엄마", "action_type": "call"})
+    assert client.get("/status", headers={"If-None-Match": etag}).status_code == 200
+
+
 def test_list_keywords(client):
     """Test listing keywords"""
     # First create some keywords
@@ -99,6 +160,96 @@ def test_delete_nonexistent_keyword(client):
     assert response.status_code == 404
 
 
+def test_bulk_create_keywords(client):
+    """Test registering many mappings in one request"""
+    before = client.get("/keywords").json()
+    payload = {
+        "keywords": [
+            {"keyword": f"일괄{i}", "action_type": "lights", "action_params": {"room": "거실"}}
+            for i in range(50)
+        ]
+    }
+    response = client.post("/keywords/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["added"] == 50
+    assert data["count"] == len(before) + 50
+
+    keywords = client.get("/keywords").json()
+    assert "일괄0" in keywords and "일괄49" in keywords
+
+
+def test_bulk_create_is_all_or_nothing(client):
+    """Test one invalid mapping rejects the whole batch"""
+    payload = {
+        "keywords": [
+            {"keyword": "좋음", "action_type": "call"},
+            {"keyword": "나쁨", "action_type": "lights", "action_params": {"state": "dim"}},
+            {"keyword": "모름", "action_type": "unknown"},
+        ]
+    }
+    response = client.post("/keywords/bulk", json=payload)
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert [e["index"] for e in detail["errors"]] == [1, 2]
+    assert "좋음" not in client.get("/keywords").json()
+
+
+def test_replace_keywords(client):
+    """Test PUT /keywords swaps in an entirely new keyword set"""
+    client.post("/keywords", json={"keyword": "옛날", "action_type": "call"})
+    payload = {
+        "keywords": [
+            {"keyword": "새것", "action_type": "music", "aliases": ["새노래"]},
+        ]
+    }
+    response = client.put("/keywords", json=payload)
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    assert sorted(client.get("/keywords").json()) == ["새것", "새노래"]
+
+    result = client.post("/listen/test", params={"text": "새노래 들려줘"}).json()
+    assert result["triggered_keywords"] == ["새노래"]
+
+    payload["keywords"].append({"keyword": "추가", "action_type": "call"})
+    data = client.put("/keywords", json=payload).json()
+    assert (data["added"], data["removed"], data["count"]) == (1, 0, 3)
+    data = client.put("/keywords", json=payload).json()
+    assert (data["added"], data["removed"], data["count"]) == (0, 0, 3)
+
+
+def test_keywords_survive_restart():
+    """Test API keyword changes are restored on the next startup"""
+    with TestClient(app) as c:
+        c.post("/keywords", json={"keyword": "영구", "action_type": "call", "aliases": ["지속"]})
+        c.post(
+            "/keywords/bulk",
+            json={"keywords": [{"keyword": k, "action_type": "music"} for k in ("하나", "둘")]},
+        )
+        c.delete("/keywords/지속")
+        c.request("DELETE", "/keywords/bulk", json={"keywords": ["둘"]})
+
+    with TestClient(app) as c:
+        assert sorted(c.get("/keywords").json()) == ["영구", "하나"]
+        result = c.post("/listen/test", params={"text": "영구"}).json()
+        assert result["triggered_keywords"] == ["영구"]
+
+
+def test_bulk_delete_keywords(client):
+    """Test deleting many keywords reports the ones that were missing"""
+    client.post(
+        "/keywords/bulk",
+        json={"keywords": [{"keyword": k, "action_type": "call"} for k in ("가", "나")]},
+    )
+    response = client.request("DELETE", "/keywords/bulk", json={"keywords": ["가", "나", "다"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["removed"] == 2
+    assert data["missing"] == ["다"]
+    keywords = client.get("/keywords").json()
+    assert "가" not in keywords and "나" not in keywords
+
+
 def test_listen_request_validation(client):
     """Test listen request with valid parameters"""
     payload = {"timeout": 3, "phrase_time_limit": 3}
@@ -121,13 +272,67 @@ def test_start_listening(client):
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
+    assert data["running"] is True
+
+    assert client.post("/listen/start").status_code == 400
+    assert client.post("/listen", json={}).status_code == 409
+
+    response = client.post("/listen/stop")
+    assert response.status_code == 200
+    assert response.json()["running"] is False
 
 
 def test_stop_listening_not_started(client):
     """Test stopping when not listening"""
     response = client.post("/listen/stop")
-    # Should return error since we're not listening
-    assert response.status_code in [400, 200]
+    assert response.status_code == 400
+
+
+def test_listening_status(client):
+    """Test continuous listening status fields"""
+    response = client.get("/listen/status")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["running"] is False
+    assert data["state"] == "stopped"
+    for field in ("queue_depth", "phrases_per_minute", "captured", "dropped", "restarts"):
+        assert field in data
+
+
+def test_keyword_changes_are_published(client):
+    """Test keyword mutations appear on the event stream"""
+    from app.api import event_bus
+
+    last_id = event_bus.last_id
+    client.post("/keywords", json={"keyword": "이벤트", "action_type": "lights"})
+    added_version = client.get("/status").json()["keywords_version"]
+    client.delete("/keywords/이벤트")
+    events = event_bus.since(last_id)
+    assert [e.type for e in events] == ["keywords", "keywords"]
+    assert events[0].data["added"] == ["이벤트"]
+    assert events[1].data["removed"] == ["이벤트"]
+    # The same version /status and bulk responses report
+    assert events[0].data["version"] == added_version
+    assert events[1].data["version"] == client.get("/status").json()["keywords_version"]
+
+
+def test_events_stream_resumes_from_header():
+    """Test GET /events replays events after Last-Event-ID"""
+    from app.api import event_bus, stream_events
+
+    seen = event_bus.publish("recognized", {"text": "하나"})
+    event_bus.publish("recognized", {"text": "둘"})
+
+    async def run():
+        response = await stream_events(last_event_id=str(seen.id), since=None)
+        body = response.body_iterator
+        chunks = [await body.__anext__() for _ in range(2)]
+        await body.aclose()
+        return response, chunks[1]
+
+    response, chunk = asyncio.run(run())
+    assert response.media_type == "text/event-stream"
+    assert "둘" in chunk and "하나" not in chunk
 
 
 def test_api_cors_middleware():
@@ -153,3 +358,462 @@ def test_endpoints_accessibility(client, endpoint, method):
     elif method == "post":
         response = client.post(endpoint)
     assert response.status_code in [200, 400, 422, 500]  # Any non-404 is fine
+
+
+def test_command_template_lifecycle(client):
+    """Test creating, using, listing and deleting a command template"""
+    response = client.post(
+        "/commands", json={"template": "{room} 불 {state}", "action_type": "lights"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["slot_names"] == ["room", "state"]
+
+    result = client.post("/listen/test?text=안방 불 켜").json()
+    assert "💡 안방 불을 켰습니다." in result["action_messages"]
+
+    assert any(c["template_id"] == data["template_id"] for c in client.get("/commands").json())
+    assert client.delete(f"/commands/{data['template_id']}").status_code == 200
+    assert client.delete(f"/commands/{data['template_id']}").status_code == 404
+
+
+def test_default_command_templates(monkeypatch):
+    """Test the built-in command templates are opt-in and only fire on exact commands"""
+    with TestClient(app) as client:
+        assert client.get("/commands").json() == []
+
+    monkeypatch.setenv("SOUNDTOACT_DEFAULT_COMMANDS", "1")
+    with TestClient(app) as client:
+        templates = {c["template"]: c for c in client.get("/commands").json()}
+        assert templates["{room} 불 {state}"]["action_type"] == "lights"
+
+        result = client.post("/listen/test?text=거실 불 켜").json()
+        assert result["triggered_keywords"] == ["거실 불 켜"]
+        assert "💡 거실 불을 켰습니다." in result["action_messages"]
+
+        for text in ["택배 기사한테 전화 왔었어", "거실 불 꺼내", "지금 아이유 노래 틀어"]:
+            assert client.post(f"/listen/test?text={text}").json()["triggered_keywords"] == []
+
+
+def test_command_slot_params_validated(client):
+    """Test command slot values are checked against the action's params schema"""
+    response = client.post(
+        "/commands",
+        json={"template": "{room} 조명 {state}", "action_type": "lights",
+              "slots": {"state": {"밝게": "bright"}}},
+    )
+    assert response.status_code == 400
+
+
+def test_create_command_invalid(client):
+    """Test invalid command templates are rejected"""
+    response = client.post("/commands", json={"template": "{room} 불", "action_type": "nope"})
+    assert response.status_code == 400
+    response = client.post("/commands", json={"template": "불꺼", "action_type": "lights"})
+    assert response.status_code == 400
+
+
+def test_search_keywords(client):
+    """Test scored keyword search"""
+    client.post("/keywords", json={"keyword": "김철수", "action_type": "call"})
+    response = client.get("/keywords/search", params={"text": "김철주한테", "min_score": 0.6})
+    assert response.status_code == 200
+    assert response.json()[0]["keyword"] == "김철수"
+
+
+def test_listen_test_returns_pending_actions(client):
+    """Test slow actions are returned as pending and can be looked up"""
+    import threading
+    import time
+    from app.api import voice_listener
+
+    release = threading.Event()
+    voice_listener.register_action("느림", lambda: release.wait(5) and {"message": "끝"})
+    response = client.post("/listen/test?text=느림&action_wait=0")
+    data = response.json()
+    assert data["triggered_keywords"] == ["느림"]
+    assert len(data["pending_action_ids"]) == 1
+
+    action_id = data["pending_action_ids"][0]
+    assert client.get(f"/actions/{action_id}").json()["status"] in ["pending", "running"]
+    release.set()
+    for _ in range(100):
+        if client.get(f"/actions/{action_id}").json()["status"] == "success":
+            break
+        time.sleep(0.02)
+    assert client.get(f"/actions/{action_id}").json()["result"] == {"message": "끝"}
+    assert client.get("/actions/unknown").status_code == 404
+
+
+def test_async_handler_runs_on_server_loop(client):
+    """Test an async action handler is awaited and its message returned"""
+    from app.actions import action_registry
+
+    async def ping(params):
+        return {"status": "success", "message": f"pong {params.get('n', 0)}"}
+
+    action_registry.register("ping", ping)
+    try:
+        client.post(
+            "/keywords",
+            json={"keyword": "핑", "action_type": "ping", "action_params": {"n": 1}},
+        )
+        data = client.post("/listen/test?text=핑&action_wait=2").json()
+        assert data["action_messages"] == ["pong 1"]
+        assert data["pending_action_ids"] == []
+    finally:
+        action_registry.actions.pop("ping")
+
+
+def test_metrics_report_suppressed_triggers(client):
+    """Test duplicate triggers are suppressed and counted"""
+    client.post("/keywords", json={"keyword": "중복", "action_type": "music"})
+    assert client.post("/listen/test?text=중복").json()["triggered_keywords"] == ["중복"]
+    assert client.post("/listen/test?text=중복").json()["triggered_keywords"] == []
+
+    metrics = client.get("/metrics").json()
+    assert metrics["debounce"]["suppressed_keywords"] == {"중복": 1}
+    assert "submitted" in metrics["executor"]
+
+
+def test_circuits_endpoint(client):
+    """Test circuit state is exposed and can be reset"""
+    client.post("/keywords", json={"keyword": "회로", "action_type": "lights"})
+    client.post("/listen/test?text=회로&action_wait=2")
+
+    data = client.get("/circuits").json()
+    assert data["circuits"]["lights"]["state"] == "closed"
+    assert "tokens" in data["retry_budget"]
+    assert client.post("/circuits/lights/reset").status_code == 200
+    assert client.post("/circuits/없음/reset").status_code == 404
+
+
+def test_device_state_short_circuits_lights(client):
+    """Test a lights keyword is skipped when the device is reported in that state"""
+    client.post(
+        "/keywords",
+        json={"keyword": "거실꺼", "action_type": "lights", "action_params": {"room": "거실"}},
+    )
+    response = client.put(
+        "/devices",
+        json={"action_type": "lights", "target": {"room": "거실"}, "state": {"state": "off"}},
+    )
+    assert response.status_code == 200
+    devices = client.get("/devices").json()
+    assert devices[0]["target"] == {"room": "거실"}
+    assert devices[0]["source"] == "external"
+
+    result = client.post("/listen/test?text=거실꺼").json()
+    assert result["action_messages"] == ["✅ 이미 요청한 상태입니다 (lights 거실)"]
+
+    response = client.post("/devices/invalidate", json={"action_type": "lights"})
+    assert response.json()["invalidated"] == 1
+    assert client.get("/devices").json() == []
+
+
+def test_device_update_requires_targets(client):
+    """Test device updates need an action type with targets and every target field"""
+    response = client.put(
+        "/devices", json={"action_type": "call", "target": {}, "state": {"on": True}}
+    )
+    assert response.status_code == 400
+    response = client.put(
+        "/devices", json={"action_type": "lights", "target": {}, "state": {"state": "on"}}
+    )
+    assert response.status_code == 400
+
+
+def test_listen_does_not_block_other_requests(client):
+    """Test a slow recognition leaves the event loop free for other endpoints"""
+    import threading
+    import time
+
+    from app import api
+
+    def slow_listen(timeout, phrase_time_limit):
+        time.sleep(0.5)
+        return []
+
+    api.voice_listener.microphone = object()
+    api.voice_listener.listen_nbest = slow_listen
+    listener = threading.Thread(target=client.post, args=("/listen",), kwargs={"json": {}})
+    listener.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert client.get("/status").status_code == 200
+    assert time.monotonic() - start < 0.3
+    listener.join()
+
+    metrics = client.get("/metrics").json()
+    assert metrics["pools"]["recognition"]["completed"] >= 1
+    assert "lag_p99_ms" in metrics["event_loop"]
+
+
+def test_listen_rejects_when_recognition_is_saturated(client, monkeypatch):
+    """Test /listen answers 503 when the recognition pool is full"""
+    from app import api
+    from app.offload import BlockingPool
+
+    monkeypatch.setattr(api, "recognition_pool", BlockingPool("busy", workers=1, max_queue=0))
+    api.recognition_pool.inflight = 1
+    response = client.post("/listen", json={})
+    assert response.status_code == 503
+
+
+def test_listen_job(client):
+    """Test a queued recognition returns at once and its result can be fetched"""
+    import time
+
+    from app import api
+    from app.voice_listener import Hypothesis
+
+    with client:
+        api.voice_listener.register_action("엄마", lambda: "called")
+
+        def slow_listen(timeout, phrase_time_limit):
+            time.sleep(0.2)
+            return [Hypothesis("엄마", 0.9)]
+
+        api.voice_listener.microphone = object()
+        api.voice_listener.listen_nbest = slow_listen
+        start = time.monotonic()
+        response = client.post("/listen/jobs", json={}, headers={"X-Tenant-ID": "kitchen"})
+        assert time.monotonic() - start < 0.2
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert job["tenant"] == "kitchen"
+        assert response.headers["location"] == f"/listen/jobs/{job['job_id']}"
+
+        job = client.get(f"/listen/jobs/{job['job_id']}", params={"wait": 5}).json()
+        assert job["status"] == "done"
+        assert job["result"]["triggered_keywords"] == ["엄마"]
+        assert client.get("/metrics").json()["jobs"]["done"] == 1
+
+
+def test_listen_job_limits_and_cancel(client, monkeypatch):
+    """Test per-tenant limits answer 429 and queued jobs can be cancelled"""
+    import threading
+
+    from app import api
+
+    release = threading.Event()
+
+    def blocked_listen(timeout, phrase_time_limit):
+        release.wait(5)
+        return []
+
+    with client:
+        monkeypatch.setattr(api.listen_jobs, "max_per_tenant", 1)
+        api.voice_listener.microphone = object()
+        api.voice_listener.listen_nbest = blocked_listen
+        try:
+            running = client.post("/listen/jobs", json={}, headers={"X-Tenant-ID": "a"}).json()
+            response = client.post("/listen/jobs", json={}, headers={"X-Tenant-ID": "a"})
+            assert response.status_code == 429
+            assert response.headers["retry-after"]
+
+            queued = client.post("/listen/jobs", json={}, headers={"X-Tenant-ID": "b"}).json()
+            assert client.delete(f"/listen/jobs/{queued['job_id']}").status_code == 200
+            assert client.get(f"/listen/jobs/{queued['job_id']}").json()["status"] == "cancelled"
+            assert client.delete(f"/listen/jobs/{running['job_id']}").status_code == 409
+            assert client.get("/listen/jobs/missing").status_code == 404
+        finally:
+            release.set()
+
+
+def test_listen_sheds_load_with_retry_after(client, monkeypatch):
+    """Test /listen queues briefly, degrades under pressure and then answers 503 with Retry-After"""
+    import threading
+    import time
+
+    from app import api
+    from app.offload import ConcurrencyLimit
+
+    release = threading.Event()
+    models = []
+
+    def blocked_listen(timeout, phrase_time_limit, whisper_model=None):
+        models.append(whisper_model)
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(
+        api, "listen_limit", ConcurrencyLimit("listen", limit=1, max_queue=2, degrade_at=1)
+    )
+    with client:
+        api.voice_listener.microphone = object()
+        api.voice_listener.listen_nbest = blocked_listen
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(client.post("/listen", json={})))
+            for _ in range(3)
+        ]
+        for count, thread in enumerate(threads, 1):
+            thread.start()
+            deadline = time.monotonic() + 5
+            while api.listen_limit.active + api.listen_limit.waiting < count:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+        response = client.post("/listen", json={})
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) >= 1
+        admission = client.get("/metrics").json()["admission"]["listen"]
+        assert (admission["active"], admission["waiting"], admission["rejected"]) == (1, 2, 1)
+
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert [r.json()["degraded"] for r in responses] == [False, True, False]
+    assert models == [None, api.DEGRADED_WHISPER_MODEL, None]
+
+
+def test_match_batch_json(client):
+    """Test batch matching reports matches per transcript without running actions"""
+    from app.api import voice_listener
+
+    calls = []
+    voice_listener.register_action("배치", lambda: calls.append(True))
+    response = client.post(
+        "/match/batch?dry_run=true", json={"transcripts": ["배치 실행", "아무 말", "또 배치"]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "matches": [["배치"], [], ["배치"]],
+        "lines": 3,
+        "matched": 2,
+        "dry_run": True,
+        "dispatched": 0,
+    }
+    assert calls == []
+    assert client.post("/match/batch", json={"transcripts": "배치"}).status_code == 422
+
+
+def test_match_batch_runs_each_action_once(client):
+    """Test a batch without dry_run runs an action once however many lines match it"""
+    from app.api import voice_listener
+
+    calls = []
+    voice_listener.register_action("배치", lambda: calls.append(True))
+    response = client.post("/match/batch", json={"transcripts": ["배치"] * 50 + ["아무 말"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["matched"] == 50
+    assert body["matches"][0] == ["배치"]
+    assert body["dispatched"] == 1
+
+
+def test_match_batch_ndjson(client):
+    """Test NDJSON input streams one result per line, keeping line numbers and ids"""
+    import json
+    from app.api import voice_listener
+
+    voice_listener.register_action("배치", lambda: None)
+    body = '"배치 실행"\n\n{"text": "아무 말", "id": "a1"}\nnot json\n{"text": "배치", "id": 7}\n'
+    response = client.post(
+        "/match/batch?dry_run=true",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[0] == {"line": 1, "keywords": ["배치"]}
+    assert results[1] == {"line": 3, "id": "a1", "keywords": []}
+    assert results[2]["line"] == 4 and "error" in results[2]
+    assert results[3] == {"line": 5, "id": 7, "keywords": ["배치"]}
+    assert len(results) == 4
+
+
+def test_start_listening_while_capturing(client):
+    """Test continuous listening cannot start while a one-shot /listen holds the microphone"""
+    import threading
+    import time
+
+    from app import api
+
+    release = threading.Event()
+
+    def blocked_listen(timeout, phrase_time_limit):
+        release.wait(5)
+        return []
+
+    api.voice_listener.microphone = object()
+    api.voice_listener.listen_nbest = blocked_listen
+    listener = threading.Thread(target=client.post, args=("/listen",), kwargs={"json": {}})
+    listener.start()
+    deadline = time.monotonic() + 5
+    while not api.active_captures:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    response = client.post("/listen/start")
+    assert response.status_code == 409
+    assert not api.continuous_listener.running
+    release.set()
+    listener.join()
+    assert api.active_captures == 0
+
+
+def test_multi_worker_mode_shares_actions(monkeypatch):
+    """Test with several workers action statuses are shared and device caching is off"""
+    from app import api
+    from app.executor import action_executor
+    from app.shared_state import SharedRecords
+
+    monkeypatch.setenv("SOUNDTOACT_WORKERS", "2")
+    with TestClient(app) as client:
+        assert client.get("/metrics").json()["process"]["workers"] == 2
+        assert action_executor.device_states is None
+        for method, path, body in [
+            ("GET", "/devices", None),
+            ("PUT", "/devices", {"action_type": "lights", "target": {"room": "거실"},
+                                 "state": {"state": "on"}}),
+            ("POST", "/devices/invalidate", {}),
+        ]:
+            assert client.request(method, path, json=body).status_code == 409
+
+        # A status written by another worker's executor
+        other_worker = SharedRecords(api.shared_records.path)
+        other_worker.put("action", "elsewhere", {
+            "action_id": "elsewhere", "keyword": "불", "action_type": "lights",
+            "status": "success", "submitted_at": 1.0,
+        })
+        other_worker.close()
+        assert client.get("/actions/elsewhere").json()["status"] == "success"
+
+        client.post("/keywords", json={"keyword": "공유", "action_type": "music"})
+        client.post("/listen/test", params={"text": "공유", "action_wait": 1})
+        listed = {a["action_id"]: a for a in client.get("/actions").json()}
+        assert "elsewhere" in listed
+        assert any(a["keyword"] == "공유" and a["status"] == "success" for a in listed.values())
+    assert action_executor.device_states is not None
+    assert action_executor.records is None
+
+
+def test_multi_worker_mode_shares_jobs(monkeypatch):
+    """Test a job held by another worker can be fetched and cancelled from this one"""
+    from app import api
+    from app.jobs import RecognitionJob
+    from app.shared_state import SharedRecords
+
+    monkeypatch.setenv("SOUNDTOACT_WORKERS", "2")
+    with TestClient(app) as client:
+        other_worker = SharedRecords(api.shared_records.path)
+        job = RecognitionJob("kitchen", None)
+        other_worker.put("job", job.job_id, job.to_dict())
+
+        response = client.get(f"/listen/jobs/{job.job_id}?wait=0.2")
+        assert response.json()["status"] == "queued"
+        assert client.delete(f"/listen/jobs/{job.job_id}").status_code == 202
+        assert other_worker.get("job_cancel", job.job_id) is not None
+
+        job.status = "done"
+        other_worker.put("job", job.job_id, job.to_dict())
+        assert client.get(f"/listen/jobs/{job.job_id}").json()["status"] == "done"
+        assert client.delete(f"/listen/jobs/{job.job_id}").status_code == 409
+        assert client.get("/listen/jobs/missing").status_code == 404
+        other_worker.close()
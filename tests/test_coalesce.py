@@ -0,0 +1,55 @@
+"""
+Tests for ActionCoalescer
+"""
+import threading
+
+from app.coalesce import ActionCoalescer
+
+
+def collector():
+    """on_flush callback that records groups and signals each flush"""
+    groups = []
+    flushed = threading.Event()
+
+    def on_flush(group):
+        groups.append(group)
+        flushed.set()
+
+    return groups, flushed, on_flush
+
+
+def test_target_key():
+    """Test only declared action types get a target key"""
+    coalescer = ActionCoalescer(lambda group: None, {"lights": ("room",)})
+    assert coalescer.target_key("lights", {"room": "거실", "state": "on"}) == ("lights", "거실")
+    assert coalescer.target_key("call", {"contact": "엄마"}) is None
+    assert coalescer.target_key("lights", None) is None
+
+
+def test_burst_is_flushed_as_one_group():
+    """Test actions for one target inside the window flush together, in order"""
+    groups, flushed, on_flush = collector()
+    coalescer = ActionCoalescer(on_flush, {"lights": ("room",)}, window=0.05)
+    for state in ["on", "off", "on"]:
+        coalescer.offer(("lights", "거실"), state)
+
+    assert flushed.wait(2)
+    assert groups == [["on", "off", "on"]]
+    snapshot = coalescer.snapshot()
+    assert snapshot["groups"] == 1
+    assert snapshot["merged"] == 2
+    assert snapshot["merged_by_type"] == {"lights": 2}
+    coalescer.close()
+
+
+def test_targets_are_grouped_separately():
+    """Test different targets never merge"""
+    groups = []
+    coalescer = ActionCoalescer(groups.append, {"lights": ("room",)}, window=10)
+    coalescer.offer(("lights", "거실"), "a")
+    coalescer.offer(("lights", "안방"), "b")
+    assert coalescer.pending == 2
+
+    coalescer.close()
+    assert sorted(groups) == [["a"], ["b"]]
+    assert coalescer.snapshot()["merged"] == 0
@@ -0,0 +1,173 @@
+"""
+Tests for the background continuous listening pipeline
+"""
+import threading
+import time
+
+import pytest
+from app.continuous import ContinuousListener
+from app.voice_listener import Hypothesis
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def fake_audio(voice_listener, monkeypatch):
+    """Replace the microphone with a list of phrases; returns the phrase list"""
+    phrases = []
+
+    def capture(timeout=5, phrase_time_limit=5):
+        if phrases:
+            return phrases.pop(0)
+        time.sleep(0.01)
+        return None
+
+    monkeypatch.setattr(voice_listener, "initialize", lambda: setattr(voice_listener, "microphone", object()))
+    monkeypatch.setattr(voice_listener, "capture", capture)
+    monkeypatch.setattr(
+        voice_listener, "recognize_nbest", lambda audio: [Hypothesis(audio, 0.9)]
+    )
+    return phrases
+
+
+def test_pipeline_triggers_actions(voice_listener, fake_audio):
+    """Test captured phrases are recognized and their actions fired"""
+    calls = []
+    voice_listener.register_action("불", lambda: calls.append(True))
+    continuous = ContinuousListener(voice_listener)
+    fake_audio.extend(["불 켜", "안녕", "불 꺼"])
+
+    continuous.start()
+    assert voice_listener.is_listening
+    assert wait_for(lambda: continuous.stats["recognized"] == 3)
+    continuous.stop(timeout=1)
+
+    status = continuous.status()
+    assert not status["running"]
+    assert status["state"] == "stopped"
+    assert status["captured"] == 3
+    assert status["triggered"] == 2
+    assert status["phrases_per_minute"] == 3
+    assert status["last_text"] == "불 꺼"
+    assert not voice_listener.is_listening
+
+
+def test_state_changes_are_published(voice_listener, fake_audio):
+    """Test listener state transitions are published as events"""
+    from app.events import EventBus
+
+    bus = EventBus()
+    voice_listener.events = bus
+    continuous = ContinuousListener(voice_listener)
+    continuous.start()
+    assert wait_for(lambda: continuous.state == "running")
+    continuous.stop(timeout=1)
+
+    states = [e.data["state"] for e in bus.since(bus.last_id - 3)]
+    assert states == ["starting", "running", "stopped"]
+    assert bus.since(bus.last_id - 1)[0].data["is_listening"] is False
+
+
+def test_start_twice_raises(voice_listener, fake_audio):
+    """Test a running pipeline cannot be started again"""
+    continuous = ContinuousListener(voice_listener)
+    continuous.start()
+    try:
+        with pytest.raises(RuntimeError):
+            continuous.start()
+    finally:
+        continuous.stop(timeout=1)
+    continuous.start()
+    continuous.stop(timeout=1)
+
+
+def test_slow_recognition_drops_oldest(voice_listener, fake_audio, monkeypatch):
+    """Test a full queue drops stale phrases instead of falling behind"""
+    busy = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def capture(timeout=5, phrase_time_limit=5):
+        # Hand out the rest only once the first phrase is being recognized
+        if len(fake_audio) < 6:
+            busy.wait()
+        if fake_audio:
+            return fake_audio.pop(0)
+        time.sleep(0.01)
+
+    def recognize(audio):
+        busy.set()
+        release.wait()
+        seen.append(audio)
+        return [Hypothesis(audio, 0.9)]
+
+    monkeypatch.setattr(voice_listener, "capture", capture)
+    monkeypatch.setattr(voice_listener, "recognize_nbest", recognize)
+    continuous = ContinuousListener(voice_listener, max_queue=2)
+    fake_audio.extend([f"phrase {i}" for i in range(6)])
+
+    continuous.start()
+    try:
+        assert wait_for(lambda: continuous.stats["captured"] == 6)
+        assert wait_for(lambda: continuous.stats["dropped"] == 3)
+        assert continuous.status()["queue_depth"] == 2
+        release.set()
+        assert wait_for(lambda: len(seen) == 3)
+    finally:
+        release.set()
+        continuous.stop(timeout=1)
+
+    # The first phrase was already being recognized; only the newest two stayed queued
+    assert seen == ["phrase 0", "phrase 4", "phrase 5"]
+
+
+def test_capture_failure_restarts(voice_listener, fake_audio, monkeypatch):
+    """Test the microphone is reinitialized with backoff after a failure"""
+    inits = []
+    failures = [OSError("device unplugged"), OSError("device unplugged")]
+
+    def initialize():
+        inits.append(True)
+        voice_listener.microphone = object()
+
+    def capture(timeout=5, phrase_time_limit=5):
+        if failures:
+            raise failures.pop(0)
+        return fake_audio.pop(0) if fake_audio else time.sleep(0.01)
+
+    monkeypatch.setattr(voice_listener, "initialize", initialize)
+    monkeypatch.setattr(voice_listener, "capture", capture)
+    continuous = ContinuousListener(voice_listener, restart_delay=0.01)
+    fake_audio.append("hello")
+
+    continuous.start()
+    assert wait_for(lambda: continuous.stats["recognized"] == 1)
+    assert continuous.status()["state"] == "running"
+    continuous.stop(timeout=1)
+
+    assert continuous.stats["restarts"] == 2
+    assert len(inits) == 3
+    assert continuous.last_error == "device unplugged"
+
+
+def test_stop_interrupts_backoff(voice_listener, monkeypatch):
+    """Test stopping does not wait out a long restart delay"""
+    def initialize():
+        raise OSError("no microphone")
+
+    monkeypatch.setattr(voice_listener, "initialize", initialize)
+    continuous = ContinuousListener(voice_listener, restart_delay=30)
+    continuous.start()
+    assert wait_for(lambda: continuous.state == "restarting")
+
+    start = time.monotonic()
+    continuous.stop(timeout=1)
+    assert time.monotonic() - start < 1
+    assert continuous.status()["state"] == "stopped"
@@ -0,0 +1,77 @@
+"""
+Tests for TriggerDebouncer
+"""
+import pytest
+from app.debounce import TriggerDebouncer, params_key
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def debouncer(clock):
+    return TriggerDebouncer(keyword_window=2.0, action_window=5.0, clock=clock)
+
+
+def test_keyword_debounce_window(debouncer, clock):
+    """Test a keyword is suppressed inside its window and allowed after it"""
+    assert debouncer.allow_keyword("엄마") is True
+    clock.now += 1.0
+    assert debouncer.allow_keyword("엄마") is False
+    clock.now += 1.5
+    assert debouncer.allow_keyword("엄마") is True
+    assert debouncer.stats()["suppressed_keywords"] == {"엄마": 1}
+
+
+def test_distinct_keywords_are_independent(debouncer):
+    """Test different keywords do not suppress each other"""
+    assert debouncer.allow_keyword("엄마") is True
+    assert debouncer.allow_keyword("음악") is True
+
+
+def test_action_dedup_by_params(debouncer, clock):
+    """Test the same action and params is suppressed, other params are not"""
+    assert debouncer.allow_action("call", {"contact": "엄마"}) is True
+    assert debouncer.allow_action("call", {"contact": "엄마"}) is False
+    assert debouncer.allow_action("call", {"contact": "아빠"}) is True
+    clock.now += 5.0
+    assert debouncer.allow_action("call", {"contact": "엄마"}) is True
+    stats = debouncer.stats()
+    assert stats["suppressed_actions"] == {"call": 1}
+    assert stats["suppressed_total"] == 1
+
+
+def test_per_action_type_window(clock):
+    """Test action types can have their own window"""
+    debouncer = TriggerDebouncer(action_window=5.0, action_windows={"lights": 0.5}, clock=clock)
+    assert debouncer.allow_action("lights", {"state": "off"}) is True
+    clock.now += 1.0
+    assert debouncer.allow_action("lights", {"state": "off"}) is True
+
+
+def test_expired_keys_are_dropped(debouncer, clock):
+    """Test state only holds keys from the current window"""
+    for i in range(100):
+        debouncer.allow_keyword(f"키워드{i}")
+    assert debouncer.stats()["tracked_keys"] == 100
+    clock.now += 10.0
+    debouncer.allow_keyword("새로운")
+    assert debouncer.stats()["tracked_keys"] == 1
+
+
+def test_params_key_is_order_independent():
+    """Test params order does not change the dedup key"""
+    assert params_key("lights", {"a": 1, "b": 2}) == params_key("lights", {"b": 2, "a": 1})
+    assert params_key("music", None) == params_key("music", {})
@@ -0,0 +1,58 @@
+"""
+Tests for DeviceStateCache
+"""
+from app.device_state import DeviceStateCache
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_satisfies_known_state():
+    """Test a device in the desired state satisfies the request"""
+    cache = DeviceStateCache()
+    cache.update(("lights", "거실"), {"state": "on"})
+    assert cache.satisfies(("lights", "거실"), {"state": "on"})
+    assert not cache.satisfies(("lights", "거실"), {"state": "off"})
+    assert not cache.satisfies(("lights", "안방"), {"state": "on"})
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 2
+
+
+def test_entries_expire():
+    """Test entries are forgotten after the TTL"""
+    clock = FakeClock()
+    cache = DeviceStateCache(ttl=10, clock=clock)
+    cache.update(("lights", "거실"), {"state": "on"})
+    clock.now = 9.9
+    assert cache.get(("lights", "거실")) is not None
+    clock.now = 10.0
+    assert cache.get(("lights", "거실")) is None
+    assert cache.stats["expired"] == 1
+
+
+def test_update_merges_and_records_source():
+    """Test updates merge over the known state"""
+    cache = DeviceStateCache()
+    cache.update(("lights", "거실"), {"state": "on"})
+    cache.update(("lights", "거실"), {"level": 50}, source="external")
+    entry = cache.get(("lights", "거실"))
+    assert dict(entry.state) == {"state": "on", "level": 50}
+    assert entry.source == "external"
+
+
+def test_invalidate():
+    """Test invalidating one device or all of them"""
+    cache = DeviceStateCache()
+    cache.update(("lights", "거실"), {"state": "on"})
+    cache.update(("lights", "안방"), {"state": "on"})
+    assert cache.invalidate(("lights", "거실")) == 1
+    assert cache.invalidate(("lights", "거실")) == 0
+    assert cache.invalidate() == 1
+    assert cache.items() == []
@@ -0,0 +1,139 @@
+"""
+Tests for the server-sent event stream
+"""
+import asyncio
+import json
+import threading
+
+from app.events import EventBus
+
+
+def parse(chunk: str) -> dict:
+    """Parse one encoded event into its fields"""
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def test_publish_and_since():
+    """Test events are numbered consecutively and replayed after an ID"""
+    bus = EventBus()
+    first = bus.publish("keywords", {"added": ["불"]})
+    second = bus.publish("recognized", {"text": "불 켜"})
+    assert second.id == first.id + 1
+    assert bus.since(first.id - 1) == [first, second]
+    assert bus.since(first.id) == [second]
+    assert bus.since(second.id) == []
+
+
+def test_since_reports_gaps():
+    """Test resuming from an evicted or unknown ID asks for a reset"""
+    bus = EventBus(history=2)
+    first = bus.publish("a", {})
+    bus.publish("b", {})
+    bus.publish("c", {})
+    assert bus.since(first.id) is not None
+    assert bus.since(first.id - 1) is None
+    # An ID from the future, e.g. issued before a restart with a clock step back
+    assert bus.since(bus.last_id + 100) is None
+
+
+def test_encode_format():
+    """Test events encode as SSE with id, event and JSON data"""
+    bus = EventBus()
+    event = bus.publish("recognized", {"text": "엄마"})
+    fields = parse(event.encode())
+    assert fields == {"id": str(event.id), "event": "recognized", "data": {"text": "엄마"}}
+    assert event.encode().endswith("\n\n")
+
+
+def test_stream_delivers_new_events():
+    """Test a subscriber receives events published from another thread"""
+    bus = EventBus()
+    bus.publish("old", {})
+
+    async def run():
+        stream = bus.stream()
+        assert (await stream.__anext__()).startswith("retry:")
+        received = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        assert bus.snapshot()["subscribers"] == 1
+        threading.Thread(target=bus.publish, args=("recognized", {"text": "불"})).start()
+        chunk = await asyncio.wait_for(received, 1)
+        await stream.aclose()
+        return chunk
+
+    chunk = asyncio.run(run())
+    assert parse(chunk)["event"] == "recognized"
+    assert bus.snapshot()["subscribers"] == 0
+
+
+def test_stream_resumes_after_last_id():
+    """Test a reconnecting client gets exactly the events it missed"""
+    bus = EventBus()
+    seen = bus.publish("a", {})
+    bus.publish("b", {})
+    bus.publish("c", {})
+
+    async def run():
+        stream = bus.stream(seen.id)
+        chunks = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return chunks[1:]
+
+    assert [parse(c)["event"] for c in asyncio.run(run())] == ["b", "c"]
+
+
+def test_stream_resets_on_gap():
+    """Test a client too far behind gets a reset and then live events"""
+    bus = EventBus(history=1)
+    stale = bus.publish("a", {}).id - 1
+    bus.publish("b", {})
+
+    async def run():
+        stream = bus.stream(stale)
+        await stream.__anext__()
+        reset = parse(await stream.__anext__())
+        bus.publish("c", {})
+        live = parse(await stream.__anext__())
+        await stream.aclose()
+        return reset, live
+
+    reset, live = asyncio.run(run())
+    assert reset["event"] == "reset"
+    assert int(live["id"]) == int(reset["id"]) + 1
+    assert live["event"] == "c"
+    assert bus.stats["resets"] == 1
+
+
+def test_stream_keepalive_when_idle():
+    """Test an idle stream only sends a comment per keepalive interval"""
+    bus = EventBus(keepalive=0.05)
+
+    async def run():
+        stream = bus.stream()
+        await stream.__anext__()
+        chunk = await asyncio.wait_for(stream.__anext__(), 1)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(run()) == ": keepalive\n\n"
+
+
+def test_listener_publishes_events(voice_listener):
+    """Test keyword changes, recognized text and triggers are published"""
+    bus = EventBus()
+    voice_listener.events = bus
+    voice_listener.register_action("불", lambda: None, aliases=["전등"])
+    voice_listener.trigger("불 켜")
+    voice_listener.trigger("안녕")
+    voice_listener.unregister_action("불")
+
+    events = [(e.type, e.data) for e in bus.since(bus.last_id - 5)]
+    assert events[0][0] == "keywords"
+    assert events[0][1]["added"] == ["불", "전등"]
+    assert events[1] == ("recognized", {"text": "불 켜"})
+    assert events[2] == ("triggered", {"text": "불 켜", "keywords": ["불"]})
+    assert events[3] == ("recognized", {"text": "안녕"})
+    assert events[4][1]["removed"] == ["불"]
+    assert events[4][1]["count"] == 1
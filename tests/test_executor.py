@@ -0,0 +1,315 @@
+"""
+Tests for ActionExecutor
+"""
+import threading
+import time
+
+import pytest
+from app.executor import ActionExecutor, ExecutorSaturatedError
+
+
+@pytest.fixture
+def executor():
+    """Executor with a short default timeout"""
+    ex = ActionExecutor(max_workers=2, default_timeout=1.0)
+    yield ex
+    ex.shutdown()
+
+
+def test_submit_returns_handle(executor):
+    """Test a submitted action runs and resolves its handle"""
+    handle = executor.submit(lambda: {"message": "done"}, "엄마", "call")
+    assert handle.wait(2).status == "success"
+    assert handle.message == "done"
+    assert executor.get(handle.action_id) is handle
+    assert executor.stats["success"] == 1
+
+
+def test_submit_does_not_block(executor):
+    """Test submit returns before a slow action finishes"""
+    release = threading.Event()
+    start = time.monotonic()
+    handle = executor.submit(release.wait, "slow")
+    assert time.monotonic() - start < 0.5
+    assert not handle.done
+    release.set()
+    assert handle.wait(2).status == "success"
+
+
+def test_action_error(executor):
+    """Test a failing action is reported as an error"""
+    def fail():
+        raise ValueError("boom")
+
+    handle = executor.submit(fail, "bad").wait(2)
+    assert handle.status == "error"
+    assert handle.error == "boom"
+
+
+def test_per_type_timeout():
+    """Test an action that overruns its type's timeout is reported as timeout"""
+    executor = ActionExecutor(max_workers=1, timeouts={"call": 0.1})
+    release = threading.Event()
+    try:
+        handle = executor.submit(release.wait, "엄마", "call").wait(2)
+        assert handle.status == "timeout"
+        assert executor.stats["timeout"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_bounded_queue():
+    """Test submits beyond the queue bound are rejected"""
+    executor = ActionExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        executor.submit(release.wait)
+        deadline = time.monotonic() + 2
+        while executor.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        executor.submit(release.wait)
+        with pytest.raises(ExecutorSaturatedError):
+            executor.submit(release.wait)
+        assert executor.stats["rejected"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_history_is_bounded():
+    """Test only the most recent finished handles are kept"""
+    executor = ActionExecutor(max_workers=1, history_size=2)
+    try:
+        handles = [executor.submit(lambda: None) for _ in range(3)]
+        for handle in handles:
+            handle.wait(2)
+        executor.submit(lambda: None).wait(2)
+        assert executor.get(handles[0].action_id) is None
+        assert len(executor.recent()) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_restart_after_shutdown(executor):
+    """Test the executor restarts on the next submit after shutdown"""
+    executor.submit(lambda: None).wait(2)
+    executor.shutdown()
+    assert executor.submit(lambda: "again").wait(2).result == "again"
+
+
+@pytest.fixture
+def loop_executor():
+    """Executor with an event loop running in a background thread"""
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    ex = ActionExecutor(max_workers=2, default_timeout=2.0)
+    ex.attach_loop(loop)
+    yield ex
+    ex.detach_loop()
+    ex.shutdown()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_async_actions_run_concurrently_on_loop(loop_executor):
+    """Test many async actions overlap on the loop instead of using worker threads"""
+    import asyncio
+
+    async def call():
+        await asyncio.sleep(0.2)
+        return {"message": threading.current_thread().name}
+
+    start = time.monotonic()
+    handles = [loop_executor.submit(call, "엄마", "call") for _ in range(200)]
+    for handle in handles:
+        assert handle.wait(5).status == "success"
+    assert time.monotonic() - start < 2.0
+    assert not handles[0].message.startswith("action-worker")
+
+
+def test_async_action_timeout_cancels(loop_executor):
+    """Test an async action past its timeout is cancelled"""
+    import asyncio
+
+    cancelled = threading.Event()
+    loop_executor.timeouts["call"] = 0.1
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    handle = loop_executor.submit(hang, "엄마", "call").wait(2)
+    assert handle.status == "timeout"
+    assert cancelled.wait(2)
+
+
+def test_sync_action_returning_coroutine(loop_executor):
+    """Test a sync wrapper returning a coroutine is finished on the loop"""
+    import asyncio
+
+    async def work():
+        await asyncio.sleep(0)
+        return "ok"
+
+    handle = loop_executor.submit(lambda: work()).wait(2)
+    assert handle.result == "ok"
+
+
+def test_coalesces_burst_to_same_target():
+    """Test a burst for one target runs once with the final state"""
+    executor = ActionExecutor(
+        max_workers=2, coalesce_targets={"lights": ("room",)}, coalesce_window=0.05
+    )
+    calls = []
+
+    def lights(state):
+        def action():
+            calls.append(state)
+            return {"message": state}
+        return action
+
+    try:
+        handles = [
+            executor.submit(lights(state), "불", "lights", {"room": "거실", "state": state})
+            for state in ["on", "off", "on"]
+        ]
+        other = executor.submit(lights("off"), "불", "lights", {"room": "안방", "state": "off"})
+
+        for handle in [*handles, other]:
+            assert handle.wait(2).status == "success"
+        assert sorted(calls) == ["off", "on"]
+        assert [h.message for h in handles] == ["on", "on", "on"]
+        assert handles[0].coalesced_into == handles[2].action_id
+        assert handles[2].coalesced_into is None
+        assert executor.stats["coalesced"] == 2
+        assert executor.coalescer.snapshot()["merged_by_type"] == {"lights": 2}
+    finally:
+        executor.shutdown()
+
+
+def test_priority_order():
+    """Test queued actions run highest class first, FIFO within a class"""
+    executor = ActionExecutor(
+        max_workers=1, reserved_workers=0, priorities={"call": 0, "music": 2}
+    )
+    release = threading.Event()
+    order = []
+    try:
+        blocker = executor.submit(release.wait, "block", "lights")
+        handles = [
+            executor.submit(lambda t=t: order.append(t), t, t)
+            for t in ["music", "lights", "call", "lights"]
+        ]
+        release.set()
+        for handle in [blocker, *handles]:
+            handle.wait(2)
+        assert order == ["call", "lights", "lights", "music"]
+        assert handles[2].priority == 0
+    finally:
+        executor.shutdown()
+
+
+def test_reserved_worker_runs_emergency_under_load():
+    """Test an emergency action starts while every general worker is busy"""
+    executor = ActionExecutor(max_workers=2, reserved_workers=1, priorities={"call": 0})
+    release = threading.Event()
+    try:
+        for _ in range(6):
+            executor.submit(release.wait, "음악", "music")
+        call = executor.submit(lambda: {"message": "called"}, "엄마", "call")
+        assert call.wait(1).status == "success"
+        assert executor.queue_stats()[0]["samples"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_reserved_slots_admit_only_emergency():
+    """Test routine actions are refused from the reserved queue slots"""
+    executor = ActionExecutor(
+        max_workers=1, reserved_workers=0, max_pending=3, reserved_pending=1,
+        priorities={"call": 0},
+    )
+    release = threading.Event()
+    try:
+        executor.submit(release.wait, "block", "lights")
+        time.sleep(0.05)
+        executor.submit(release.wait, "a", "lights")
+        executor.submit(release.wait, "b", "lights")
+        with pytest.raises(ExecutorSaturatedError):
+            executor.submit(release.wait, "c", "lights")
+        executor.submit(release.wait, "엄마", "call")
+        assert executor.queue_stats()[0]["pending"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_skips_action_when_device_already_in_state():
+    """Test an idempotent action is skipped once its device state is known"""
+    from app.device_state import DeviceStateCache
+
+    cache = DeviceStateCache()
+    executor = ActionExecutor(
+        max_workers=2,
+        coalesce_targets={"lights": ("room",)},
+        coalesce_window=0.01,
+        idempotent={"lights"},
+        device_states=cache,
+    )
+    calls = []
+    params = {"room": "거실", "state": "off"}
+
+    def lights():
+        calls.append(True)
+        return {"message": "off"}
+
+    try:
+        first = executor.submit(lights, "불꺼", "lights", params)
+        assert cache.get(("lights", "거실")) is None
+        assert first.wait(2).status == "success"
+        assert dict(cache.get(("lights", "거실")).state) == {"state": "off"}
+
+        second = executor.submit(lights, "불꺼", "lights", params)
+        assert second.done
+        assert second.result["skipped"] is True
+        assert len(calls) == 1
+        assert executor.stats["skipped"] == 1
+
+        on = executor.submit(lights, "불켜", "lights", {"room": "거실", "state": "on"})
+        assert on.wait(2).status == "success"
+        assert len(calls) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_failed_action_leaves_device_unknown():
+    """Test a failed command does not record a device state"""
+    from app.device_state import DeviceStateCache
+
+    cache = DeviceStateCache()
+    executor = ActionExecutor(
+        coalesce_targets={"lights": ("room",)},
+        coalesce_window=0.01,
+        idempotent={"lights"},
+        device_states=cache,
+    )
+
+    def fail():
+        raise RuntimeError("hub offline")
+
+    try:
+        cache.update(("lights", "거실"), {"state": "on"})
+        handle = executor.submit(fail, "불꺼", "lights", {"room": "거실", "state": "off"})
+        assert handle.wait(2).status == "error"
+        assert cache.get(("lights", "거실")) is None
+    finally:
+        executor.shutdown()
@@ -0,0 +1,109 @@
+"""
+Tests for CommandGrammar
+"""
+import pytest
+from app.grammar import CommandGrammar, DEFAULT_COMMAND_TEMPLATES
+from app.matcher import Hypothesis
+
+
+def handler(params):
+    return params
+
+
+@pytest.fixture
+def grammar():
+    """Grammar loaded with the default templates"""
+    g = CommandGrammar()
+    for template, action_type in DEFAULT_COMMAND_TEMPLATES:
+        g.add(template, handler, action_type)
+    return g
+
+
+def test_parse_lights_slots(grammar):
+    """Test room and state slots are mapped to parameter values"""
+    matches = grammar.parse("거실 불 켜")
+    assert len(matches) == 1
+    assert matches[0].action_type == "lights"
+    assert matches[0].params == {"room": "거실", "state": "on"}
+
+
+def test_parse_ignores_spacing_and_synonyms(grammar):
+    """Test spacing variations and spoken synonyms"""
+    matches = grammar.parse("화장실불꺼줘")
+    assert matches[0].params == {"room": "욕실", "state": "off"}
+
+
+def test_parse_contact_slot(grammar):
+    """Test the contact slot captures a known contact inside a longer transcript"""
+    matches = grammar.parse("우리 엄마한테 전화 좀")
+    assert matches[0].action_type == "call"
+    assert matches[0].params == {"contact": "엄마"}
+    assert matches[0].text == "엄마한테 전화"
+
+
+def test_parse_rejects_everyday_speech(grammar):
+    """Test phrases that only contain a template are not parsed as commands"""
+    assert grammar.parse("택배 기사한테 전화 왔었어") == []
+    assert grammar.parse("거실 불 꺼내") == []
+    assert grammar.parse("엄마한테 전화해") == []
+    assert grammar.parse("지금 아이유 노래 틀어") == []
+
+
+def test_parse_free_slot():
+    """Test a slot without vocabulary captures a whole word"""
+    g = CommandGrammar()
+    g.add("{name}한테 문자", handler)
+    assert g.parse("우리 철수한테 문자")[0].params == {"name": "철수"}
+    assert g.parse("우리 철수한테 문자함") == []
+
+
+def test_parse_multi_word_slot():
+    """Test a {name+} slot captures several words"""
+    g = CommandGrammar()
+    g.add("{song+} 틀어", handler, "music")
+    assert g.parse("아이유 좋은날 틀어")[0].params == {"song": "아이유 좋은날"}
+
+
+def test_parse_several_commands_in_one_scan(grammar):
+    """Test every command in the text is found"""
+    matches = grammar.parse("안방 불 꺼 그리고 거실 불 켜")
+    assert [m.params for m in matches] == [
+        {"room": "안방", "state": "off"},
+        {"room": "거실", "state": "on"},
+    ]
+
+
+def test_fixed_params_and_custom_slots():
+    """Test fixed params merge under extracted slots"""
+    g = CommandGrammar()
+    g.add(
+        "{level} 밝기",
+        handler,
+        "lights",
+        slots={"level": {"최대": "100", "최소": "10"}},
+        action_params={"state": "on"},
+    )
+    assert g.parse("최대 밝기")[0].params == {"state": "on", "level": "100"}
+
+
+def test_template_requires_slots():
+    """Test templates without slots are rejected"""
+    with pytest.raises(ValueError):
+        CommandGrammar().add("불꺼", handler)
+
+
+def test_remove_template(grammar):
+    """Test removed templates stop matching"""
+    template_id = next(iter(grammar.templates))
+    assert grammar.remove(template_id) is True
+    assert grammar.parse("거실 불 켜") == []
+    assert grammar.remove(template_id) is False
+
+
+def test_parse_hypotheses_dedupes(grammar):
+    """Test the same command across hypotheses is reported once with the best score"""
+    matches = grammar.parse_hypotheses(
+        [Hypothesis("거실 불 켜", 0.4), Hypothesis("거실불켜", 0.9), Hypothesis("거 실", 0.2)]
+    )
+    assert len(matches) == 1
+    assert matches[0].score == 0.9
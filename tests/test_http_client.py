@@ -0,0 +1,169 @@
+"""
+Tests for the shared pooled HTTP client
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from app.actions import ActionRegistry
+from app.http_client import PooledHTTPClient
+
+
+class KeepAliveServer:
+    """Local HTTP/1.1 server that keeps connections open and counts them"""
+
+    def __init__(self, delay: float = 0.0):
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                threading.Event().wait(delay)
+                with server._lock:
+                    server.active -= 1
+                body = b'{"ok": true}'
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/state"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_sequential_requests_reuse_connection():
+    """Test sequential requests share one keep-alive connection"""
+    server = KeepAliveServer()
+
+    async def run():
+        client = PooledHTTPClient()
+        try:
+            for _ in range(5):
+                response = await client.get(server.url)
+                assert response.status_code == 200
+            return client.snapshot()
+        finally:
+            await client.aclose()
+
+    try:
+        snapshot = asyncio.run(run())
+    finally:
+        server.close()
+
+    assert server.connections == 1
+    assert snapshot["requests"] == 5
+    assert snapshot["new_connections"] == 1
+    assert snapshot["connection_reuse_rate"] == 0.8
+    assert snapshot["pool_wait_avg_ms"] is not None
+
+
+def test_per_host_limit_caps_concurrency():
+    """Test concurrent requests to one host stay within the per-host limit"""
+    server = KeepAliveServer(delay=0.05)
+
+    async def run():
+        client = PooledHTTPClient(per_host_limit=2)
+        try:
+            await asyncio.gather(*(client.get(server.url) for _ in range(6)))
+        finally:
+            await client.aclose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.close()
+
+    assert server.peak <= 2
+    assert server.connections <= 2
+
+
+def test_errors_are_counted():
+    """Test transport errors are counted and re-raised"""
+    def fail(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        client = PooledHTTPClient(transport=httpx.MockTransport(fail))
+        try:
+            await client.get("http://provider.invalid/")
+        except httpx.ConnectError:
+            pass
+        finally:
+            await client.aclose()
+        return client
+
+    client = asyncio.run(run())
+    assert client.stats["errors"] == 1
+    assert client.closed
+
+
+def test_registry_injects_http_client():
+    """Test handlers taking ``http`` receive the registry's shared client"""
+    registry = ActionRegistry()
+    seen = []
+
+    async def webhook(params, http):
+        seen.append(http)
+        response = await http.post("http://hooks.local/fire", json=dict(params))
+        return {"status": "success", "code": response.status_code}
+
+    registry.register("webhook", webhook)
+    action = registry.create_action("webhook", {"on": True})
+
+    async def run():
+        await registry.open_http_client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(204))
+        )
+        client = registry.http_client
+        result = await action()
+        await registry.close_http_client()
+        return client, result
+
+    client, result = asyncio.run(run())
+    assert result == {"status": "success", "code": 204}
+    assert seen == [client]
+    assert client.closed
+    assert registry.http_client is None
+
+
+def test_registry_rejects_sync_handlers_taking_http():
+    """Test plain handlers cannot ask for the async-only HTTP client"""
+    registry = ActionRegistry()
+
+    def webhook(params, http):
+        return http
+
+    with pytest.raises(ValueError):
+        registry.register("webhook", webhook)
+    assert registry.get_handler("webhook") is None
+
+
+def test_registry_leaves_plain_handlers_alone():
+    """Test handlers without an ``http`` parameter are called as before"""
+    registry = ActionRegistry()
+    registry.register("plain", lambda params: params)
+    assert registry.create_action("plain", {"a": 1})() == {"a": 1}
@@ -0,0 +1,172 @@
+"""
+Tests for asynchronous recognition jobs
+"""
+import asyncio
+
+import pytest
+from app.events import EventBus
+from app.jobs import (
+    FairJobQueue,
+    JobQueueFullError,
+    RecognitionJob,
+    RecognitionJobs,
+    TenantJobLimitError,
+)
+
+
+def test_fair_queue_round_robin():
+    """Test tenants take turns regardless of how many jobs each queued"""
+    queue = FairJobQueue(maxsize=10)
+    for tenant, request in [("a", 1), ("a", 2), ("a", 3), ("b", 1), ("c", 1), ("b", 2)]:
+        queue.put_nowait(RecognitionJob(tenant, request))
+
+    order = []
+    while (job := queue.get_nowait()) is not None:
+        order.append((job.tenant, job.request))
+    assert order == [("a", 1), ("b", 1), ("c", 1), ("a", 2), ("b", 2), ("a", 3)]
+
+
+def test_fair_queue_bounded():
+    """Test a full queue refuses jobs"""
+    queue = FairJobQueue(maxsize=1)
+    queue.put_nowait(RecognitionJob("a", None))
+    with pytest.raises(JobQueueFullError):
+        queue.put_nowait(RecognitionJob("b", None))
+
+
+def test_jobs_run_and_publish():
+    """Test a job runs in the background and its result is published"""
+    events = EventBus()
+
+    async def run(job):
+        await asyncio.sleep(0.01)
+        return {"text": job.request}
+
+    async def scenario():
+        jobs = RecognitionJobs(run, events=events)
+        jobs.start()
+        job = jobs.submit("a", "엄마")
+        assert job.status == "queued"
+        await asyncio.wait_for(job.finished.wait(), 1)
+        await jobs.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "done"
+    assert job.result == {"text": "엄마"}
+    published = [(e.type, e.data["status"]) for e in events.since(events.last_id - 3)]
+    assert published == [("job", "queued"), ("job", "running"), ("job", "done")]
+    assert events.since(events.last_id - 1)[0].data["result"] == {"text": "엄마"}
+
+
+def test_jobs_failure_is_recorded():
+    """Test an exception from the runner fails only that job"""
+    async def run(job):
+        if job.request == "bad":
+            raise RuntimeError("no microphone")
+        return "ok"
+
+    async def scenario():
+        jobs = RecognitionJobs(run)
+        jobs.start()
+        bad, good = jobs.submit("a", "bad"), jobs.submit("a", "good")
+        await asyncio.wait_for(good.finished.wait(), 1)
+        await jobs.stop()
+        return bad, good, jobs.snapshot()
+
+    bad, good, stats = asyncio.run(scenario())
+    assert (bad.status, bad.error) == ("failed", "no microphone")
+    assert good.status == "done"
+    assert (stats["failed"], stats["done"]) == (1, 1)
+
+
+def test_jobs_per_tenant_limit():
+    """Test one tenant cannot hold more than its share of unfinished jobs"""
+    async def run(job):
+        return None
+
+    async def scenario():
+        jobs = RecognitionJobs(run, max_per_tenant=2)
+        jobs.submit("a", 1)
+        jobs.submit("a", 2)
+        with pytest.raises(TenantJobLimitError):
+            jobs.submit("a", 3)
+        jobs.submit("b", 1)
+        jobs.start()
+        await asyncio.sleep(0.05)
+        # Finished jobs free the tenant's slots
+        jobs.submit("a", 4)
+        await jobs.stop()
+        return jobs.stats
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+
+
+def test_jobs_cancel_and_history():
+    """Test only queued jobs can be cancelled and old finished jobs are forgotten"""
+    async def run(job):
+        return None
+
+    async def scenario():
+        jobs = RecognitionJobs(run, history_size=2)
+        first = jobs.submit("a", 1)
+        assert jobs.cancel(first.job_id)
+        assert first.status == "cancelled"
+        assert not jobs.cancel(first.job_id)
+        later = [jobs.submit("b", i) for i in range(3)]
+        jobs.start()
+        await asyncio.wait_for(later[-1].finished.wait(), 1)
+        await jobs.stop()
+        return jobs, first, later
+
+    jobs, first, later = asyncio.run(scenario())
+    assert jobs.get(first.job_id) is None
+    assert jobs.get(later[0].job_id) is None
+    assert jobs.get(later[-1].job_id) is later[-1]
+
+
+def test_jobs_stop_cancels_queued():
+    """Test stopping cancels jobs that never started"""
+    async def run(job):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        jobs = RecognitionJobs(run)
+        jobs.start()
+        running, queued = jobs.submit("a", 1), jobs.submit("b", 1)
+        await asyncio.sleep(0.01)
+        await jobs.stop()
+        return running, queued
+
+    running, queued = asyncio.run(scenario())
+    assert running.status == "cancelled"
+    assert queued.status == "cancelled"
+
+
+def test_jobs_are_shared_between_workers(tmp_path):
+    """Test another worker can look up a job and cancel it before it starts"""
+    from app.shared_state import SharedRecords
+
+    path = str(tmp_path / "shared.db")
+
+    async def run(job):
+        return {"text": job.request}
+
+    async def scenario():
+        owner = RecognitionJobs(run, records=SharedRecords(path))
+        other = RecognitionJobs(run, records=SharedRecords(path))
+        kept, dropped = owner.submit("a", "엄마"), owner.submit("b", "아빠")
+        await asyncio.wrap_future(dropped.recorded)
+        assert (await other.shared(dropped.job_id))["status"] == "queued"
+        assert await other.request_cancel(dropped.job_id)
+        owner.start()
+        await asyncio.wait_for(dropped.finished.wait(), 1)
+        await asyncio.wait_for(kept.finished.wait(), 1)
+        await owner.stop()
+        assert not await other.request_cancel(kept.job_id)
+        return await other.wait_shared(kept.job_id, 1), await other.wait_shared(dropped.job_id, 1)
+
+    kept, dropped = asyncio.run(scenario())
+    assert (kept["status"], kept["result"]) == ("done", {"text": "엄마"})
+    assert dropped["status"] == "cancelled"
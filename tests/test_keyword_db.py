@@ -0,0 +1,210 @@
+"""
+Tests for the persistent keyword store
+"""
+import pytest
+from app.actions import ActionRegistry
+from app.keyword_db import KeywordDatabase, KeywordSync
+from app.voice_listener import VoiceListener
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = KeywordDatabase(str(tmp_path / "keywords.db"))
+    yield database
+    database.close()
+
+
+def test_add_and_read_back(db):
+    """Test mappings are stored with their aliases and params"""
+    db.add(["엄마", "어머니"], "call", {"contact": "엄마"})
+    db.add(["불"], "lights", {"room": "거실"})
+
+    mappings = list(db.mappings())
+    assert [sorted(m.keywords) for m in mappings] == [["어머니", "엄마"], ["불"]]
+    assert mappings[0].action_type == "call"
+    assert mappings[1].params == '{"room": "거실"}'
+    assert db.counts() == {"mappings": 2, "keywords": 3}
+
+
+def test_keywords_are_normalized(db):
+    """Test keywords are stored the way the in-memory store keys them"""
+    db.add([" 엄마 ", "엄마"], "call", {})
+    assert list(db.mappings())[0].keywords == ("엄마",)
+
+
+def test_remove_keywords(db):
+    """Test removing keywords drops mappings only once no alias is left"""
+    db.add(["엄마", "어머니"], "call", {})
+    db.add(["불"], "lights", {})
+
+    seq, removed = db.remove_keywords(["어머니", "없음", "불"])
+    assert removed == ["어머니", "불"]
+    assert seq == db.last_seq()
+    assert db.remove_keywords(["없음"]) == (None, [])
+    mappings = list(db.mappings())
+    assert [m.keywords for m in mappings] == [("엄마",)]
+    assert db.counts() == {"mappings": 1, "keywords": 1}
+
+
+def test_replace(db):
+    """Test replacing drops every earlier mapping in the same transaction"""
+    db.add(["엄마"], "call", {})
+    db.add_many([(["음악"], "music", {}), (["불"], "lights", {})], replace=True)
+    assert sorted(k for m in db.mappings() for k in m.keywords) == ["불", "음악"]
+
+
+def test_survives_reopen(tmp_path):
+    """Test mappings are still there after closing and reopening"""
+    path = str(tmp_path / "keywords.db")
+    db = KeywordDatabase(path)
+    db.add_many([([f"키워드{i}"], "lights", {"room": "거실"}) for i in range(100)])
+    db.close()
+
+    db = KeywordDatabase(path)
+    assert db.counts()["mappings"] == 100
+    db.close()
+
+
+def test_restore(db):
+    """Test restoring registers working actions and compiles the matcher"""
+    registry = ActionRegistry()
+    calls = []
+    registry.register("custom", lambda params: calls.append(dict(params)))
+    db.add(["불", "전등"], "lights", {"room": "거실", "state": "on"})
+    db.add(["테스트"], "custom", {"n": 1})
+    db.add(["사라진"], "removed_type", {})
+
+    listener = VoiceListener()
+    sync = KeywordSync(db, registry, listener)
+    assert sync.restore() == 2
+    assert sync.applied == db.last_seq()
+    assert sorted(listener.get_registered_keywords()) == ["불", "전등", "테스트"]
+    assert listener._matcher[:2] == (listener.keyword_actions, listener.keyword_actions.version)
+
+    action = listener.keyword_actions["전등"][0]
+    assert action.action_params == {"room": "거실", "state": "on"}
+    triggered, _ = listener.check_keywords("테스트")
+    assert triggered == ["테스트"]
+    assert calls == [{"n": 1}]
+
+
+def test_restore_keeps_identical_mappings_separate(db):
+    """Test mappings with the same params restore as separate actions"""
+    registry = ActionRegistry()
+    calls = []
+    registry.register("custom", lambda params: calls.append(dict(params)))
+    db.add(["하나"], "custom", {"n": 1})
+    db.add(["둘"], "custom", {"n": 1})
+
+    listener = VoiceListener()
+    KeywordSync(db, registry, listener).restore()
+    store = listener.keyword_actions
+    assert store.action_ids_for(store.pattern_id("하나")) != store.action_ids_for(
+        store.pattern_id("둘")
+    )
+    assert listener.check_keywords("하나 둘")[0] == ["하나", "둘"]
+    assert calls == [{"n": 1}, {"n": 1}]
+    assert listener.unregister_action("하나")
+    assert listener.check_keywords("둘")[0] == ["둘"]
+
+
+def test_change_log(db):
+    """Test every write is logged in order with a gapless sequence"""
+    first = db.add(["엄마"], "call", {})
+    second = db.add_many([(["불"], "lights", {}), (["음악"], "music", {})])
+    third, _ = db.remove_keywords(["엄마"])
+    assert (second, third) == (first + 1, first + 2)
+
+    changes = db.changes_since(first - 1)
+    assert [c.op for c in changes] == ["add", "add", "remove"]
+    assert changes[1].payload == {"ids": [2, 3]}
+    assert changes[2].payload == {"keywords": ["엄마"]}
+    assert db.changes_since(first, until=second) == changes[1:2]
+    assert db.changes_since(third) == []
+
+
+def test_change_log_reports_pruned_gap(tmp_path):
+    """Test a reader behind the kept log is told to reload"""
+    db = KeywordDatabase(str(tmp_path / "keywords.db"), log_size=10)
+    for i in range(100):
+        db.add([f"키워드{i}"], "call", {})
+    assert db.changes_since(0) is None
+    assert db.changes_since(0, until=50) is None
+    assert len(db.changes_since(95)) == 5
+    db.close()
+
+
+def make_sync(path, registry):
+    listener = VoiceListener()
+    sync = KeywordSync(KeywordDatabase(path), registry, listener, poll_interval=0.01)
+    sync.restore()
+    return sync
+
+
+def test_sync_follows_other_processes(tmp_path):
+    """Test two syncs on one file converge on the same keyword set and ETag"""
+    registry = ActionRegistry()
+    path = str(tmp_path / "keywords.db")
+    a, b = make_sync(path, registry), make_sync(path, registry)
+
+    a.add([("엄마", registry.create_action("call", {}), ["어머니"])])
+    b.add([(k, registry.create_action("music", {}), []) for k in ("하나", "둘")])
+    a.remove(["어머니"])
+    b.catch_up()
+    a.catch_up()
+
+    for sync in (a, b):
+        assert sorted(sync.listener.get_registered_keywords()) == ["둘", "엄마", "하나"]
+    assert a.etag == b.etag
+    assert b.stats["followed"] == 2
+
+
+def test_sync_write_applies_missed_changes_first(tmp_path):
+    """Test a write from a lagging process applies earlier changes in order"""
+    registry = ActionRegistry()
+    path = str(tmp_path / "keywords.db")
+    a, b = make_sync(path, registry), make_sync(path, registry)
+
+    a.add([("불", registry.create_action("lights", {}), [])])
+    # b has not polled yet; its replace must not resurrect or duplicate anything
+    b.add([("음악", registry.create_action("music", {}), [])], replace=False)
+    b.remove(["불"])
+    a.catch_up()
+
+    assert b.listener.get_registered_keywords() == ["음악"]
+    assert a.listener.get_registered_keywords() == ["음악"]
+    assert a.applied == b.applied
+
+
+def test_sync_reloads_when_too_far_behind(tmp_path):
+    """Test a process that missed pruned changes reloads everything"""
+    registry = ActionRegistry()
+    path = str(tmp_path / "keywords.db")
+    a, b = make_sync(path, registry), make_sync(path, registry)
+    a.db.log_size = 5
+    action = registry.create_action("call", {})
+    for i in range(200):
+        a.add([(f"키워드{i}", action, [])])
+
+    b.catch_up()
+    assert len(b.listener.get_registered_keywords()) == 200
+    assert b.stats["reloads"] == 2
+    assert b.etag == a.etag
+
+
+def test_sync_polls_in_background(tmp_path):
+    """Test a started sync picks up another process's change by itself"""
+    import time
+
+    registry = ActionRegistry()
+    path = str(tmp_path / "keywords.db")
+    a, b = make_sync(path, registry), make_sync(path, registry)
+    b.start()
+    try:
+        a.add([("배경", registry.create_action("call", {}), [])])
+        deadline = time.monotonic() + 2
+        while "배경" not in b.listener.keyword_actions and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        b.stop()
+    assert "배경" in b.listener.keyword_actions
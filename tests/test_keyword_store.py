@@ -0,0 +1,145 @@
+"""
+Tests for KeywordStore
+"""
+import pytest
+from app.keyword_store import KeywordStore
+
+
+def action_a():
+    return "a"
+
+
+def action_b():
+    return "b"
+
+
+def test_keyword_store_empty():
+    """Test a new store behaves like an empty mapping"""
+    store = KeywordStore()
+    assert store == {}
+    assert len(store) == 0
+    assert store.action_count == 0
+
+
+def test_add_multiple_actions_per_keyword():
+    """Test that several actions can share a keyword"""
+    store = KeywordStore()
+    store.add("엄마", action_a)
+    store.add("엄마", action_b)
+
+    assert store["엄마"] == (action_a, action_b)
+    assert len(store) == 1
+    assert store.action_count == 2
+
+
+def test_add_same_action_twice_is_noop():
+    """Test re-registering the same callable does not duplicate it"""
+    store = KeywordStore()
+    first = store.add("엄마", action_a)
+    second = store.add("엄마", action_a)
+    assert first == second
+    assert store["엄마"] == (action_a,)
+
+
+def test_aliases_share_one_action():
+    """Test aliases resolve to the same stored action"""
+    store = KeywordStore()
+    action_id = store.add(["엄마", "Mom"], action_a)
+    store.add_alias(action_id, "어머니")
+
+    assert store.aliases(action_id) == sorted(["엄마", "mom", "어머니"])
+    assert store["mom"] == (action_a,)
+    assert "MOM" not in store
+    assert store.action_count == 1
+
+
+def test_pattern_id_lookup():
+    """Test pattern IDs resolve to their actions"""
+    store = KeywordStore()
+    action_id = store.add("불꺼", action_a)
+    pattern_id = store.pattern_id("불꺼")
+
+    assert store.keyword_for(pattern_id) == "불꺼"
+    assert store.actions_for(pattern_id) == (action_a,)
+    assert store.action_ids_for(pattern_id) == (action_id,)
+    assert store.pattern_id("없음") is None
+
+
+def test_remove_keyword_drops_orphaned_actions():
+    """Test removing the last alias of an action removes the action"""
+    store = KeywordStore()
+    shared = store.add(["엄마", "어머니"], action_a)
+    store.add("엄마", action_b)
+
+    assert store.remove_keyword("엄마") is True
+    assert "엄마" not in store
+    assert store["어머니"] == (action_a,)
+    assert store.aliases(shared) == ["어머니"]
+    assert store.action_count == 1
+    assert store.remove_keyword("엄마") is False
+
+
+def test_remove_action():
+    """Test removing an action from all of its aliases"""
+    store = KeywordStore()
+    action_id = store.add(["엄마", "어머니"], action_a)
+    store.add("엄마", action_b)
+
+    assert store.remove_action(action_id) is True
+    assert store["엄마"] == (action_b,)
+    assert "어머니" not in store
+    assert store.remove_action(action_id) is False
+
+
+def test_pattern_ids_are_reused():
+    """Test freed pattern IDs are recycled"""
+    store = KeywordStore()
+    store.add("하나", action_a)
+    pattern_id = store.pattern_id("하나")
+    store.remove_keyword("하나")
+    store.add("둘", action_b)
+    assert store.pattern_id("둘") == pattern_id
+
+
+def test_add_rejects_empty_keyword():
+    """Test empty keywords are rejected"""
+    store = KeywordStore()
+    with pytest.raises(ValueError):
+        store.add("  ", action_a)
+    with pytest.raises(KeyError):
+        store.add_alias(999, "엄마")
+
+
+def test_add_many_bumps_version_once():
+    """Test a batch of registrations is a single change"""
+    store = KeywordStore()
+    version = store.version
+    action_ids = store.add_many([(["엄마", "어머니"], action_a), (["불"], action_b)])
+    assert len(action_ids) == 2
+    assert store.version == version + 1
+    assert store.aliases(action_ids[0]) == ["어머니", "엄마"]
+
+
+def test_remove_many():
+    """Test removing a batch reports which keywords existed"""
+    store = KeywordStore()
+    store.add_many([(["하나"], action_a), (["둘"], action_b)])
+    version = store.version
+    assert store.remove_many(["하나", "셋", "둘"]) == ["하나", "둘"]
+    assert store.version == version + 1
+    assert store.remove_many(["없음"]) == []
+    assert store.version == version + 1
+
+
+def test_copy_is_independent():
+    """Test changes to a copy leave the original untouched"""
+    store = KeywordStore()
+    action_id = store.add(["엄마", "어머니"], action_a)
+    other = store.copy()
+    other.remove_keyword("어머니")
+    other.add("불", action_b)
+
+    assert "어머니" in store and "불" not in store
+    assert store.aliases(action_id) == ["어머니", "엄마"]
+    assert other.aliases(action_id) == ["엄마"]
+    assert other.version == store.version + 2
@@ -0,0 +1,104 @@
+"""
+Tests for KeywordMatcher
+"""
+from app.matcher import Hypothesis, KeywordMatcher
+
+
+def test_find_single_keyword():
+    """Test finding a keyword inside text"""
+    matcher = KeywordMatcher([(0, "엄마")])
+    assert matcher.find("엄마한테 전화해") == [0]
+    assert matcher.find("안녕하세요") == []
+
+
+def test_find_overlapping_keywords():
+    """Test overlapping and nested keywords are all reported"""
+    matcher = KeywordMatcher([(0, "he"), (1, "she"), (2, "his"), (3, "hers")])
+    assert sorted(matcher.find("ushers")) == [0, 1, 3]
+
+
+def test_find_reports_each_pattern_once():
+    """Test repeated occurrences are reported once, in first-occurrence order"""
+    matcher = KeywordMatcher([(0, "불"), (1, "음악")])
+    assert matcher.find("음악 불 음악 불") == [1, 0]
+
+
+def test_empty_matcher():
+    """Test a matcher without patterns never matches"""
+    matcher = KeywordMatcher([])
+    assert matcher.pattern_count == 0
+    assert matcher.find("anything") == []
+
+
+def test_match_hypotheses_uses_best_score():
+    """Test a keyword only in a lower-ranked hypothesis still matches"""
+    matcher = KeywordMatcher([(0, "엄마"), (1, "음악")])
+    hypotheses = [
+        Hypothesis("엄 마한테 전화", 0.8),
+        Hypothesis("엄마한테 전화", 0.4),
+        Hypothesis("엄마 음악", 0.2),
+    ]
+    assert matcher.match_hypotheses(hypotheses) == [(0, 0.4), (1, 0.2)]
+
+
+def test_match_hypotheses_min_score():
+    """Test matches below the minimum score are dropped"""
+    matcher = KeywordMatcher([(0, "엄마")])
+    hypotheses = [Hypothesis("안녕", 0.9), Hypothesis("엄마", 0.05)]
+    assert matcher.match_hypotheses(hypotheses, min_score=0.1) == []
+
+
+def test_match_state_reports_only_new_matches():
+    """Test feeding deltas reports each occurrence once, when it completes"""
+    matcher = KeywordMatcher([(0, "엄마"), (1, "음악")])
+    state = matcher.start()
+    assert state.feed("안녕 엄") == []
+    assert state.feed("마 그리고 음") == [(0, 5)]
+    assert state.feed("악") == [(1, 12)]
+    assert state.feed(" 틀어") == []
+
+
+def test_match_state_carries_over_phrase_boundary():
+    """Test a keyword split across two phrases still matches"""
+    matcher = KeywordMatcher([(0, "엄마한테")])
+    state = matcher.start()
+    state.feed("우리 엄마")
+    state.end_phrase()
+    assert state.feed("한테 전화") == [(0, 7)]
+
+
+def test_match_state_carry_is_bounded():
+    """Test partial keywords longer than carry_chars are dropped at a boundary"""
+    matcher = KeywordMatcher([(0, "엄마한테")])
+    state = matcher.start(carry_chars=1)
+    state.feed("엄마")
+    state.end_phrase()
+    assert state.feed("한테") == []
+
+
+def test_match_state_bridges_one_boundary_only():
+    """Test a carried prefix cannot span more than the previous phrase"""
+    matcher = KeywordMatcher([(0, "abcd")])
+    state = matcher.start()
+    state.feed("ab")
+    state.end_phrase()
+    state.feed("c")
+    state.end_phrase()
+    assert state.feed("d") == []
+
+
+def test_match_state_reset():
+    """Test reset forgets a partial match"""
+    matcher = KeywordMatcher([(0, "엄마")])
+    state = matcher.start()
+    state.feed("엄")
+    state.reset()
+    assert state.feed("마") == []
+
+
+def test_find_many_matches_find():
+    """Test batch matching agrees with find line by line"""
+    matcher = KeywordMatcher([(0, "he"), (1, "she"), (2, "his"), (3, "hers"), (4, "엄마")])
+    texts = ["ushers", "", "this is his", "엄마한테 he", "zzz", "shehers"]
+    assert matcher.find_many(texts) == [matcher.find(text) for text in texts]
+    assert KeywordMatcher([]).find_many(["엄마", ""]) == [[], []]
@@ -0,0 +1,73 @@
+"""
+Tests for NgramIndex
+"""
+import pytest
+from app.ngram_index import NgramIndex, substring_distance
+
+
+@pytest.fixture
+def index():
+    """Index over a few contact names"""
+    return NgramIndex(
+        patterns=[(0, "김철수"), (1, "김영희"), (2, "박철민"), (3, "엄마"), (4, "형")]
+    )
+
+
+def test_substring_distance():
+    """Test approximate substring edit distance"""
+    assert substring_distance("철수", "김철수한테") == 0
+    assert substring_distance("김철수", "김철주한테") == 1
+    assert substring_distance("abc", "") == 3
+
+
+def test_exact_search(index):
+    """Test exact substring matches score 1.0"""
+    assert index.search("김철수한테 전화해") == [(0, 1.0)]
+
+
+def test_exact_search_skips_near_misses(index):
+    """Test the default min_score only returns exact matches"""
+    assert index.search("김철주한테 전화해") == []
+
+
+def test_fuzzy_search(index):
+    """Test near misses are found when min_score allows it"""
+    results = index.search("김철주한테 전화해", min_score=0.6)
+    assert results[0][0] == 0
+    assert results[0][1] == pytest.approx(2 / 3)
+
+
+def test_fuzzy_search_at_threshold():
+    """Test a match scoring exactly min_score is not dropped by float rounding"""
+    index = NgramIndex(patterns=[(0, "abcde")])
+    assert index.search("xx abXde yy", 5, 0.8) == [(0, pytest.approx(0.8))]
+
+
+def test_short_keywords(index):
+    """Test keywords shorter than n are still found"""
+    assert index.search("형한테 전화") == [(4, 1.0)]
+
+
+def test_candidates_are_filtered(index):
+    """Test the count filter drops keywords sharing too few grams"""
+    assert index.candidates("엄마한테") == [3]
+
+
+def test_top_k(index):
+    """Test results are limited to k"""
+    results = index.search("김철수 김영희 박철민 엄마", k=2)
+    assert len(results) == 2
+    assert all(score == 1.0 for _, score in results)
+
+
+def test_remove(index):
+    """Test removed keywords are no longer found"""
+    assert index.remove(0) is True
+    assert index.search("김철수") == []
+    assert index.remove(0) is False
+    assert len(index) == 4
+
+
+def test_memory_bytes(index):
+    """Test memory size is reported"""
+    assert index.memory_bytes() > 0
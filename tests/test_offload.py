@@ -0,0 +1,155 @@
+"""
+Tests for blocking-work pools and event-loop lag monitoring
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from app.offload import (
+    BlockingPool,
+    ConcurrencyLimit,
+    LoopLagMonitor,
+    OverloadedError,
+    PoolSaturatedError,
+)
+
+
+def test_pool_runs_off_the_loop():
+    """Test blocking calls run on pool threads while the loop stays free"""
+    pool = BlockingPool("test", workers=1)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        thread_name = await pool.run(lambda: (time.sleep(0.2), threading.current_thread().name)[1])
+        ticker.cancel()
+        return thread_name, ticks
+
+    thread_name, ticks = asyncio.run(run())
+    pool.shutdown()
+    assert thread_name.startswith("test")
+    assert ticks >= 5
+    assert pool.snapshot()["completed"] == 1
+
+
+def test_pool_rejects_beyond_capacity():
+    """Test admission control refuses work once workers and queue are full"""
+    pool = BlockingPool("test", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    pool.shutdown()
+    snapshot = pool.snapshot()
+    assert snapshot["rejected"] == 1
+    assert snapshot["completed"] == 2
+    assert snapshot["inflight"] == 0
+
+
+def test_concurrency_limit_queues_then_rejects():
+    """Test requests beyond the limit wait in order and overflow fails fast"""
+    limit = ConcurrencyLimit("test", limit=1, max_queue=2, degrade_at=2)
+    order = []
+
+    async def request(name, hold):
+        async with limit.admit():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def run():
+        tasks = [asyncio.ensure_future(request(n, 0.05)) for n in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert (limit.active, limit.waiting, limit.under_pressure) == (1, 2, True)
+        with pytest.raises(OverloadedError) as excinfo:
+            await request("d", 0)
+        await asyncio.gather(*tasks)
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert isinstance(error, PoolSaturatedError)
+    assert error.retry_after >= 1
+    assert order == ["a", "b", "c"]
+    snapshot = limit.snapshot()
+    assert (snapshot["admitted"], snapshot["queued"], snapshot["rejected"]) == (3, 2, 1)
+    assert (snapshot["active"], snapshot["waiting"], snapshot["max_depth"]) == (0, 0, 2)
+    assert snapshot["wait_p99_ms"] >= 40
+
+
+def test_concurrency_limit_wait_times_out():
+    """Test a queued request gives up after max_wait and frees its queue slot"""
+    limit = ConcurrencyLimit("test", limit=1, max_queue=1, max_wait=0.05)
+
+    async def run():
+        async with limit.admit():
+            with pytest.raises(OverloadedError):
+                async with limit.admit():
+                    pass
+            assert limit.waiting == 0
+        async with limit.admit():
+            pass
+
+    asyncio.run(run())
+    assert limit.stats["timed_out"] == 1
+    assert limit.active == 0
+
+
+def test_concurrency_limit_cancelled_waiter_passes_slot_on():
+    """Test cancelling a queued request neither leaks nor skips a slot"""
+    limit = ConcurrencyLimit("test", limit=1, max_queue=2)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with limit.admit():
+                await release.wait()
+
+        async def quick():
+            async with limit.admit():
+                return "done"
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(quick())
+        waiting = asyncio.ensure_future(quick())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        assert await waiting == "done"
+        await holder
+
+    asyncio.run(run())
+    assert (limit.active, limit.waiting) == (0, 0)
+
+
+def test_loop_lag_monitor_sees_blocking_call():
+    """Test the lag monitor reports a call that blocked the loop"""
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # block the loop on purpose
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] > 0
+    assert snapshot["max_lag_ms"] >= 50
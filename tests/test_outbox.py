@@ -0,0 +1,149 @@
+"""
+Tests for the durable action outbox
+"""
+import threading
+import time
+
+import pytest
+from app.actions import ActionRegistry
+from app.executor import ActionExecutor
+from app.outbox import ActionOutbox, OutboxDispatcher
+
+
+@pytest.fixture
+def executor():
+    """Executor without coalescing or device-state shortcuts"""
+    ex = ActionExecutor(max_workers=2, default_timeout=2.0)
+    yield ex
+    ex.shutdown()
+
+
+def wait_for(condition, timeout=3.0):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_enqueue_commits_and_ignores_duplicate_keys(tmp_path):
+    """Test entries are durable once their future resolves, unique by key"""
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"))
+    entry, is_new = outbox.enqueue("엄마", "call", {"contact": "엄마"}, "key-1").result(2)
+    assert is_new
+    assert entry.params == {"contact": "엄마"}
+    _, is_new = outbox.enqueue("엄마", "call", {"contact": "엄마"}, "key-1").result(2)
+    assert not is_new
+    assert outbox.counts() == {"pending": 1}
+    outbox.close()
+
+    reopened = ActionOutbox(str(tmp_path / "outbox.db"))
+    assert reopened.due() == []
+    assert [e.idempotency_key for e in reopened.due(all_pending=True)] == ["key-1"]
+    reopened.close()
+
+
+def test_group_commit(tmp_path):
+    """Test concurrent enqueues share commits"""
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"))
+    futures = []
+    lock = threading.Lock()
+
+    def produce():
+        for i in range(200):
+            future = outbox.enqueue("불", "lights", {"i": i})
+            with lock:
+                futures.append(future)
+
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(5)
+
+    assert outbox.stats["enqueued"] == 800
+    assert outbox.stats["commits"] < 800
+    outbox.close()
+
+
+def test_dispatcher_delivers_and_acknowledges(tmp_path, executor):
+    """Test a submitted action runs with its idempotency key and is acknowledged"""
+    registry = ActionRegistry()
+    keys = []
+    registry.register("notify", lambda params, idempotency_key: keys.append(idempotency_key))
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"))
+    dispatcher = OutboxDispatcher(outbox, executor, registry)
+
+    action = registry.create_action("notify", {})
+    handle = dispatcher.submit("알림", action, idempotency_key="trigger-1")
+    assert handle.wait(2).status == "success"
+    assert keys == ["trigger-1"]
+    assert wait_for(lambda: outbox.counts() == {"delivered": 1})
+    assert dispatcher.submit("알림", action, idempotency_key="trigger-1") is None
+    outbox.close()
+
+
+def test_submit_runs_the_built_action(tmp_path, executor, monkeypatch):
+    """Test a fresh trigger runs its prebuilt action without validating params again"""
+    registry = ActionRegistry()
+    registry.register("notify", lambda params: params["n"])
+    action = registry.create_action("notify", {"n": 1})
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"))
+    dispatcher = OutboxDispatcher(outbox, executor, registry)
+
+    def rebuilt(*args):
+        raise AssertionError("action rebuilt from stored params")
+
+    monkeypatch.setattr(registry, "create_action", rebuilt)
+    assert dispatcher.submit("알림", action).wait(2).result == 1
+    assert wait_for(lambda: outbox.counts() == {"delivered": 1})
+    outbox.close()
+
+
+def test_pending_entries_replay_after_restart(tmp_path, executor):
+    """Test entries recorded before a crash are delivered on the next start"""
+    path = str(tmp_path / "outbox.db")
+    outbox = ActionOutbox(path)
+    outbox.enqueue("엄마", "call", {"contact": "엄마"}, "before-crash").result(2)
+    outbox.close()
+
+    registry = ActionRegistry()
+    calls = []
+    registry.register("call", lambda params: calls.append(params["contact"]))
+    outbox = ActionOutbox(path)
+    dispatcher = OutboxDispatcher(outbox, executor, registry, poll_interval=0.05)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: outbox.counts() == {"delivered": 1})
+        assert calls == ["엄마"]
+        assert dispatcher.stats["replayed"] == 1
+    finally:
+        dispatcher.stop()
+        outbox.close()
+
+
+def test_failed_delivery_is_retried_then_marked_failed(tmp_path, executor):
+    """Test failed deliveries are retried up to max_attempts"""
+    registry = ActionRegistry()
+    registry.resilience.max_attempts = 1
+    attempts = []
+
+    def flaky(params):
+        attempts.append(True)
+        raise RuntimeError("provider down")
+
+    registry.register("flaky", flaky)
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"), max_attempts=2, retry_delay=0.01)
+    dispatcher = OutboxDispatcher(outbox, executor, registry, poll_interval=0.02)
+    dispatcher.submit("x", registry.create_action("flaky", {}))
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: outbox.counts() == {"failed": 1})
+        assert len(attempts) == 2
+    finally:
+        dispatcher.stop()
+        outbox.close()
@@ -0,0 +1,176 @@
+"""
+Tests for circuit breakers and retry budgets
+"""
+import asyncio
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from app.resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryBudget
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubProvider:
+    """Local HTTP server standing in for an outbound provider
+
+    Responds 500 to the first ``fail_first`` requests and 200 afterwards.
+    """
+
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                stub.requests += 1
+                status = 500 if stub.requests <= stub.fail_first else 200
+                self.send_response(status)
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/call"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def handler(self, params):
+        """Sync action handler calling the stub"""
+        request = urllib.request.Request(self.url, data=b"{}", method="POST")
+        with urllib.request.urlopen(request, timeout=2) as response:
+            return {"status": "success", "code": response.status}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def provider():
+    stubs = []
+
+    def make(fail_first=0):
+        stub = StubProvider(fail_first)
+        stubs.append(stub)
+        return stub
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+
+def fast_resilience(**kwargs):
+    return Resilience(base_delay=0.001, max_delay=0.002, **kwargs)
+
+
+def test_retry_recovers_from_transient_failure(provider):
+    """Test a failing request is retried until the stub succeeds"""
+    stub = provider(fail_first=2)
+    resilience = fast_resilience(max_attempts=3)
+    guarded = resilience.guard("call", stub.handler)
+
+    assert guarded({})["code"] == 200
+    assert stub.requests == 3
+    snapshot = resilience.snapshot()
+    assert snapshot["circuits"]["call"]["state"] == "closed"
+    assert snapshot["retry_budget"]["retries"] == 2
+
+
+def test_circuit_opens_and_fails_fast(provider):
+    """Test a failing provider opens the circuit and later calls skip it"""
+    stub = provider(fail_first=100)
+    resilience = fast_resilience(max_attempts=1, failure_threshold=3)
+    guarded = resilience.guard("call", stub.handler)
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            guarded({})
+    assert resilience.breaker("call").state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        guarded({})
+    assert stub.requests == 3
+
+
+def test_half_open_trial_closes_circuit(provider):
+    """Test the circuit closes after a successful trial call"""
+    clock = FakeClock()
+    stub = provider(fail_first=1)
+    resilience = fast_resilience(
+        max_attempts=1, failure_threshold=1, reset_timeout=10.0, clock=clock
+    )
+    guarded = resilience.guard("call", stub.handler)
+
+    with pytest.raises(Exception):
+        guarded({})
+    with pytest.raises(CircuitOpenError):
+        guarded({})
+    clock.now += 10.0
+    assert guarded({})["code"] == 200
+    assert resilience.breaker("call").state == "closed"
+
+
+def test_half_open_allows_single_trial():
+    """Test only one trial call is let through while half-open"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("call", failure_threshold=1, reset_timeout=1.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 1.0
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retry_budget_caps_retries():
+    """Test retries stop once the global budget is spent"""
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=2.0, clock=clock)
+    assert budget.withdraw() is True
+    assert budget.withdraw() is True
+    assert budget.withdraw() is False
+    assert budget.snapshot()["exhausted"] == 1
+
+
+def test_retry_budget_shared_across_handlers(provider):
+    """Test one failing integration cannot use more retries than the budget allows"""
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0, clock=clock)
+    stub = provider(fail_first=100)
+    resilience = fast_resilience(max_attempts=5, failure_threshold=100, budget=budget)
+
+    with pytest.raises(Exception):
+        resilience.guard("call", stub.handler)({})
+    with pytest.raises(Exception):
+        resilience.guard("music", stub.handler)({})
+    assert stub.requests == 3  # two first attempts + one budgeted retry
+
+
+def test_async_handler_guard():
+    """Test async handlers are retried and stay async"""
+    resilience = fast_resilience(max_attempts=3)
+    attempts = []
+
+    async def flaky(params):
+        attempts.append(True)
+        if len(attempts) < 2:
+            raise ConnectionError("reset")
+        return "ok"
+
+    guarded = resilience.guard("music", flaky)
+    assert asyncio.iscoroutinefunction(guarded)
+    assert asyncio.run(guarded({})) == "ok"
+    assert len(attempts) == 2
@@ -0,0 +1,84 @@
+"""
+Tests for the pre-fork multi-worker server
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from app.server import worker_outbox_path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_worker_outbox_path():
+    """Test each worker gets its own outbox file next to the configured one"""
+    assert worker_outbox_path("/data/outbox.db", 0) == "/data/outbox.0.db"
+    assert worker_outbox_path("outbox", 3) == "outbox.3"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork workers need os.fork")
+def test_workers_share_keywords(tmp_path, keyword_db_path):
+    """Test keywords and action statuses are served the same by every worker"""
+    pytest.importorskip("uvicorn")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "server", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "2"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base}/status")
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.1)
+
+        response = httpx.post(
+            f"{base}/keywords",
+            json={"keyword": "엄마", "action_type": "call", "action_params": {"number": "010"}},
+        )
+        assert response.status_code == 200
+        # The worker that did not take the write picks the keyword up shortly after
+        deadline = time.monotonic() + 5
+        while httpx.post(
+            f"{base}/listen/test", params={"text": "엄마", "action_wait": 0}
+        ).json()["triggered_keywords"] != ["엄마"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        # Each fresh connection lands on either worker; keep going until both have answered
+        deadline = time.monotonic() + 20
+        etags, pids = set(), set()
+        while len(pids) < 2:
+            assert time.monotonic() < deadline, "only one worker served requests"
+            with httpx.Client(base_url=base) as worker:
+                pid = worker.get("/metrics").json()["process"]["pid"]
+                response = worker.get("/keywords")
+                while response.json() != ["엄마"] and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    response = worker.get("/keywords")
+                assert response.json() == ["엄마"]
+                etags.add(response.headers["etag"])
+                assert [a["keyword"] for a in worker.get("/actions").json()] == ["엄마"]
+                assert worker.post("/devices/invalidate", json={}).status_code == 409
+            pids.add(pid)
+        assert len(etags) == 1
+        assert server.pid not in pids
+        assert (tmp_path / "outbox.0.db").exists() and (tmp_path / "outbox.1.db").exists()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=15) == 0
@@ -0,0 +1,41 @@
+"""
+Tests for status records shared between server workers
+"""
+from app.shared_state import SharedRecords
+
+
+def test_records_are_visible_to_other_connections(tmp_path):
+    """Test a committed record can be read through another connection at once"""
+    path = str(tmp_path / "shared.db")
+    writer, reader = SharedRecords(path), SharedRecords(path)
+    writer.put("action", "a1", {"status": "pending"}).result()
+    assert reader.get("action", "a1") == {"status": "pending"}
+    writer.put("action", "a1", {"status": "success"}).result()
+    assert reader.get("action", "a1") == {"status": "success"}
+    assert reader.get("job", "a1") is None
+    writer.close()
+    reader.close()
+
+
+def test_recent_and_prune(tmp_path):
+    """Test records come back newest first and expired ones are pruned"""
+    records = SharedRecords(str(tmp_path / "shared.db"), prune_every=3)
+    records.put("action", "a1", {"n": 1})
+    records.put("action", "a2", {"n": 2, "at": object()}).result()
+    assert [r["n"] for r in records.recent("action")] == [2, 1]
+
+    records.retention = 0.0
+    records.put("job", "j1", {"n": 3}).result()
+    assert records.recent("action") == []
+    records.close()
+
+
+def test_put_is_written_in_order_by_one_thread(tmp_path):
+    """Test puts of one record are committed in order and dropped after close"""
+    records = SharedRecords(str(tmp_path / "shared.db"))
+    futures = [records.put("action", "a1", {"n": n}) for n in range(100)]
+    futures[-1].result()
+    assert all(f.done() for f in futures)
+    assert records.get("action", "a1") == {"n": 99}
+    records.close()
+    assert records.put("action", "a3", {"n": 0}).result() is None
@@ -18,7 +18,28 @@ def test_register_action(voice_listener, mock_action):
     """Test registering an action"""
     voice_listener.register_action("test", mock_action)
     assert "test" in voice_listener.keyword_actions
-    assert voice_listener.keyword_actions["test"] == mock_action
+    assert voice_listener.keyword_actions["test"] == (mock_action,)
+
+
+def test_register_action_does_not_overwrite(voice_listener, mock_action):
+    """Test that a second action for the same keyword is added, not replaced"""
+    other_calls = []
+    voice_listener.register_action("엄마", mock_action)
+    voice_listener.register_action("엄마", lambda: other_calls.append(True))
+
+    assert len(voice_listener.keyword_actions["엄마"]) == 2
+    voice_listener.check_keywords("엄마")
+    assert len(mock_action.calls) == 1
+    assert len(other_calls) == 1
+
+
+def test_register_action_with_aliases(voice_listener, mock_action):
+    """Test that one action can be triggered by several aliases"""
+    voice_listener.register_action("엄마", mock_action, aliases=["어머니"])
+
+    assert set(voice_listener.get_registered_keywords()) == {"엄마", "어머니"}
+    voice_listener.check_keywords("어머니께 전화")
+    assert len(mock_action.calls) == 1
 
 
 def test_register_action_case_insensitive(voice_listener, mock_action):
@@ -99,3 +120,255 @@ def test_stop_listening(voice_listener):
     voice_listener.is_listening = True
     voice_listener.stop_listening()
     assert voice_listener.is_listening is False
+
+
+def test_check_keywords_nbest(voice_listener, mock_action):
+    """Test a keyword found only in the second-best hypothesis triggers"""
+    from app.matcher import Hypothesis
+
+    voice_listener.register_action("엄마", mock_action)
+    triggered, _ = voice_listener.check_keywords(
+        [Hypothesis("어마한테 전화해", 0.7), Hypothesis("엄마한테 전화해", 0.5)]
+    )
+    assert triggered == ["엄마"]
+    assert len(mock_action.calls) == 1
+
+
+def test_matcher_rebuilds_after_changes(voice_listener, mock_action):
+    """Test the compiled matcher follows keyword changes"""
+    voice_listener.register_action("엄마", mock_action)
+    assert voice_listener.check_keywords("엄마")[0] == ["엄마"]
+
+    voice_listener.unregister_action("엄마")
+    voice_listener.register_action("음악", mock_action)
+    assert voice_listener.check_keywords("엄마")[0] == []
+    assert voice_listener.check_keywords("음악")[0] == ["음악"]
+
+
+def test_google_hypotheses_scoring():
+    """Test Google alternatives become ranked, scored hypotheses"""
+    from app.voice_listener import _google_hypotheses
+
+    result = {
+        "alternative": [
+            {"transcript": "엄 마", "confidence": 0.8},
+            {"transcript": "엄마"},
+            {"transcript": "어마"},
+        ]
+    }
+    hypotheses = _google_hypotheses(result, limit=2)
+    assert [h.text for h in hypotheses] == ["엄 마", "엄마"]
+    assert hypotheses[0].score == 0.8
+    assert hypotheses[1].score == 0.4
+    assert _google_hypotheses([], limit=5) == []
+
+
+def test_check_keywords_command_template(voice_listener):
+    """Test command templates fill handler params at match time"""
+    received = []
+    voice_listener.register_command(
+        "{room} 불 {state}", lambda params: received.append(params), "lights"
+    )
+
+    triggered, _ = voice_listener.check_keywords("거실 불 켜")
+    assert triggered == ["거실 불 켜"]
+    assert received == [{"room": "거실", "state": "on"}]
+
+
+def test_fuzzy_keyword_matching(voice_listener, mock_action):
+    """Test fuzzy matching fires on a near miss only when enabled"""
+    voice_listener.register_action("김철수", mock_action)
+    assert voice_listener.check_keywords("김철주한테 전화")[0] == []
+
+    voice_listener.fuzzy_min_score = 0.6
+    assert voice_listener.check_keywords("김철주한테 전화")[0] == ["김철수"]
+    assert voice_listener.search_keywords("김철주", min_score=0.6)[0][0] == "김철수"
+
+
+def test_keyword_stream(voice_listener, mock_action):
+    """Test streaming deltas trigger each keyword occurrence once"""
+    voice_listener.register_action("엄마", mock_action)
+    stream = voice_listener.open_stream()
+
+    assert stream.feed("우리 엄")[0] == []
+    assert stream.feed("마한테")[0] == ["엄마"]
+    assert stream.feed(" 전화해")[0] == []
+    assert len(mock_action.calls) == 1
+
+    stream.end_phrase()
+    stream.feed("엄")
+    stream.end_phrase()
+    assert stream.feed("마")[0] == ["엄마"]
+    assert len(mock_action.calls) == 2
+
+
+def test_keyword_stream_follows_keyword_changes(voice_listener, mock_action):
+    """Test a stream picks up keywords registered after it started"""
+    stream = voice_listener.open_stream()
+    stream.feed("엄마 ")
+    voice_listener.register_action("음악", mock_action)
+    assert stream.feed("음악")[0] == ["음악"]
+
+
+def test_trigger_with_executor(voice_listener, mock_action):
+    """Test actions are submitted to the executor when one is set"""
+    from app.executor import ActionExecutor
+
+    executor = ActionExecutor(max_workers=1)
+    voice_listener.executor = executor
+    voice_listener.register_action("엄마", mock_action)
+    try:
+        result = voice_listener.trigger("엄마")
+        assert result.triggered == ["엄마"]
+        assert len(result.handles) == 1
+        assert result.handles[0].wait(2).result == "action executed"
+        assert len(mock_action.calls) == 1
+    finally:
+        executor.shutdown()
+
+
+def test_debouncer_suppresses_repeats(voice_listener, mock_action):
+    """Test repeated triggers are suppressed when a debouncer is set"""
+    from app.debounce import TriggerDebouncer
+
+    voice_listener.debouncer = TriggerDebouncer()
+    voice_listener.register_action("엄마", mock_action, aliases=["어머니"])
+
+    assert voice_listener.check_keywords("엄마")[0] == ["엄마"]
+    assert voice_listener.check_keywords("엄마")[0] == []
+    # The alias reaches the same action, which is deduplicated too
+    assert voice_listener.check_keywords("어머니")[0] == []
+    assert len(mock_action.calls) == 1
+
+
+def test_match_batch(voice_listener, mock_action):
+    """Test batch matching reports keywords per line and fires only when asked"""
+    voice_listener.register_action("엄마", mock_action)
+    voice_listener.register_command("{room} 불 {state}", lambda params: None, "lights")
+    texts = ["엄마한테 전화", "안녕", "거실 불 켜"]
+
+    assert voice_listener.match_batch(texts, dry_run=True) == [["엄마"], [], ["거실 불 켜"]]
+    assert mock_action.calls == []
+    assert voice_listener.match_batch(texts[:2]) == [["엄마"], []]
+    assert len(mock_action.calls) == 1
+
+
+def test_match_batch_dispatches_each_action_once(voice_listener, mock_action):
+    """Test a batch runs each distinct action and command once, across chunks too"""
+    commands = []
+    voice_listener.register_action("엄마", mock_action)
+    voice_listener.register_command("{room} 불 {state}", commands.append, "lights")
+    fired = set()
+
+    matches = voice_listener.match_batch(["엄마"] * 100 + ["거실 불 켜"] * 3, fired=fired)
+    assert matches.count(["엄마"]) == 100
+    voice_listener.match_batch(["엄마", "거실 불 켜", "안방 불 켜"], fired=fired)
+    assert len(mock_action.calls) == 1
+    assert commands == [
+        {"room": "거실", "state": "on"},
+        {"room": "안방", "state": "on"},
+    ]
+
+
+def test_overlapping_aliases_run_action_once(voice_listener, mock_action):
+    """Test an action matched through two aliases in one transcript runs once"""
+    voice_listener.register_action("엄마", mock_action, aliases=["엄마한테"])
+
+    triggered, _ = voice_listener.check_keywords("엄마한테 전화")
+    assert len(triggered) == 1
+    assert len(mock_action.calls) == 1
+
+
+def test_matcher_rebuilds_after_swap_during_build(voice_listener, mock_action, monkeypatch):
+    """Test a bulk swap that lands while the matcher builds is picked up next time"""
+    import app.voice_listener as module
+
+    voice_listener.register_action("엄마", mock_action)
+    build = module.KeywordMatcher
+    swapped = []
+
+    def build_and_swap(patterns):
+        if not swapped:
+            swapped.append(True)
+            voice_listener.register_actions([("아빠", mock_action, [])])
+        return build(patterns)
+
+    monkeypatch.setattr(module, "KeywordMatcher", build_and_swap)
+    assert voice_listener.matcher.find("아빠") == []
+    assert voice_listener.check_keywords("아빠")[0] == ["아빠"]
+
+
+def test_swap_between_match_and_fire_uses_matched_store(voice_listener):
+    """Test pattern IDs are resolved in the store they were matched against"""
+    calls = []
+    voice_listener.register_action("엄마", lambda: calls.append("엄마"))
+    voice_listener.register_action("아빠", lambda: calls.append("아빠"))
+    matcher = voice_listener.matcher
+    match_hypotheses = matcher.match_hypotheses
+
+    def match_then_swap(hypotheses, min_score):
+        matches = match_hypotheses(hypotheses, min_score)
+        # In the new store "아빠" takes the pattern ID "엄마" had
+        voice_listener.register_actions([("아빠", lambda: calls.append("new"), [])], replace=True)
+        return matches
+
+    matcher.match_hypotheses = match_then_swap
+    assert voice_listener.check_keywords("엄마")[0] == ["엄마"]
+    assert calls == ["엄마"]
+
+
+def test_triggers_during_bulk_replace(voice_listener):
+    """Test triggers racing bulk replaces only ever run the matched keyword's action"""
+    import threading
+
+    calls = []
+    small = [("하나", lambda: calls.append("하나"), [])]
+    large = [(f"다른{i}", lambda: calls.append("다른"), []) for i in range(20)]
+    done = threading.Event()
+
+    def replace():
+        while not done.is_set():
+            voice_listener.register_actions(small, replace=True)
+            voice_listener.register_actions(large, replace=True)
+
+    voice_listener.register_actions(small, replace=True)
+    swapper = threading.Thread(target=replace)
+    swapper.start()
+    try:
+        for _ in range(2000):
+            assert voice_listener.check_keywords("하나")[0] in ([], ["하나"])
+    finally:
+        done.set()
+        swapper.join()
+    assert set(calls) <= {"하나"}
+
+
+def test_command_params_are_validated(voice_listener):
+    """Test command matches are built into validated actions"""
+    from pydantic import BaseModel
+    from app.actions import ActionRegistry
+
+    class VolumeParams(BaseModel):
+        level: int
+
+    registry = ActionRegistry()
+    calls = []
+    registry.register("volume", lambda params: calls.append(dict(params)), params_schema=VolumeParams)
+
+    def create_action(params):
+        return registry.create_action("volume", params)
+
+    voice_listener.register_command(
+        "볼륨 {level}", registry.get_guarded_handler("volume"), "volume", create_action=create_action
+    )
+    assert voice_listener.check_keywords("볼륨 다섯")[0] == []
+    assert voice_listener.check_keywords("볼륨 5")[0] == ["볼륨 5"]
+    assert calls == [{"level": 5}]
+
+    # Vocabulary values are checked when the template is registered
+    with pytest.raises(ValueError):
+        voice_listener.register_command(
+            "소리 {level}", lambda params: None, "volume",
+            slots={"level": {"크게": "loud"}}, create_action=create_action,
+        )
+    assert len(voice_listener.grammar) == 1